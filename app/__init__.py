@@ -8,11 +8,13 @@ import os
 
 from sentence_transformers import SentenceTransformer
 from app.config import Config
+from app.utils.metrics import instrument_encoder, init_metrics
+from app.utils.replica import RoutingSession, init_replica
 
 load_dotenv()
 
-db = SQLAlchemy()
-sbert_model = SentenceTransformer("all-MiniLM-L6-v2")
+db = SQLAlchemy(session_options={"class_": RoutingSession})
+sbert_model = instrument_encoder(SentenceTransformer("all-MiniLM-L6-v2"))
 jwt = JWTManager()
 migrate = Migrate()
 
@@ -24,13 +26,29 @@ def create_app():
     app = Flask(__name__)
     app.config.from_object(Config)
 
+    from app.utils.serialization import FastJSONProvider
+    app.json = FastJSONProvider(app)
+
+    from app.utils.compression import init_compression
+    init_compression(app)
+    init_metrics(app)
+
+    from app.utils.profiler import init_profiler
+    init_profiler(app)
+
+    from app.utils.querycheck import init_query_detector
+    init_query_detector(app)
+
     # Initialize extensions
-    db.init_app(app)
+    from app.utils.db_profile import init_db_profile
+    init_db_profile(app, db)  # db.init_app with the DB_PROFILE engine tuning
+    init_replica(app)
     jwt.init_app(app)
     CORS(app)
     migrate.init_app(app, db)
 
-    CORS(app, resources={r"/api/*": {"origins": "http://localhost:5173"}}, supports_credentials=True)
+    CORS(app, resources={r"/api/*": {"origins": "http://localhost:5173"}}, supports_credentials=True,
+         expose_headers=["X-Next-Cursor"])
 
     # Register blueprints
     from app.routes.auth import auth_bp
@@ -41,6 +59,7 @@ def create_app():
     from app.routes.chatbot import chatbot_bp
     from app.routes.recommendations import recommendations_bp
     from app.routes.booking import booking_bp
+    from app.routes.search import search_bp
 
     app.register_blueprint(auth_bp, url_prefix='/api/auth')
     app.register_blueprint(diary_bp, url_prefix='/api/diary')
@@ -50,5 +69,6 @@ def create_app():
     app.register_blueprint(chatbot_bp, url_prefix='/api/chatbot')
     app.register_blueprint(recommendations_bp, url_prefix='/api/recommendations')
     app.register_blueprint(booking_bp, url_prefix='/api/booking')
+    app.register_blueprint(search_bp, url_prefix='/api/search')
 
     return app
\ No newline at end of file
@@ -5,5 +5,43 @@ class Config:
     SECRET_KEY = os.environ.get('SECRET_KEY')
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or 'sqlite:///mental_wellbeing.db'
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    DATABASE_REPLICA_URL = os.environ.get('DATABASE_REPLICA_URL')  # read replica for replica_reads views
+    SQLALCHEMY_BINDS = {'replica': DATABASE_REPLICA_URL} if DATABASE_REPLICA_URL else {}
+    REPLICA_MAX_LAG = float(os.environ.get('REPLICA_MAX_LAG', 5))  # seconds behind before reads go back to the primary
+    REPLICA_LAG_CHECK_INTERVAL = float(os.environ.get('REPLICA_LAG_CHECK_INTERVAL', 5))  # seconds, per process
+    READ_YOUR_WRITES_WINDOW = int(os.environ.get('READ_YOUR_WRITES_WINDOW', 10))  # seconds a writer reads from the primary
+    DB_PROFILE = os.environ.get('DB_PROFILE', 'tuned')  # tuned or stock (driver defaults)
+    SQLITE_BUSY_TIMEOUT = int(os.environ.get('SQLITE_BUSY_TIMEOUT', 5000))  # ms a writer waits for the lock
+    SQLITE_SYNCHRONOUS = os.environ.get('SQLITE_SYNCHRONOUS', 'NORMAL')  # NORMAL is durable in WAL except on power loss
+    SQLITE_CACHE_SIZE = int(os.environ.get('SQLITE_CACHE_SIZE', -65536))  # negative is KiB, per connection
+    SQLITE_MMAP_SIZE = int(os.environ.get('SQLITE_MMAP_SIZE', 268435456))  # bytes of the file read through mmap
+    DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 10))  # per process, Postgres only
+    DB_MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW', 20))
+    DB_POOL_TIMEOUT = int(os.environ.get('DB_POOL_TIMEOUT', 10))  # seconds to wait for a free connection
+    DB_POOL_RECYCLE = int(os.environ.get('DB_POOL_RECYCLE', 1800))  # seconds, below server/proxy idle timeouts
     JWT_SECRET_KEY = os.environ.get('JWT_SECRET_KEY')
-    JWT_ACCESS_TOKEN_EXPIRES = timedelta(hours=24)
\ No newline at end of file
+    JWT_ACCESS_TOKEN_EXPIRES = timedelta(hours=24)
+    FEED_FANOUT_LIMIT = int(os.environ.get('FEED_FANOUT_LIMIT', 1000))  # bigger communities are merged in on read
+    FEED_BACKFILL = 100  # articles copied into a new member's feed on join
+    AVAILABILITY_HORIZON_DAYS = int(os.environ.get('AVAILABILITY_HORIZON_DAYS', 28))  # how far ahead rules are expanded
+    RESPONSE_CACHE_URL = os.environ.get('RESPONSE_CACHE_URL')  # redis://... to share the response cache between workers
+    RESPONSE_CACHE_TTL = int(os.environ.get('RESPONSE_CACHE_TTL', 60))  # default seconds a cached response is served
+    RESPONSE_CACHE_MAX_ENTRIES = int(os.environ.get('RESPONSE_CACHE_MAX_ENTRIES', 1024))  # per process, local cache only
+    METRICS_ENABLED = os.environ.get('METRICS_ENABLED', '1') == '1'
+    METRICS_TOKEN = os.environ.get('METRICS_TOKEN')  # when set, /metrics requires "Authorization: Bearer <token>"
+    COMPRESS_ENABLED = os.environ.get('COMPRESS_ENABLED', '1') == '1'
+    COMPRESS_MIN_SIZE = int(os.environ.get('COMPRESS_MIN_SIZE', 1024))  # bytes; smaller bodies are sent as is
+    COMPRESS_GZIP_LEVEL = int(os.environ.get('COMPRESS_GZIP_LEVEL', 6))
+    COMPRESS_BR_QUALITY = int(os.environ.get('COMPRESS_BR_QUALITY', 5))  # 11 is the brotli default but far slower
+    COMPRESS_MIMETYPES = ['application/json', 'text/html', 'text/plain', 'text/css', 'application/javascript']
+    QUERY_DETECTOR = os.environ.get('QUERY_DETECTOR')  # warn, raise or off; unset: raise in tests, warn in debug
+    QUERY_DETECTOR_THRESHOLD = int(os.environ.get('QUERY_DETECTOR_THRESHOLD', 5))  # allowed repeats of one statement
+    CHATBOT_MAX_CONCURRENCY = int(os.environ.get('CHATBOT_MAX_CONCURRENCY', 8))  # LLM calls in flight per process
+    CHATBOT_MAX_PER_USER = int(os.environ.get('CHATBOT_MAX_PER_USER', 1))  # in-flight chats per user before 429
+    CHATBOT_TIMEOUT = float(os.environ.get('CHATBOT_TIMEOUT', 20))  # seconds a chat request waits for the LLM
+    CHATBOT_CONNECT_TIMEOUT = float(os.environ.get('CHATBOT_CONNECT_TIMEOUT', 5))
+    CHATBOT_MAX_RETRIES = int(os.environ.get('CHATBOT_MAX_RETRIES', 1))  # SDK retries on 429/5xx/connection errors
+    PROFILE_ENABLED = os.environ.get('PROFILE_ENABLED', '0') == '1'
+    PROFILE_SAMPLE_RATE = float(os.environ.get('PROFILE_SAMPLE_RATE', 0))  # fraction of requests profiled, besides X-Profile
+    PROFILE_INTERVAL = float(os.environ.get('PROFILE_INTERVAL', 0.005))  # seconds between stack samples
+    PROFILE_DIR = os.environ.get('PROFILE_DIR')  # defaults to <instance>/profiles
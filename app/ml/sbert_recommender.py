@@ -2,9 +2,9 @@ import numpy as np
 from sentence_transformers import SentenceTransformer
 
 class SBERTRecommender:
-    def __init__(self, model_name="all-MiniLM-L6-v2"):
-        # Load SBERT model once
-        self.model = SentenceTransformer(model_name)
+    def __init__(self, model_name="all-MiniLM-L6-v2", model=None):
+        # Load SBERT model once, unless an encoder is passed in
+        self.model = model or SentenceTransformer(model_name)
         self.item_texts = []
         self.item_ids = []
         self.item_embeddings = None
@@ -5,16 +5,20 @@ import numpy as np
 
 class Article(db.Model):
     __tablename__ = 'articles'
+    __table_args__ = (
+        db.Index('ix_articles_community_id_fanned_out', 'community_id', 'fanned_out'),
+    )
 
     article_id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(255), nullable=False)
     content = db.Column(db.Text, nullable=False)
-    community_id = db.Column(db.Integer, db.ForeignKey('communities.community_id'), nullable=False)
+    community_id = db.Column(db.Integer, db.ForeignKey('communities.community_id'), nullable=False, index=True)
     author_id = db.Column(db.Integer, db.ForeignKey('user.user_id'), nullable=True)
     status = db.Column(db.String(20), default="pending")
     tags = db.Column(db.String(255))
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    fanned_out = db.Column(db.Boolean, nullable=False, default=False)  # copied into members' feed_entries on approval
 
     # SBERT embeddings
     embedding = db.Column(db.LargeBinary)
@@ -3,9 +3,14 @@ from datetime import datetime
 
 class Availability(db.Model):
     __tablename__ = 'availability'
+    __table_args__ = (
+        db.Index('ix_availability_professional_id_date', 'professional_id', 'date'),
+        db.Index('ix_availability_date_start_time_is_booked', 'date', 'start_time', 'is_booked'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     professional_id = db.Column(db.Integer, db.ForeignKey('user.user_id'), nullable=False)
+    rule_id = db.Column(db.Integer, db.ForeignKey('availability_rules.id'))  # set for slots expanded from a rule
     date = db.Column(db.Date, nullable=False)
     start_time = db.Column(db.Time, nullable=False)
     end_time = db.Column(db.Time, nullable=False)
@@ -20,3 +25,48 @@ class Availability(db.Model):
             'end_time': self.end_time.strftime("%H:%M"),
             'is_booked': self.is_booked
         }
+
+
+class AvailabilityRule(db.Model):
+    __tablename__ = 'availability_rules'
+
+    id = db.Column(db.Integer, primary_key=True)
+    professional_id = db.Column(db.Integer, db.ForeignKey('user.user_id'), nullable=False, index=True)
+    weekdays = db.Column(db.String(20), nullable=False)  # comma separated, Monday = 0
+    start_time = db.Column(db.Time, nullable=False)
+    end_time = db.Column(db.Time, nullable=False)
+    slot_minutes = db.Column(db.Integer, nullable=False)
+    start_date = db.Column(db.Date, nullable=False)
+    end_date = db.Column(db.Date)  # open-ended when null
+    exceptions = db.Column(db.Text)  # comma separated ISO dates to skip
+    expanded_until = db.Column(db.Date)  # slots exist up to and including this date
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'professional_id': self.professional_id,
+            'weekdays': [int(d) for d in self.weekdays.split(',')] if self.weekdays else [],
+            'start_time': self.start_time.strftime("%H:%M"),
+            'end_time': self.end_time.strftime("%H:%M"),
+            'slot_minutes': self.slot_minutes,
+            'start_date': self.start_date.isoformat(),
+            'end_date': self.end_date.isoformat() if self.end_date else None,
+            'exceptions': self.exceptions.split(',') if self.exceptions else [],
+            'expanded_until': self.expanded_until.isoformat() if self.expanded_until else None
+        }
+
+
+class AvailabilityDay(db.Model):
+    # Free slot count per day across all professionals, kept up to date by
+    # the booking and availability write paths
+    __tablename__ = 'availability_days'
+
+    date = db.Column(db.Date, primary_key=True)
+    free_slots = db.Column(db.Integer, nullable=False, default=0)
+
+    def to_dict(self):
+        return {
+            'date': self.date.isoformat(),
+            'free_slots': self.free_slots
+        }
@@ -9,6 +9,7 @@ class Community(db.Model):
     name = db.Column(db.String(100), nullable=False)
     description = db.Column(db.Text)
     category = db.Column(db.String(50))  # stress, depression, cancer, etc.
+    member_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')  # kept in step on join / leave
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
     # Relationships
@@ -21,7 +22,7 @@ class Community(db.Model):
             'name': self.name,
             'description': self.description,
             'category': self.category,
-            'member_count': len(self.members),
+            'member_count': self.member_count,
             'created_at': self.created_at.isoformat()
         }
 
@@ -30,8 +31,8 @@ class CommunityMember(db.Model):
     __tablename__ = 'community_members'
 
     id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey('user.user_id'), nullable=False)
-    community_id = db.Column(db.Integer, db.ForeignKey('communities.community_id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.user_id'), nullable=False, index=True)
+    community_id = db.Column(db.Integer, db.ForeignKey('communities.community_id'), nullable=False, index=True)
     joined_at = db.Column(db.DateTime, default=datetime.utcnow)
 
 
@@ -45,6 +46,7 @@ class CommunityPost(db.Model):
     post_type = db.Column(db.String(20), default='text')  # text, image, link
     status = db.Column(db.String(20), default='pending')  # admin approval
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     # Relationship
     author = db.relationship('User', foreign_keys=[user_id], backref='community_posts')
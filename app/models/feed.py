@@ -0,0 +1,13 @@
+from app import db
+
+
+class FeedEntry(db.Model):
+    __tablename__ = 'feed_entries'
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'article_id', name='uq_feed_entries_user_article'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.user_id'), nullable=False)
+    article_id = db.Column(db.Integer, db.ForeignKey('articles.article_id'), nullable=False)
+    community_id = db.Column(db.Integer, db.ForeignKey('communities.community_id'), nullable=False)
@@ -8,6 +8,7 @@ class Questionnaire(db.Model):
     title = db.Column(db.String(200), nullable=False)
     description = db.Column(db.Text)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    version = db.Column(db.Integer, nullable=False, default=1, server_default="1")  # bumped on every admin edit
 
     questions = db.relationship("Question", backref="questionnaire", cascade="all, delete-orphan")
 
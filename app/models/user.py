@@ -1,3 +1,4 @@
+import secrets
 from app import db
 from app.models.booking import Booking
 from werkzeug.security import generate_password_hash, check_password_hash
@@ -12,6 +13,9 @@ class User(db.Model):
     email = db.Column(db.String(120), unique=True, nullable=False)
     password_hash = db.Column(db.String(255), nullable=False)
     user_type = db.Column(db.String(20), default='regular')
+    # bumped on user_type changes; starts at random, not 0, as ids are reused
+    # after a delete and a deleted user's tokens must not match the new user
+    role_version = db.Column(db.Integer, nullable=False, default=lambda: secrets.randbelow(2**30), server_default='0')
     profile_picture = db.Column(db.String(255))
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
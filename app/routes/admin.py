@@ -1,11 +1,19 @@
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask_jwt_extended import jwt_required
 from app import db
 from app.models.questionnaire import Questionnaire, Question, AnswerOption
 from app.models.user import User
 from app.models.community import Community, CommunityPost
 from app.models.article import Article
 from app.utils.decorators import admin_required
+from app.utils.helpers import set_user_type
+from app.utils.cache import versioned_response, invalidate, cache_stats
+from app.utils.replica import replica_reads
+from app.utils.search import search
+from app.utils.serialization import stream_json_array
+from app.utils import feed
+from app.routes.questionnaire import questionnaire_stamp, questionnaires_stamp
+from app.routes.community import evict_communities, evict_posts, evict_articles
 
 admin_bp = Blueprint("admin", __name__, url_prefix="/admin")
 
@@ -34,6 +42,7 @@ def add_community():
     community = Community(name=name, description=description, category=category)
     db.session.add(community)
     db.session.commit()
+    evict_communities()
 
     return jsonify({"message": "Community created", "community": community.to_dict()}), 201
 
@@ -50,6 +59,7 @@ def edit_community(community_id):
     community.category = data.get("category", community.category)
 
     db.session.commit()
+    evict_communities()
     return jsonify({"message": "Community updated", "community": community.to_dict()}), 200
 
 
@@ -58,8 +68,12 @@ def edit_community(community_id):
 @admin_required
 def delete_community(community_id):
     community = Community.query.get_or_404(community_id)
+    feed.remove_community(community_id)
     db.session.delete(community)
     db.session.commit()
+    evict_communities()
+    evict_posts(community_id)
+    evict_articles(community_id)
     return jsonify({"message": "Community deleted"}), 200
 
 
@@ -69,9 +83,10 @@ def delete_community(community_id):
 @admin_required
 def list_articles():
     status = request.args.get("status", "approved")  # default to "approved"
-    query = Article.query.filter_by(status=status)
-    articles = query.all()
-    return jsonify([a.to_dict() for a in articles]), 200
+    query = Article.query.filter_by(status=status) \
+        .options(db.defer(Article.embedding), db.joinedload(Article.author), db.joinedload(Article.community)) \
+        .order_by(Article.article_id)
+    return stream_json_array(query, Article.to_dict)
 
 
 @admin_bp.route("/articles/<int:article_id>", methods=["GET"])
@@ -87,8 +102,11 @@ def view_article(article_id):
 @admin_required
 def approve_article(article_id):
     article = Article.query.get_or_404(article_id)
-    article.status = "approved"
+    if article.status != "approved":
+        article.status = "approved"
+        feed.fan_out(article)
     db.session.commit()
+    evict_articles(article.community_id)
     return jsonify({"message": "Article approved"}), 200
 
 
@@ -97,8 +115,10 @@ def approve_article(article_id):
 @admin_required
 def delete_article(article_id):
     article = Article.query.get_or_404(article_id)
+    feed.remove_article(article.article_id)
     db.session.delete(article)
     db.session.commit()
+    evict_articles(article.community_id)
     return jsonify({"message": "Article deleted"}), 200
 
 
@@ -108,9 +128,10 @@ def delete_article(article_id):
 @admin_required
 def list_posts():
     status = request.args.get("status", "approved")  # default to "approved"
-    query = CommunityPost.query.filter_by(status=status)
-    posts = query.all()
-    return jsonify([p.to_dict() for p in posts]), 200
+    query = CommunityPost.query.filter_by(status=status) \
+        .options(db.joinedload(CommunityPost.author)) \
+        .order_by(CommunityPost.post_id)
+    return stream_json_array(query, CommunityPost.to_dict)
 
 
 @admin_bp.route("/posts/<int:post_id>", methods=["GET"])
@@ -128,6 +149,7 @@ def approve_post(post_id):
     post = CommunityPost.query.get_or_404(post_id)
     post.status = "approved"
     db.session.commit()
+    evict_posts(post.community_id)
     return jsonify({"message": "Post approved"}), 200
 
 
@@ -138,27 +160,65 @@ def delete_post(post_id):
     post = CommunityPost.query.get_or_404(post_id)
     db.session.delete(post)
     db.session.commit()
+    evict_posts(post.community_id)
     return jsonify({"message": "Post deleted"}), 200
 
 
+# Response cache hit rates for this process
+@admin_bp.route("/cache/stats", methods=["GET"])
+@jwt_required()
+@admin_required
+def get_cache_stats():
+    return jsonify(cache_stats()), 200
+
+
 # Users
 @admin_bp.route("/users", methods=["GET"])
 @jwt_required()
 @admin_required
 def list_users():
-    users = User.query.all()
-    return jsonify([u.to_dict() for u in users]), 200
+    return stream_json_array(User.query.order_by(User.user_id), User.to_dict)
 
 
 @admin_bp.route("/users/search", methods=["GET"])
 @jwt_required()
 @admin_required
+@replica_reads
 def search_users():
-    q = request.args.get("q", "")
-    users = User.query.filter(
-        (User.user_name.ilike(f"%{q}%")) | (User.email.ilike(f"%{q}%"))
-    ).all()
-    return jsonify([u.to_dict() for u in users]), 200
+    q = request.args.get("q", "").strip()
+    limit = request.args.get("limit", type=int)
+
+    # An empty query lists every user
+    if not q:
+        return jsonify([u.to_dict() for u in User.query.all()]), 200
+
+    # Ranked prefix match on name and email through the user search index.
+    # Without limit every match is returned; with it, one page at a time and
+    # the next page's cursor in X-Next-Cursor.
+    try:
+        rows, next_cursor = search(
+            "users", q,
+            cursor=request.args.get("cursor"),
+            limit=min(max(limit, 1), 100) if limit else None,
+            user_type=request.args.get("user_type")
+        )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    response = jsonify([
+        {
+            "user_id": r["id"],
+            "user_name": r["user_name"],
+            "email": r["email"],
+            "user_type": r["user_type"],
+            "profile_picture": r["profile_picture"],
+            "created_at": r["created_at"].isoformat()
+        }
+        for r in rows
+    ])
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return response, 200
 
 
 @admin_bp.route("/users/<int:user_id>/type", methods=["PATCH"])
@@ -177,7 +237,7 @@ def update_user_type(user_id):
     if new_type not in allowed_types:
         return jsonify({"error": f"Invalid user_type. Allowed: {allowed_types}"}), 400
 
-    user.user_type = new_type
+    set_user_type(user, new_type)
     db.session.commit()
 
     return jsonify({"message": f"user_type updated to '{new_type}'"}), 200
@@ -194,54 +254,8 @@ def delete_user(user_id):
 
 
 #Questionnaires
-# Get all questionnaires
-@admin_bp.route("/questionnaires", methods=["GET"])
-@jwt_required()
-@admin_required
-def get_questionnaires():
-    user_id = get_jwt_identity()
-    user = User.query.get(user_id)
-
-    if not user or user.user_type != "admin":
-        return jsonify({"error": "Unauthorized"}), 403
-
-    questionnaires = Questionnaire.query.all()
-    result = []
-    for q in questionnaires:
-        result.append({
-            "id": q.id,
-            "title": q.title,
-            "description": q.description,
-            "questions": [
-                {
-                    "id": ques.id,
-                    "text": ques.text,
-                    "order": ques.order,
-                    "answers": [
-                        {"id": a.id, "text": a.text, "value": a.value}
-                        for a in ques.answers
-                    ],
-                }
-                for ques in q.questions
-            ],
-        })
-
-    return jsonify(result), 200
-
-
-# Get single questionnaire
-@admin_bp.route("/questionnaires/<int:id>", methods=["GET"])
-@jwt_required()
-@admin_required
-def get_questionnaire(id):
-    user_id = get_jwt_identity()
-    user = User.query.get(user_id)
-
-    if not user or user.user_type != "admin":
-        return jsonify({"error": "Unauthorized"}), 403
-
-    q = Questionnaire.query.get_or_404(id)
-    result = {
+def questionnaire_tree(q):
+    return {
         "id": q.id,
         "title": q.title,
         "description": q.description,
@@ -259,20 +273,98 @@ def get_questionnaire(id):
         ],
     }
 
-    return jsonify(result), 200
 
+def save_questions(questionnaire_id, questions_data, existing=()):
+    # Diff the submitted questions against the existing ones and persist the
+    # result with a handful of set-based statements. Questions and answers
+    # are matched by the "id" the admin GET returned; anything else is new.
+    existing = {q.id: q for q in existing}
+    kept = set()
+    question_updates, answer_updates, answer_inserts, answer_deletes = [], [], [], []
+    new_questions, new_answers = [], {}
 
-@admin_bp.route("/questionnaires", methods=["POST"])
+    for idx, q in enumerate(questions_data, start=1):
+        question = existing.get(q.get("id"))
+        if question is None or question.id in kept:
+            new_questions.append({"questionnaire_id": questionnaire_id, "text": q["text"], "order": idx})
+            new_answers[idx] = q.get("answers", [])
+            continue
+
+        kept.add(question.id)
+        if question.text != q["text"] or question.order != idx:
+            question_updates.append({"id": question.id, "text": q["text"], "order": idx})
+
+        old_answers = {a.id: a for a in question.answers}
+        for ans in q.get("answers", []):
+            answer = old_answers.pop(ans.get("id"), None)
+            if answer is None:
+                answer_inserts.append({"question_id": question.id, "text": ans["text"], "value": ans["value"]})
+            elif answer.text != ans["text"] or answer.value != ans["value"]:
+                answer_updates.append({"id": answer.id, "text": ans["text"], "value": ans["value"]})
+        answer_deletes.extend(old_answers)
+
+    # Remove dropped questions together with their answers
+    removed = [qid for qid in existing if qid not in kept]
+    if removed:
+        AnswerOption.query.filter(AnswerOption.question_id.in_(removed)).delete(synchronize_session=False)
+        Question.query.filter(Question.id.in_(removed)).delete(synchronize_session=False)
+    if answer_deletes:
+        AnswerOption.query.filter(AnswerOption.id.in_(answer_deletes)).delete(synchronize_session=False)
+
+    if question_updates:
+        db.session.bulk_update_mappings(Question, question_updates)
+    if answer_updates:
+        db.session.bulk_update_mappings(AnswerOption, answer_updates)
+
+    if new_questions:
+        # RETURNING pairs each new row with its id in one statement; the order
+        # values come from this payload, so they are distinct among the new rows
+        # whatever other rows of the questionnaire hold
+        ids_by_order = dict(db.session.execute(
+            db.insert(Question).returning(Question.order, Question.id), new_questions
+        ).all())
+        for idx, answers in new_answers.items():
+            answer_inserts.extend(
+                {"question_id": ids_by_order[idx], "text": ans["text"], "value": ans["value"]}
+                for ans in answers
+            )
+
+    if answer_inserts:
+        db.session.bulk_insert_mappings(AnswerOption, answer_inserts)
+
+
+# Get all questionnaires
+@admin_bp.route("/questionnaires", methods=["GET"])
 @jwt_required()
 @admin_required
-def create_questionnaire():
-    user_id = get_jwt_identity()
-    user = User.query.get(user_id)
+def get_questionnaires():
+    def build():
+        questionnaires = Questionnaire.query.options(
+            db.selectinload(Questionnaire.questions).selectinload(Question.answers)
+        ).all()
+        return [questionnaire_tree(q) for q in questionnaires]
+
+    return versioned_response(("questionnaires", "admin"), questionnaires_stamp, build)
+
+
+# Get single questionnaire
+@admin_bp.route("/questionnaires/<int:id>", methods=["GET"])
+@jwt_required()
+@admin_required
+def get_questionnaire(id):
+    def build():
+        q = Questionnaire.query.options(
+            db.selectinload(Questionnaire.questions).selectinload(Question.answers)
+        ).get_or_404(id)
+        return questionnaire_tree(q)
+
+    return versioned_response(("questionnaires", "admin", id), lambda: questionnaire_stamp(id), build)
 
-    # Ensure only admins can do this
-    if not user or user.user_type != "admin":
-        return jsonify({"error": "Unauthorized"}), 403
 
+@admin_bp.route("/questionnaires", methods=["POST"])
+@jwt_required()
+@admin_required
+def create_questionnaire():
     data = request.json
     title = data.get("title")
     description = data.get("description")
@@ -286,23 +378,10 @@ def create_questionnaire():
     db.session.flush()  # get questionnaire.id
 
     # Create questions & answers
-    for idx, q in enumerate(questions_data, start=1):
-        question = Question(
-            questionnaire_id=questionnaire.id,
-            text=q["text"],
-            order=idx
-        )
-        db.session.add(question)
-        db.session.flush()
-
-        for ans in q.get("answers", []):
-            db.session.add(AnswerOption(
-                question_id=question.id,
-                text=ans["text"],
-                value=ans["value"]
-            ))
+    save_questions(questionnaire.id, questions_data)
 
     db.session.commit()
+    invalidate(("questionnaires",))
 
     return jsonify({"message": "Questionnaire created", "id": questionnaire.id}), 201
 
@@ -311,40 +390,21 @@ def create_questionnaire():
 @jwt_required()
 @admin_required
 def update_questionnaire(id):
-    user_id = get_jwt_identity()
-    user = User.query.get(user_id)
-    if not user or user.user_type != "admin":
-        return jsonify({"error": "Unauthorized"}), 403
-
-    questionnaire = Questionnaire.query.get_or_404(id)
+    questionnaire = Questionnaire.query.options(
+        db.selectinload(Questionnaire.questions).selectinload(Question.answers)
+    ).get_or_404(id)
     data = request.json
 
     questionnaire.title = data.get("title", questionnaire.title)
     questionnaire.description = data.get("description", questionnaire.description)
-
+    questionnaire.version = Questionnaire.version + 1
 
     if "questions" in data:
-        # delete old ones
-        Question.query.filter_by(questionnaire_id=questionnaire.id).delete()
-        db.session.flush()
-
-        for idx, q in enumerate(data["questions"], start=1):
-            question = Question(
-                questionnaire_id=questionnaire.id,
-                text=q["text"],
-                order=idx
-            )
-            db.session.add(question)
-            db.session.flush()
-
-            for ans in q.get("answers", []):
-                db.session.add(AnswerOption(
-                    question_id=question.id,
-                    text=ans["text"],
-                    value=ans["value"]
-                ))
+        # only touch rows that changed; dropped questions take their answers along
+        save_questions(questionnaire.id, data["questions"], questionnaire.questions)
 
     db.session.commit()
+    invalidate(("questionnaires",))
     return jsonify({"message": "Questionnaire updated"})
 
 
@@ -352,14 +412,10 @@ def update_questionnaire(id):
 @jwt_required()
 @admin_required
 def delete_questionnaire(id):
-    user_id = get_jwt_identity()
-    user = User.query.get(user_id)
-    if not user or user.user_type != "admin":
-        return jsonify({"error": "Unauthorized"}), 403
-
     questionnaire = Questionnaire.query.get_or_404(id)
     db.session.delete(questionnaire)
     db.session.commit()
+    invalidate(("questionnaires",))
 
     return jsonify({"message": "Questionnaire deleted"})
 
@@ -393,7 +449,7 @@ def approve_professional(user_id):
     if user.user_type != "pending_professional":
         return jsonify({"error": "User is not pending approval"}), 400
 
-    user.user_type = "professional"
+    set_user_type(user, "professional")
     db.session.commit()
 
     return jsonify({"message": "Professional approved", "user": user.to_dict()})
@@ -409,7 +465,7 @@ def reject_professional(user_id):
     if user.user_type != "pending_professional":
         return jsonify({"error": "User is not pending approval"}), 400
 
-    user.user_type = "regular"
+    set_user_type(user, "regular")
     db.session.commit()
 
     return jsonify({"message": "Professional request rejected", "user": user.to_dict()})
@@ -425,7 +481,7 @@ def delete_professional(user_id):
     if user.user_type != "professional":
         return jsonify({"error": "User is not a professional"}), 400
 
-    user.user_type = "regular"
+    set_user_type(user, "regular")
     db.session.commit()
 
     return jsonify({"message": "Professional deleted"})
\ No newline at end of file
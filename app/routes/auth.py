@@ -1,7 +1,8 @@
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
+from flask_jwt_extended import create_access_token, jwt_required
 from app import db
 from app.models.user import User
+from app.utils.helpers import get_current_user, role_claims, set_user_type
 
 auth_bp = Blueprint('auth', __name__)
 
@@ -27,7 +28,7 @@ def register():
         db.session.commit()
 
         # Create access token
-        access_token = create_access_token(identity=str(user.user_id))
+        access_token = create_access_token(identity=str(user.user_id), additional_claims=role_claims(user))
 
         return jsonify({
             'message': 'User registered successfully',
@@ -48,7 +49,7 @@ def login():
         user = User.query.filter_by(email=data['email']).first()
 
         if user and user.check_password(data['password']):
-            access_token = create_access_token(identity=str(user.user_id))
+            access_token = create_access_token(identity=str(user.user_id), additional_claims=role_claims(user))
             return jsonify({
                 'message': 'Login successful',
                 'access_token': access_token,
@@ -65,8 +66,7 @@ def login():
 @jwt_required()
 def get_profile():
     try:
-        user_id = get_jwt_identity()
-        user = User.query.get(user_id)
+        user = get_current_user()
 
         if not user:
             return jsonify({'error': 'User not found'}), 404
@@ -81,8 +81,7 @@ def get_profile():
 @jwt_required()
 def update_profile():
     try:
-        user_id = get_jwt_identity()
-        user = User.query.get(user_id)
+        user = get_current_user()
         data = request.get_json()
 
         if not user:
@@ -110,8 +109,7 @@ def update_profile():
 @jwt_required()
 def upgrade_to_professional():
     try:
-        user_id = get_jwt_identity()
-        user = User.query.get(user_id)
+        user = get_current_user()
 
         if not user:
             return jsonify({'error': 'User not found'}), 404
@@ -120,7 +118,7 @@ def upgrade_to_professional():
             return jsonify({'error': 'Already a professional'}), 400
 
         # Mark as pending professional (admin approval needed)
-        user.user_type = "pending_professional"
+        set_user_type(user, "pending_professional")
         db.session.commit()
 
         return jsonify({
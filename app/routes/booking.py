@@ -3,11 +3,20 @@ from flask_jwt_extended import jwt_required, get_jwt_identity
 from app import db
 from app.models.booking import Booking
 from app.models.user import User
-from app.models.availability import Availability
-from datetime import datetime
+from app.models.availability import Availability, AvailabilityRule, AvailabilityDay
+from app.utils.cache import conditional_get, collection_stamp
+from app.utils.replica import replica_reads
+from app.utils.schedule import expand_rule, ensure_expanded, adjust_free_slots, first_free_day, horizon
+from datetime import datetime, date
 
 booking_bp = Blueprint("booking", __name__)
 
+
+def bookings_stamp(**criteria):
+    # criteria carry the caller's id, so the ETag differs per account
+    return (sorted(criteria.items()),) + \
+        collection_stamp(Booking.query.filter_by(**criteria), Booking.booking_id, Booking.updated_at)
+
 # USER ENDPOINTS
 # Get all professionals (psychologists)
 @booking_bp.route("/professionals", methods=["GET"])
@@ -20,13 +29,109 @@ def get_professionals():
 # Get available slots for a professional
 @booking_bp.route("/availability/<int:professional_id>", methods=["GET"])
 @jwt_required()
+@replica_reads
 def get_professional_availability(professional_id):
-    slots = Availability.query.filter_by(
-        professional_id=professional_id, is_booked=False
+    now = datetime.now()
+    ensure_expanded(professional_id)
+    slots = Availability.query.filter(
+        Availability.professional_id == professional_id,
+        Availability.is_booked == False,
+        Availability.date >= now.date(),
+        db.or_(Availability.date > now.date(), Availability.start_time > now.time())
     ).all()
     return jsonify([s.to_dict() for s in slots])
 
 
+def encode_slot_cursor(slot):
+    return f"{slot.date.isoformat()}T{slot.start_time.isoformat()}_{slot.id}"
+
+
+def decode_slot_cursor(cursor):
+    start, _, slot_id = cursor.partition("_")
+    start = datetime.fromisoformat(start)
+    return start.date(), start.time(), int(slot_id)
+
+
+# Search free slots across all professionals, earliest first.
+# Optional filters: from / to (YYYY-MM-DD), start_after / end_before (HH:MM)
+@booking_bp.route("/availability/search", methods=["GET"])
+@jwt_required()
+@replica_reads
+def search_availability():
+    now = datetime.now()
+    args = request.args
+    limit = min(max(args.get("limit", 20, type=int), 1), 100)
+
+    try:
+        first = max(date.fromisoformat(args["from"]), now.date()) if args.get("from") else now.date()
+        last = date.fromisoformat(args["to"]) if args.get("to") else horizon()
+        start_after = datetime.strptime(args["start_after"], "%H:%M").time() if args.get("start_after") else None
+        end_before = datetime.strptime(args["end_before"], "%H:%M").time() if args.get("end_before") else None
+        cursor = decode_slot_cursor(args["cursor"]) if args.get("cursor") else None
+    except ValueError:
+        return jsonify({"error": "Invalid date, time or cursor"}), 400
+
+    # Skip straight past days the summary says are fully booked
+    day = first_free_day(max(first, cursor[0]) if cursor else first, last)
+    if day is None:
+        return jsonify({"slots": [], "next_cursor": None})
+
+    # Walks ix_availability_date_start_time_is_booked in order and stops
+    # after limit + 1 matches, however many professionals there are
+    query = db.session.query(Availability, User.user_name).join(
+        User, User.user_id == Availability.professional_id
+    ).filter(
+        Availability.is_booked == False,
+        Availability.date.between(day, last),
+        db.or_(Availability.date > now.date(), Availability.start_time > now.time())
+    )
+    if start_after:
+        query = query.filter(Availability.start_time >= start_after)
+    if end_before:
+        query = query.filter(Availability.end_time <= end_before)
+    if cursor:
+        query = query.filter(db.tuple_(Availability.date, Availability.start_time, Availability.id) > cursor)
+
+    rows = query.order_by(Availability.date, Availability.start_time, Availability.id).limit(limit + 1).all()
+    next_cursor = encode_slot_cursor(rows[limit - 1][0]) if len(rows) > limit else None
+
+    return jsonify({
+        "slots": [dict(slot.to_dict(), professional_name=name) for slot, name in rows[:limit]],
+        "next_cursor": next_cursor
+    })
+
+
+# Number of free slots per day across all professionals, for calendar views
+@booking_bp.route("/availability/days", methods=["GET"])
+@jwt_required()
+@replica_reads
+def get_availability_days():
+    now = datetime.now()
+    try:
+        first = max(date.fromisoformat(request.args["from"]), now.date()) if request.args.get("from") else now.date()
+        last = date.fromisoformat(request.args["to"]) if request.args.get("to") else horizon()
+    except ValueError:
+        return jsonify({"error": "Invalid date"}), 400
+    days = AvailabilityDay.query.filter(
+        AvailabilityDay.date.between(first, last),
+        AvailabilityDay.date != now.date(),
+        AvailabilityDay.free_slots > 0
+    ).order_by(AvailabilityDay.date).all()
+    result = [d.to_dict() for d in days]
+
+    # The summary still counts today's slots that have already started, so
+    # today is counted from the slots themselves
+    if first == now.date() <= last:
+        free_today = Availability.query.filter(
+            Availability.date == now.date(),
+            Availability.start_time > now.time(),
+            Availability.is_booked == False
+        ).count()
+        if free_today:
+            result.insert(0, {"date": now.date().isoformat(), "free_slots": free_today})
+    return jsonify(result)
+
+
 # Book a slot
 @booking_bp.route("/book", methods=["POST"])
 @jwt_required()
@@ -34,20 +139,24 @@ def create_booking():
     user_id = get_jwt_identity()
     data = request.json
 
-    slot = Availability.query.get_or_404(data["slot_id"])
-    if slot.is_booked:
+    # Claim the slot atomically: only one concurrent request can flip is_booked
+    claimed = Availability.query.filter_by(id=data["slot_id"], is_booked=False) \
+        .update({"is_booked": True}, synchronize_session=False)
+    if not claimed:
+        db.session.rollback()
+        Availability.query.get_or_404(data["slot_id"])
         return jsonify({"error": "Slot already booked"}), 400
 
+    slot = Availability.query.get(data["slot_id"])
+    adjust_free_slots({slot.date: -1})
     booking = Booking(
         user_id=user_id,
         professional_id=slot.professional_id,
+        slot_id=slot.id,
         appointment_date=datetime.combine(slot.date, slot.start_time),
         notes=data.get("notes")
     )
     db.session.add(booking)
-
-    # mark slot as booked
-    slot.is_booked = True
     db.session.commit()
 
     return jsonify(booking.to_dict()), 201
@@ -56,33 +165,41 @@ def create_booking():
 # View my bookings (as user)
 @booking_bp.route("/bookings/me", methods=["GET"])
 @jwt_required()
+@conditional_get(lambda: bookings_stamp(user_id=get_jwt_identity()))
 def get_my_bookings():
     user_id = get_jwt_identity()
     bookings = Booking.query.filter_by(user_id=user_id).all()
     return jsonify([b.to_dict() for b in bookings])
 
 
+def free_slot(booking):
+    freed = Availability.query.filter_by(id=booking.slot_id, is_booked=True) \
+        .update({"is_booked": False}, synchronize_session=False)
+    if freed:
+        adjust_free_slots({booking.appointment_date.date(): 1})
+
+
 # Cancel my booking
 @booking_bp.route("/bookings/<int:booking_id>/cancel", methods=["PUT"])
 @jwt_required()
 def cancel_booking(booking_id):
-    user_id = get_jwt_identity()
+    user_id = int(get_jwt_identity())
     booking = Booking.query.get_or_404(booking_id)
 
     if booking.user_id != user_id:
         return jsonify({"error": "Unauthorized"}), 403
 
-    # Free up the slot if booking was still active
-    if booking.status in ["pending", "confirmed"]:
-        slot = Availability.query.filter_by(
-            professional_id=booking.professional_id,
-            date=booking.appointment_date.date(),
-            start_time=booking.appointment_date.time()
-        ).first()
-        if slot:
-            slot.is_booked = False
-
-    booking.status = "cancelled"
+    # Free up the slot if booking was still active; checking and cancelling
+    # in one statement means only one request ever frees the slot
+    was_active = Booking.query.filter(
+        Booking.booking_id == booking_id,
+        Booking.status.in_(["pending", "confirmed"])
+    ).update({"status": "cancelled"}, synchronize_session=False)
+    if was_active and booking.slot_id:
+        free_slot(booking)
+    elif not was_active:
+        booking.status = "cancelled"
+
     db.session.commit()
     return jsonify(booking.to_dict())
 
@@ -92,6 +209,7 @@ def cancel_booking(booking_id):
 # View pending booking requests
 @booking_bp.route("/bookings/pending", methods=["GET"])
 @jwt_required()
+@conditional_get(lambda: bookings_stamp(professional_id=get_jwt_identity(), status="pending"))
 def get_pending_bookings():
     professional_id = get_jwt_identity()
     bookings = Booking.query.filter_by(
@@ -123,25 +241,23 @@ def accept_booking(booking_id):
 @booking_bp.route("/bookings/<int:booking_id>/reject", methods=["PUT"])
 @jwt_required()
 def reject_booking(booking_id):
-    professional_id = get_jwt_identity()
+    professional_id = int(get_jwt_identity())
     booking = Booking.query.get_or_404(booking_id)
 
     if booking.professional_id != professional_id:
         return jsonify({"error": "Unauthorized"}), 403
 
-    if booking.status != "pending":
+    # only a still-pending booking can be rejected; the check and the state
+    # change are one statement so a concurrent accept cannot interleave
+    rejected = Booking.query.filter_by(booking_id=booking_id, status="pending") \
+        .update({"status": "cancelled"}, synchronize_session=False)
+    if not rejected:
+        db.session.rollback()
         return jsonify({"error": "Booking already processed"}), 400
 
-    booking.status = "cancelled"
-
     # free up the slot again
-    slot = Availability.query.filter_by(
-        professional_id=booking.professional_id,
-        date=booking.appointment_date.date(),
-        start_time=booking.appointment_date.time()
-    ).first()
-    if slot:
-        slot.is_booked = False
+    if booking.slot_id:
+        free_slot(booking)
 
     db.session.commit()
     return jsonify(booking.to_dict())
@@ -150,6 +266,7 @@ def reject_booking(booking_id):
 # View all my bookings as a professional
 @booking_bp.route("/bookings/professional/me", methods=["GET"])
 @jwt_required()
+@conditional_get(lambda: bookings_stamp(professional_id=get_jwt_identity()))
 def get_professional_bookings():
     professional_id = get_jwt_identity()
     bookings = Booking.query.filter_by(professional_id=professional_id).all()
@@ -172,6 +289,7 @@ def add_availability():
         end_time=datetime.strptime(data["end_time"], "%H:%M").time()
     )
     db.session.add(availability)
+    adjust_free_slots({availability.date: 1})
     db.session.commit()
 
     return jsonify(availability.to_dict()), 201
@@ -181,7 +299,8 @@ def add_availability():
 @booking_bp.route("/availability/me", methods=["GET"])
 @jwt_required()
 def get_my_availability():
-    professional_id = get_jwt_identity()
+    professional_id = int(get_jwt_identity())
+    ensure_expanded(professional_id)
     slots = Availability.query.filter_by(
         professional_id=professional_id,
         is_booked=False
@@ -193,12 +312,90 @@ def get_my_availability():
 @booking_bp.route("/availability/<int:slot_id>", methods=["DELETE"])
 @jwt_required()
 def delete_availability(slot_id):
-    professional_id = get_jwt_identity()
+    professional_id = int(get_jwt_identity())
     slot = Availability.query.get_or_404(slot_id)
 
     if slot.professional_id != professional_id:
         return jsonify({"error": "Unauthorized"}), 403
 
+    if not slot.is_booked:
+        adjust_free_slots({slot.date: -1})
     db.session.delete(slot)
     db.session.commit()
     return jsonify({"message": "Slot deleted"})
+
+
+# Add a recurring availability rule, e.g. Mon/Wed 09:00-12:00 in 30 minute slots
+@booking_bp.route("/availability/rules", methods=["POST"])
+@jwt_required()
+def add_availability_rule():
+    professional_id = int(get_jwt_identity())
+    data = request.json
+
+    try:
+        weekdays = sorted({int(d) for d in data["weekdays"]})
+        rule = AvailabilityRule(
+            professional_id=professional_id,
+            weekdays=",".join(str(d) for d in weekdays),
+            start_time=datetime.strptime(data["start_time"], "%H:%M").time(),
+            end_time=datetime.strptime(data["end_time"], "%H:%M").time(),
+            slot_minutes=int(data["slot_minutes"]),
+            start_date=datetime.fromisoformat(data.get("start_date", date.today().isoformat())).date(),
+            end_date=datetime.fromisoformat(data["end_date"]).date() if data.get("end_date") else None,
+            exceptions=",".join(datetime.fromisoformat(d).date().isoformat() for d in data.get("exceptions", []))
+        )
+    except (KeyError, TypeError, ValueError) as e:
+        return jsonify({"error": f"Invalid rule: {e}"}), 400
+
+    if not weekdays or not all(0 <= d <= 6 for d in weekdays):
+        return jsonify({"error": "weekdays must be numbers from 0 (Monday) to 6 (Sunday)"}), 400
+    if rule.slot_minutes <= 0 or rule.start_time >= rule.end_time:
+        return jsonify({"error": "Invalid time range or slot length"}), 400
+    if rule.end_date and rule.end_date < rule.start_date:
+        return jsonify({"error": "end_date is before start_date"}), 400
+
+    db.session.add(rule)
+    db.session.flush()
+    created = expand_rule(rule)
+    db.session.commit()
+
+    return jsonify({"rule": rule.to_dict(), "slots_created": created}), 201
+
+
+# View my recurring rules
+@booking_bp.route("/availability/rules/me", methods=["GET"])
+@jwt_required()
+def get_my_availability_rules():
+    professional_id = int(get_jwt_identity())
+    rules = AvailabilityRule.query.filter_by(professional_id=professional_id).all()
+    return jsonify([r.to_dict() for r in rules])
+
+
+# Delete a rule together with its future, unbooked slots
+@booking_bp.route("/availability/rules/<int:rule_id>", methods=["DELETE"])
+@jwt_required()
+def delete_availability_rule(rule_id):
+    professional_id = int(get_jwt_identity())
+    rule = AvailabilityRule.query.get_or_404(rule_id)
+
+    if rule.professional_id != professional_id:
+        return jsonify({"error": "Unauthorized"}), 403
+
+    unbooked = Availability.query.filter(
+        Availability.rule_id == rule.id,
+        Availability.is_booked == False,
+        Availability.date >= date.today()
+    )
+    per_day = {day: -count for day, count in unbooked.with_entities(
+        Availability.date, db.func.count()).group_by(Availability.date)}
+    # cancelled or rejected bookings can still point at these slots; the FK
+    # nulls them on delete, but SQLite does not enforce it
+    Booking.query.filter(Booking.slot_id.in_(unbooked.with_entities(Availability.id).scalar_subquery())) \
+        .update({"slot_id": None}, synchronize_session=False)
+    removed = unbooked.delete(synchronize_session=False)
+    adjust_free_slots(per_day)
+    Availability.query.filter_by(rule_id=rule.id).update({"rule_id": None}, synchronize_session=False)
+    db.session.delete(rule)
+    db.session.commit()
+
+    return jsonify({"message": "Rule deleted", "slots_removed": removed})
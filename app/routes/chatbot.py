@@ -1,8 +1,7 @@
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required
-from groq import Groq
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from app.utils.llm import groq_pool, Saturated, UserLimited, LLMTimeout
 from dotenv import load_dotenv
-import os
 import re
 
 
@@ -10,7 +9,7 @@ load_dotenv()
 
 chatbot_bp = Blueprint("chatbot", __name__)
 
-client = Groq(api_key=os.environ.get("GROQ_API_KEY"))
+MODEL = "deepseek-r1-distill-llama-70b"
 
 SYSTEM_PROMPT = (
     "You are a supportive and empathetic assistant in a mental wellbeing app. "
@@ -25,6 +24,9 @@ FALLBACK_MESSAGE = (
     "or a qualified professional. If this is an emergency, please call your local emergency number immediately."
 )
 
+BUSY_MESSAGE = "I’m talking with a lot of people right now. Please try again in a moment."
+TIMEOUT_MESSAGE = "Sorry, that took too long. Please try again."
+
 @chatbot_bp.route("/chat", methods=["POST"])
 @jwt_required()
 def chat():
@@ -35,16 +37,21 @@ def chat():
         return jsonify({"error": "message is required"}), 400
 
     try:
-        chat_completion = client.chat.completions.create(
-            model="deepseek-r1-distill-llama-70b",
-            messages=[
-                {"role": "system", "content": SYSTEM_PROMPT},
-                {"role": "user", "content": user_msg},
-            ],
-        )
+        chat_completion = groq_pool().chat(get_jwt_identity(), MODEL, [
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": user_msg},
+        ])
         reply = chat_completion.choices[0].message.content.strip()
         # Remove <think>...</think> blocks if present
         reply = re.sub(r"<think>.*?</think>", "", reply, flags=re.DOTALL).strip()
+    except Saturated:
+        response = jsonify({"error": "The assistant is busy, please try again shortly", "reply": BUSY_MESSAGE})
+        return response, 503, {"Retry-After": "5"}
+    except UserLimited:
+        response = jsonify({"error": "Please wait for the previous reply", "reply": BUSY_MESSAGE})
+        return response, 429, {"Retry-After": "2"}
+    except LLMTimeout:
+        return jsonify({"error": "The assistant took too long to respond", "reply": TIMEOUT_MESSAGE}), 504
     except Exception as e:
         print("Groq error:", e)
         reply = "Sorry, I’m having trouble responding right now. Try again later."
@@ -5,14 +5,55 @@ from app.models.community import *
 from app.models.article import Article
 from app.models.user import User
 from app import db, sbert_model
+from app.utils.helpers import random_ids, get_current_user
+from app.utils.cache import cached_response, evict, conditional_get, collection_stamp
+from app.utils.replica import replica_reads
+from app.utils import feed
 import numpy as np
-import random
 
 community_bp = Blueprint('community', __name__)
 
+# Public listings are served from the response cache; writes that change
+# what they show evict the affected entries. Random picks are never cached,
+# only the id range they are drawn from (see random_ids).
+
+
+def count_members(community_id, delta):
+    # communities.member_count follows every join and leave
+    Community.query.filter_by(community_id=community_id) \
+        .update({"member_count": Community.member_count + delta}, synchronize_session=False)
+
+
+def evict_communities():
+    evict("communities")
+
+
+def evict_posts(community_id):
+    evict("community_posts", community_id=community_id)
+
+
+def evict_articles(community_id):
+    evict("community_articles", community_id=community_id)
+
+
+def posts_stamp(community_id):
+    return collection_stamp(CommunityPost.query.filter_by(community_id=community_id, status="approved"),
+                            CommunityPost.post_id, CommunityPost.updated_at)
+
+
+def articles_stamp(community_id):
+    return collection_stamp(Article.query.filter_by(community_id=community_id, status="approved"),
+                            Article.article_id, Article.updated_at)
+
+
+def article_stamp(article_id):
+    row = db.session.query(Article.article_id, Article.updated_at).filter_by(article_id=article_id).first()
+    return tuple(row) if row else None
+
 
 @community_bp.route("/communities", methods=["GET"])
 @jwt_required(optional=True)  # allow browsing without login
+@cached_response("communities")
 def get_communities():
     communities = Community.query.all()
     return jsonify([c.to_dict() for c in communities]), 200
@@ -20,15 +61,38 @@ def get_communities():
 
 @community_bp.route("/random", methods=["GET"])
 def get_random_communities():
-    communities = Community.query.order_by(db.func.random()).limit(3).all()
-    return jsonify([c.to_dict() for c in communities]), 200
+    ids = random_ids(Community.community_id, 3)
+    if not ids:
+        return jsonify([]), 200
+
+    rows = db.session.query(
+        Community.community_id,
+        Community.name,
+        Community.description,
+        Community.category,
+        Community.created_at,
+        Community.member_count
+    ).filter(Community.community_id.in_(ids)).all()
+
+    # keep the random order of the sampled ids
+    by_id = {r.community_id: r for r in rows}
+    return jsonify([
+        {
+            'community_id': r.community_id,
+            'name': r.name,
+            'description': r.description,
+            'category': r.category,
+            'member_count': r.member_count,
+            'created_at': r.created_at.isoformat()
+        }
+        for r in (by_id[i] for i in ids if i in by_id)
+    ]), 200
 
 
 @community_bp.route("/communities/<int:community_id>/join", methods=["POST"])
 @jwt_required()
 def join_community(community_id):
-    user_id = get_jwt_identity()
-    user = User.query.get(user_id)
+    user = get_current_user()
 
     if not user:
         return jsonify({"error": "User not found"}), 404
@@ -47,7 +111,10 @@ def join_community(community_id):
 
     membership = CommunityMember(user_id=user.user_id, community_id=community_id)
     db.session.add(membership)
+    count_members(community_id, 1)
+    feed.backfill(user.user_id, community_id)
     db.session.commit()
+    evict_communities()
 
     return jsonify({"message": f"Joined community {community.name}"}), 201
 
@@ -55,25 +122,31 @@ def join_community(community_id):
 @community_bp.route("/communities/<int:community_id>/leave", methods=["DELETE"])
 @jwt_required()
 def leave_community(community_id):
-    user_id = get_jwt_identity()
-    user = User.query.get(user_id)
+    user_id = int(get_jwt_identity())
 
     membership = CommunityMember.query.filter_by(
-        user_id=user.user_id, community_id=community_id
+        user_id=user_id, community_id=community_id
     ).first()
 
     if not membership:
         return jsonify({"error": "Not a member of this community"}), 400
 
     db.session.delete(membership)
+    count_members(community_id, -1)
+    feed.trim(user_id, community_id)
+    feed.refill(community_id)
     db.session.commit()
+    evict_communities()
 
     return jsonify({"message": "Left the community"}), 200
 
 
 @community_bp.route("/communities/<int:community_id>/posts", methods=["GET"])
+@conditional_get(posts_stamp)
+@cached_response("community_posts")
 def get_community_posts(community_id):
-    posts = CommunityPost.query.filter_by(community_id=community_id, status="approved").all()
+    posts = CommunityPost.query.filter_by(community_id=community_id, status="approved") \
+        .options(db.joinedload(CommunityPost.author)).all()
     result = []
     for p in posts:
         result.append({
@@ -90,8 +163,7 @@ def get_community_posts(community_id):
 @community_bp.route("/communities/<int:community_id>/posts", methods=["POST"])
 @jwt_required()
 def add_post(community_id):
-    user_id = get_jwt_identity()
-    user = User.query.get(user_id)
+    user_id = int(get_jwt_identity())
 
     data = request.json
     content = data.get("content")
@@ -101,7 +173,7 @@ def add_post(community_id):
         return jsonify({"error": "Content is required"}), 400
 
     new_post = CommunityPost(
-        user_id=user.user_id,
+        user_id=user_id,
         community_id=community_id,
         content=content,
         post_type=post_type,
@@ -117,27 +189,22 @@ def add_post(community_id):
 @community_bp.route("/posts/<int:post_id>", methods=["DELETE"])
 @jwt_required()
 def delete_post(post_id):
-    user_id = get_jwt_identity()
-    user = User.query.get(user_id)
-
-    if not user:
-        return jsonify({"error": "User not found"}), 404
-
+    user_id = int(get_jwt_identity())
     post = CommunityPost.query.get_or_404(post_id)
 
-    if post.author.user_name != user.user_name:
+    if post.user_id != user_id:
         return jsonify({"error": "You are not authorized to delete this post"}), 403
 
     db.session.delete(post)
     db.session.commit()
+    evict_posts(post.community_id)
     return jsonify({"message": "Post deleted"}), 200
 
 
 @community_bp.route("/communities/<int:community_id>/articles", methods=["POST"])
 @jwt_required()
 def add_article(community_id):
-    user_id = get_jwt_identity()
-    user = User.query.get(user_id)
+    user = get_current_user()
 
     if not user:
         return jsonify({"error": "User not found"}), 404
@@ -175,8 +242,12 @@ def add_article(community_id):
 
 
 @community_bp.route("/communities/<int:community_id>/articles", methods=["GET"])
+@replica_reads
+@conditional_get(articles_stamp)
+@cached_response("community_articles")
 def get_community_articles(community_id):
-    articles = Article.query.filter_by(community_id=community_id, status="approved").all()
+    articles = Article.query.filter_by(community_id=community_id, status="approved") \
+        .options(db.defer(Article.embedding), db.joinedload(Article.author)).all()
     result = []
     for a in articles:
         result.append({
@@ -193,9 +264,10 @@ def get_community_articles(community_id):
 
 @community_bp.route("/articles/<int:article_id>", methods=["GET"])
 @jwt_required()
+@replica_reads
+@conditional_get(article_stamp, last_modified=True)
 def get_article(article_id):
-    user_id = get_jwt_identity()
-    user = User.query.get(user_id)
+    user = get_current_user()
 
     if not user:
         return jsonify({"error": "User not found"}), 404
@@ -205,16 +277,25 @@ def get_article(article_id):
     return jsonify(article.to_dict()), 200
 
 @community_bp.route("/articles/random", methods=["GET"])
+@replica_reads
 def get_random_article():
     try:
-        # Fetch only approved articles
-        articles = Article.query.filter_by(status="approved").all()
+        # Pick a random approved article without loading the table
+        ids = random_ids(Article.article_id, 1, Article.status == "approved")
 
-        if not articles:
+        if not ids:
             return jsonify({"message": "No approved articles found"}), 404
 
-        # Pick a random one
-        article = random.choice(articles)
+        article = db.session.query(
+            Article.article_id,
+            Article.title,
+            Article.content,
+            Article.tags,
+            Article.status,
+            Article.created_at,
+            User.user_name
+        ).outerjoin(User, Article.author_id == User.user_id) \
+            .filter(Article.article_id == ids[0]).one()
 
         result = {
             "article_id": article.article_id,
@@ -223,7 +304,7 @@ def get_random_article():
             "tags": article.tags,
             "status": article.status,
             "created_at": article.created_at.isoformat(),
-            "author": article.author.user_name if article.author else None,
+            "author": article.user_name,
         }
 
         return jsonify(result), 200
@@ -233,32 +314,31 @@ def get_random_article():
 
 @community_bp.route("/articles/feed", methods=["GET"])
 @jwt_required()
+@replica_reads
 def get_feed_articles():
-    user_id = get_jwt_identity()
-    user = User.query.get(user_id)
-
-    memberships = CommunityMember.query.filter_by(user_id=user.user_id).all()
-    community_ids = [m.community_id for m in memberships]
+    user_id = int(get_jwt_identity())
+    before = request.args.get("before", type=int)
+    limit = min(max(request.args.get("limit", 20, type=int), 1), 50)
 
-    articles = Article.query.filter(Article.community_id.in_(community_ids)).all()
-
-    return jsonify([a.to_dict() for a in articles]), 200
+    articles = feed.read_feed(user_id, before, limit + 1)
+    response = jsonify([a.to_dict() for a in articles[:limit]])
+    if len(articles) > limit:
+        # pass back as ?before= for the next page
+        response.headers["X-Next-Cursor"] = str(articles[limit - 1].article_id)
+    return response, 200
 
 
 @community_bp.route("/articles/<int:article_id>", methods=["DELETE"])
 @jwt_required()
 def delete_article(article_id):
-    user_id = get_jwt_identity()
-    user = User.query.get(user_id)
-
-    if not user:
-        return jsonify({"error": "User not found"}), 404
-
+    user_id = int(get_jwt_identity())
     article = Article.query.get_or_404(article_id)
 
-    if article.author.user_name != user.user_name:
+    if article.author_id != user_id:
         return jsonify({"error": "You are not authorized to delete this article"}), 403
 
+    feed.remove_article(article.article_id)
     db.session.delete(article)
     db.session.commit()
+    evict_articles(article.community_id)
     return jsonify({"message": "Article deleted"}), 200
\ No newline at end of file
@@ -4,11 +4,18 @@ from app import db, sbert_model
 from app.models.diary import UserDiary
 from app.models.article import Article
 from app.ml.nlp_recommender import NLPRecommender
+from app.utils.cache import conditional_get, collection_stamp
 from datetime import datetime
 
 diary_bp = Blueprint('diary', __name__)
 
 
+def entries_stamp():
+    user_id = get_jwt_identity()
+    return (user_id,) + collection_stamp(UserDiary.query.filter_by(user_id=user_id),
+                                         UserDiary.diary_id, UserDiary.updated_at)
+
+
 @diary_bp.route('/create_entry', methods=['POST'])
 @jwt_required()
 def create_entry():
@@ -41,6 +48,7 @@ def create_entry():
 
 @diary_bp.route('/entries', methods=['GET'])
 @jwt_required()
+@conditional_get(entries_stamp)
 def get_entries():
     try:
         user_id = get_jwt_identity()
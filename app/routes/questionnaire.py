@@ -2,41 +2,67 @@ from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app import db
 from app.models.questionnaire import Questionnaire, Question, UserResponse, AnswerOption, Submission
+from app.utils.cache import versioned_response
+from app.utils.replica import replica_reads
 
 quiz_bp = Blueprint('quiz', __name__)
 
 
+# version restarts at 1 for every new row and SQLite reuses ids, so the
+# stamp carries created_at too: a recreated questionnaire never matches the
+# ETag of the one it replaced.
+def questionnaire_stamp(id):
+    return db.session.query(Questionnaire.version, Questionnaire.created_at).filter_by(id=id).first()
+
+
+def questionnaires_stamp():
+    return tuple(
+        db.session.query(Questionnaire.id, Questionnaire.version, Questionnaire.created_at)
+        .order_by(Questionnaire.id)
+    )
+
+
 @quiz_bp.route("/questionnaires", methods=["GET"])
 @jwt_required()
+@replica_reads
 def get_all_questionnaires():
-    questionnaires = Questionnaire.query.all()
-    return jsonify([
-        {
-            "id": q.id,
-            "title": q.title,
-            "description": q.description
-        }
-        for q in questionnaires
-    ])
+    def build():
+        questionnaires = Questionnaire.query.all()
+        return [
+            {
+                "id": q.id,
+                "title": q.title,
+                "description": q.description
+            }
+            for q in questionnaires
+        ]
+
+    return versioned_response(("questionnaires", "quiz"), questionnaires_stamp, build)
 
 
 @quiz_bp.route("/questionnaires/<int:id>", methods=["GET"])
 @jwt_required()
+@replica_reads
 def get_questionnaire(id):
-    questionnaire = Questionnaire.query.get_or_404(id)
-    return jsonify({
-        "id": questionnaire.id,
-        "title": questionnaire.title,
-        "description": questionnaire.description,
-        "questions": [
-            {
-                "id": q.id,
-                "text": q.text,
-                "answers": [{"id": a.id, "text": a.text, "value": a.value} for a in q.answers]
-            }
-            for q in sorted(questionnaire.questions, key=lambda x: x.order)
-        ]
-    })
+    def build():
+        questionnaire = Questionnaire.query.options(
+            db.selectinload(Questionnaire.questions).selectinload(Question.answers)
+        ).get_or_404(id)
+        return {
+            "id": questionnaire.id,
+            "title": questionnaire.title,
+            "description": questionnaire.description,
+            "questions": [
+                {
+                    "id": q.id,
+                    "text": q.text,
+                    "answers": [{"id": a.id, "text": a.text, "value": a.value} for a in q.answers]
+                }
+                for q in sorted(questionnaire.questions, key=lambda x: x.order)
+            ]
+        }
+
+    return versioned_response(("questionnaires", "quiz", id), lambda: questionnaire_stamp(id), build)
 
 
 @quiz_bp.route("/questionnaires/<int:id>/submit", methods=["POST"])
@@ -49,15 +75,36 @@ def submit_questionnaire(id):
     if not data:
         return jsonify({"error": "No responses submitted"}), 400
 
+    # Ids may arrive as numbers or numeric strings
+    try:
+        submitted = [
+            (int(r["answer_id"]), int(r["question_id"]) if r.get("question_id") is not None else None)
+            for r in data
+        ]
+    except (KeyError, TypeError, ValueError):
+        return jsonify({"error": "Each answer needs a numeric answer_id; question_id is optional but must be numeric if given"}), 400
+
+    # Fetch every submitted answer in one query, scoped to this questionnaire
+    answers = {
+        a.id: a
+        for a in db.session.query(AnswerOption.id, AnswerOption.question_id, AnswerOption.value)
+        .join(Question, AnswerOption.question_id == Question.id)
+        .filter(Question.questionnaire_id == id, AnswerOption.id.in_([a_id for a_id, _ in submitted]))
+    }
+
     # Calculate score
     total_score = 0
     responses = []
-    for r in data:
-        answer = AnswerOption.query.get(r["answer_id"])
-        if not answer:
-            return jsonify({"error": f"Invalid answer_id {r['answer_id']}"}), 400
+    answered = set()
+    for answer_id, question_id in submitted:
+        answer = answers.get(answer_id)
+        if not answer or question_id not in (None, answer.question_id):
+            return jsonify({"error": f"Invalid answer_id {answer_id}"}), 400
+        if answer.question_id in answered:
+            return jsonify({"error": f"Question {answer.question_id} is answered more than once"}), 400
+        answered.add(answer.question_id)
         total_score += answer.value
-        responses.append((r["question_id"], answer.id))
+        responses.append((answer.question_id, answer.id))
 
     # Simple scoring thresholds (customize per questionnaire)
     if total_score < 5:
@@ -76,8 +123,10 @@ def submit_questionnaire(id):
     db.session.add(submission)
     db.session.flush()  # get submission.id
 
-    for q_id, a_id in responses:
-        db.session.add(UserResponse(submission_id=submission.id, question_id=q_id, answer_id=a_id, user_id=user_id))
+    db.session.execute(db.insert(UserResponse), [
+        {"submission_id": submission.id, "question_id": q_id, "answer_id": a_id, "user_id": user_id}
+        for q_id, a_id in responses
+    ])
 
     db.session.commit()
 
@@ -2,12 +2,14 @@ from flask import Blueprint, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app.models.article import Article
 from app.models.diary import UserDiary
+from app.utils.replica import replica_reads
 import numpy as np
 
 recommendations_bp = Blueprint("recommendations_bp", __name__)
 
 @recommendations_bp.route("/recommendations/home", methods=["GET"])
 @jwt_required()
+@replica_reads
 def recommend_home():
     user_id = get_jwt_identity()
 
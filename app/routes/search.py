@@ -0,0 +1,64 @@
+from flask import Blueprint, request, jsonify
+from flask_jwt_extended import jwt_required
+from app.utils.helpers import current_user_type
+from app.utils.replica import replica_reads
+from app.utils.search import search
+
+search_bp = Blueprint("search", __name__)
+
+
+def run_search(index, serialize):
+    q = request.args.get("q", "").strip()
+    status = request.args.get("status", "approved")
+    limit = min(request.args.get("limit", 20, type=int), 50)
+
+    if not q:
+        return jsonify({"error": "q is required"}), 400
+
+    # Only admins may search content still awaiting moderation
+    if status != "approved":
+        if current_user_type() != "admin":
+            return jsonify({"error": "Admin access required"}), 403
+
+    try:
+        rows, next_cursor = search(
+            index, q,
+            status=status,
+            cursor=request.args.get("cursor"),
+            limit=max(limit, 1),
+            community_id=request.args.get("community_id", type=int)
+        )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    return jsonify({
+        "results": [serialize(r) for r in rows],
+        "next_cursor": next_cursor
+    }), 200
+
+
+@search_bp.route("/articles", methods=["GET"])
+@jwt_required(optional=True)
+@replica_reads
+def search_articles():
+    return run_search("articles", lambda r: {
+        "article_id": r["id"],
+        "title": r["title"],
+        "tags": r["tags"].split(",") if r["tags"] else [],
+        "community_id": r["community_id"],
+        "created_at": r["created_at"].isoformat() if r["created_at"] else None,
+        "score": r["score"]
+    })
+
+
+@search_bp.route("/posts", methods=["GET"])
+@jwt_required(optional=True)
+@replica_reads
+def search_posts():
+    return run_search("posts", lambda r: {
+        "post_id": r["id"],
+        "content": r["content"],
+        "community_id": r["community_id"],
+        "created_at": r["created_at"].isoformat() if r["created_at"] else None,
+        "score": r["score"]
+    })
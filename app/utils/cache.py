@@ -0,0 +1,209 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from flask import current_app, request, abort
+from flask_jwt_extended import get_jwt_identity
+from app import db
+
+_versioned = {}
+_lock = threading.Lock()
+
+
+def versioned_response(key, stamp_fn, build_fn):
+    # Serve JSON cached under a version stamp, with an ETag derived from it.
+    # stamp_fn returns a cheap version marker (None means "not found") and
+    # runs on every request, so an edit made through any worker is seen at
+    # once; build_fn is only called when the stamp moves.
+    stamp = stamp_fn()
+    if stamp is None:
+        invalidate(key)
+        abort(404)
+
+    entry = _versioned.get(key)
+    if entry is None or entry["stamp"] != stamp:
+        body = current_app.json.dumps(build_fn())
+        etag = hashlib.sha1(repr((key, stamp)).encode()).hexdigest()
+        entry = {"stamp": stamp, "etag": etag, "body": body}
+        with _lock:
+            _versioned[key] = entry
+
+    response = current_app.response_class(entry["body"], mimetype="application/json")
+    response.set_etag(entry["etag"])
+    return response.make_conditional(request)
+
+
+def invalidate(*prefixes):
+    # Drop cached entries whose key starts with any of the given prefixes
+    # (all entries when called without arguments).
+    with _lock:
+        for key in list(_versioned):
+            if not prefixes or any(key[:len(p)] == p for p in prefixes):
+                del _versioned[key]
+
+
+# Response cache for public read endpoints. Entries live in a backend that
+# holds opaque bytes: LocalCache (per process, bounded LRU) by default, or
+# RedisCache when RESPONSE_CACHE_URL is set so every worker shares one cache
+# and evictions reach all of them. Tests can install any object with the
+# same get/set/delete_prefix methods via set_backend().
+
+class LocalCache:
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[1] <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete_prefix(self, prefix):
+        with self._lock:
+            for key in [k for k in self._entries if k.startswith(prefix)]:
+                del self._entries[key]
+
+
+class RedisCache:
+    def __init__(self, url, namespace="response:"):
+        import redis  # optional dependency, only needed with RESPONSE_CACHE_URL
+        self.client = redis.Redis.from_url(url)
+        self.namespace = namespace
+
+    def get(self, key):
+        return self.client.get(self.namespace + key)
+
+    def set(self, key, value, ttl):
+        self.client.set(self.namespace + key, value, ex=max(int(ttl), 1))
+
+    def delete_prefix(self, prefix):
+        keys = list(self.client.scan_iter(match=self.namespace + prefix + "*", count=500))
+        if keys:
+            self.client.delete(*keys)
+
+
+_stats = {}
+
+
+def set_backend(app, backend):
+    app.extensions["response_cache"] = backend
+
+
+def backend():
+    cache = current_app.extensions.get("response_cache")
+    if cache is None:
+        url = current_app.config.get("RESPONSE_CACHE_URL")
+        cache = RedisCache(url) if url else LocalCache(current_app.config.get("RESPONSE_CACHE_MAX_ENTRIES", 1024))
+        set_backend(current_app, cache)
+    return cache
+
+
+def cache_key(name, args=None):
+    # "name:" followed by sorted key=value pairs, so evict(name) drops every
+    # variant and evict(name, community_id=3) only that community's entries
+    return name + ":" + "".join(f"{k}={v}&" for k, v in sorted((args or {}).items()))
+
+
+def cached_response(name, ttl=None, vary_on_identity=False, query_args=()):
+    # Cache successful responses of a view under its route arguments, the
+    # listed query string arguments and, with vary_on_identity, the JWT
+    # identity (the view must already be wrapped in jwt_required).
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            parts = dict(kwargs)
+            for arg in query_args:
+                parts[arg] = request.args.get(arg, "")
+            if vary_on_identity:
+                parts["identity"] = get_jwt_identity() or ""
+            key = cache_key(name, parts)
+
+            hit = backend().get(key)
+            count(name, "hits" if hit is not None else "misses")
+            if hit is not None:
+                status, mimetype, body = hit.split(b"\n", 2)
+                return current_app.response_class(body, status=int(status), mimetype=mimetype.decode())
+
+            response = current_app.make_response(view(*args, **kwargs))
+            if response.status_code == 200 and not response.direct_passthrough:
+                value = f"{response.status_code}\n{response.mimetype}\n".encode() + response.get_data()
+                backend().set(key, value, ttl or current_app.config.get("RESPONSE_CACHE_TTL", 60))
+            return response
+        return wrapper
+    return decorator
+
+
+def evict(name, **args):
+    # Drop cached responses of `name`, optionally only those for some route
+    # arguments (which must be the leading ones in sorted order)
+    backend().delete_prefix(cache_key(name, args))
+
+
+def count(name, outcome):
+    with _lock:
+        stats = _stats.setdefault(name, {"hits": 0, "misses": 0})
+        stats[outcome] += 1
+
+
+def cache_stats():
+    with _lock:
+        snapshot = {name: dict(s) for name, s in _stats.items()}
+    return {
+        name: dict(s, hit_rate=round(s["hits"] / (s["hits"] + s["misses"]), 3) if s["hits"] + s["misses"] else None)
+        for name, s in snapshot.items()
+    }
+
+
+# Conditional GET. A view's stamp function returns a cheap fingerprint of
+# what the view would return (None lets the view answer, e.g. with a 404);
+# when the client already holds it the view never runs and no rows are
+# loaded. Collections use collection_stamp(): row count plus the max of the
+# id and updated_at columns moves on every insert, delete and edit.
+
+def collection_stamp(query, *columns):
+    return tuple(query.with_entities(db.func.count(), *[db.func.max(c) for c in columns]).one())
+
+
+def conditional_get(stamp_fn, last_modified=False):
+    # With last_modified the stamp's last element is the row's updated_at and
+    # is sent as Last-Modified. Only item endpoints should set it: a deleted
+    # row would not move a collection's newest timestamp.
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            stamp = stamp_fn(**kwargs)
+            if stamp is None:
+                return view(*args, **kwargs)
+
+            etag = hashlib.sha1(repr((request.full_path, stamp)).encode()).hexdigest()
+            modified = stamp[-1] if last_modified else None
+
+            probe = current_app.response_class()
+            probe.set_etag(etag)
+            probe.last_modified = modified
+            probe.make_conditional(request)
+            if probe.status_code == 304:
+                return probe
+
+            response = current_app.make_response(view(*args, **kwargs))
+            if response.status_code == 200:
+                response.set_etag(etag)
+                response.last_modified = modified
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,97 @@
+import gzip
+import zlib
+from flask import request
+
+try:
+    import brotli
+except ImportError:  # optional, gzip only without it
+    brotli = None
+
+# Response compression, negotiated from Accept-Encoding. Buffered responses
+# are compressed in one go once they reach COMPRESS_MIN_SIZE; streamed ones
+# (stream_json_array) are compressed chunk by chunk and flushed after every
+# chunk so bytes keep flowing to the client.
+
+
+class GzipStream:
+    def __init__(self, level):
+        # wbits 16 + MAX_WBITS writes the gzip header and trailer
+        self._z = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data):
+        return self._z.compress(data) + self._z.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        return self._z.flush()
+
+
+class BrotliStream:
+    def __init__(self, quality):
+        self._c = brotli.Compressor(quality=quality)
+
+    def compress(self, data):
+        return self._c.process(data) + self._c.flush()
+
+    def finish(self):
+        return self._c.finish()
+
+
+def compressor(encoding, config):
+    if encoding == "br":
+        return BrotliStream(config["COMPRESS_BR_QUALITY"])
+    return GzipStream(config["COMPRESS_GZIP_LEVEL"])
+
+
+def compress(data, encoding, config):
+    if encoding == "br":
+        return brotli.compress(data, quality=config["COMPRESS_BR_QUALITY"])
+    return gzip.compress(data, compresslevel=config["COMPRESS_GZIP_LEVEL"])
+
+
+def stream(chunks, encoding, config):
+    encoder = compressor(encoding, config)
+    try:
+        for chunk in chunks:
+            if chunk:
+                yield encoder.compress(chunk)
+        yield encoder.finish()
+    finally:
+        if hasattr(chunks, "close"):
+            chunks.close()
+
+
+def negotiate():
+    offered = ["br", "gzip"] if brotli else ["gzip"]
+    return request.accept_encodings.best_match(offered)
+
+
+def init_compression(app):
+    config = app.config
+
+    @app.after_request
+    def compress_response(response):
+        if not config["COMPRESS_ENABLED"] or response.mimetype not in config["COMPRESS_MIMETYPES"]:
+            return response
+        response.vary.add("Accept-Encoding")
+
+        if (response.status_code < 200 or response.status_code in (204, 206, 304)
+                or response.direct_passthrough or "Content-Encoding" in response.headers):
+            return response
+        encoding = negotiate()
+        if encoding is None:
+            return response
+
+        if response.is_streamed:
+            response.response = stream(response.response, encoding, config)
+            response.headers.pop("Content-Length", None)
+        else:
+            data = response.get_data()
+            if len(data) < config["COMPRESS_MIN_SIZE"]:
+                return response
+            response.set_data(compress(data, encoding, config))
+
+        response.headers["Content-Encoding"] = encoding
+        # the compressed body is a different representation of the same data
+        if response.headers.get("ETag") and not response.headers["ETag"].startswith("W/"):
+            response.headers["ETag"] = "W/" + response.headers["ETag"]
+        return response
@@ -0,0 +1,65 @@
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+
+# Engine tuning by backend, chosen with DB_PROFILE. "tuned" puts SQLite in WAL
+# mode (readers no longer block behind a writer and commits skip a full
+# fsync) with a busy timeout so concurrent writers wait for the lock instead
+# of failing with "database is locked", and gives Postgres a sized, pre-pinged,
+# recycled connection pool. "stock" leaves the driver defaults alone.
+
+
+def engine_options(config, uri=None):
+    if config["DB_PROFILE"] == "stock":
+        return {}
+    if make_url(uri or config["SQLALCHEMY_DATABASE_URI"]).get_backend_name() == "sqlite":
+        # sqlite3's own busy handler, in seconds
+        return {"connect_args": {"timeout": config["SQLITE_BUSY_TIMEOUT"] / 1000}}
+    return {
+        "pool_size": config["DB_POOL_SIZE"],
+        "max_overflow": config["DB_MAX_OVERFLOW"],
+        "pool_timeout": config["DB_POOL_TIMEOUT"],
+        "pool_recycle": config["DB_POOL_RECYCLE"],
+        "pool_pre_ping": True,
+    }
+
+
+def sqlite_pragmas(config, in_memory=False):
+    pragmas = [
+        f"PRAGMA busy_timeout = {config['SQLITE_BUSY_TIMEOUT']}",
+        f"PRAGMA synchronous = {config['SQLITE_SYNCHRONOUS']}",
+        f"PRAGMA cache_size = {config['SQLITE_CACHE_SIZE']}",
+        f"PRAGMA mmap_size = {config['SQLITE_MMAP_SIZE']}",
+        "PRAGMA temp_store = MEMORY",
+    ]
+    # WAL needs a file; an in-memory database stays in its memory journal
+    return pragmas if in_memory else ["PRAGMA journal_mode = WAL"] + pragmas
+
+
+def apply_profile(engine, config):
+    if config["DB_PROFILE"] == "stock" or engine.dialect.name != "sqlite":
+        return
+    pragmas = sqlite_pragmas(config, engine.url.database in (None, "", ":memory:"))
+
+    @event.listens_for(engine, "connect")
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for pragma in pragmas:
+            cursor.execute(pragma)
+        cursor.close()
+
+
+def init_db_profile(app, db):
+    # Engine options have to be in place before db.init_app builds the
+    # engines; pragmas are attached to the engines once they exist
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {
+        **engine_options(app.config), **app.config.get("SQLALCHEMY_ENGINE_OPTIONS", {})
+    }
+    # Binds given as a URL get the options for their own backend
+    app.config["SQLALCHEMY_BINDS"] = {
+        key: {"url": bind, **engine_options(app.config, bind)} if isinstance(bind, str) else bind
+        for key, bind in app.config.get("SQLALCHEMY_BINDS", {}).items()
+    }
+    db.init_app(app)
+    with app.app_context():
+        for engine in db.engines.values():
+            apply_profile(engine, app.config)
@@ -0,0 +1,129 @@
+from flask import current_app
+from sqlalchemy.dialects import postgresql, sqlite
+from app import db
+from app.models.article import Article
+from app.models.community import Community, CommunityMember
+from app.models.feed import FeedEntry
+
+# Article feed for community members. Approved articles are copied into each
+# member's feed_entries (fan-out on write) for communities up to
+# FEED_FANOUT_LIMIT members; bigger communities are skipped at write time
+# and merged in from articles when the feed is read (fan-in on read).
+# Articles record whether they were fanned out, so those approved while a
+# community was large are still merged in after it shrinks. Sizes come from
+# communities.member_count, never from counting members.
+
+
+def member_count(community_id):
+    return db.session.query(Community.member_count).filter_by(community_id=community_id).scalar()
+
+
+def is_large(community_id):
+    return member_count(community_id) > current_app.config["FEED_FANOUT_LIMIT"]
+
+
+def insert_entries(rows):
+    # Rows already in a user's feed are skipped (uq_feed_entries_user_article)
+    dialect = postgresql if db.session.get_bind().dialect.name == "postgresql" else sqlite
+    db.session.execute(
+        dialect.insert(FeedEntry).from_select(["user_id", "article_id", "community_id"], rows)
+        .on_conflict_do_nothing()
+    )
+
+
+def fan_out(article):
+    # Called once when an article becomes approved
+    if is_large(article.community_id):
+        return
+
+    members = db.session.query(
+        CommunityMember.user_id,
+        db.literal(article.article_id),
+        db.literal(article.community_id)
+    ).filter(CommunityMember.community_id == article.community_id)
+    insert_entries(members)
+    article.fanned_out = True
+
+
+def backfill(user_id, community_id):
+    # Seed a new member's feed with the community's latest approved articles
+    if is_large(community_id):
+        return
+
+    recent = db.session.query(
+        db.literal(user_id),
+        Article.article_id,
+        Article.community_id
+    ).filter(
+        Article.community_id == community_id,
+        Article.status == "approved"
+    ).order_by(Article.article_id.desc()).limit(current_app.config["FEED_BACKFILL"])
+    insert_entries(recent)
+
+
+def refill(community_id):
+    # Called after a member leaves. A community back at FEED_FANOUT_LIMIT is
+    # no longer merged in on read, but members who joined while it was large
+    # were never backfilled, so every member gets the backfill now; entries
+    # they already have are skipped.
+    if member_count(community_id) != current_app.config["FEED_FANOUT_LIMIT"]:
+        return
+
+    recent = db.session.query(Article.article_id, Article.community_id).filter(
+        Article.community_id == community_id,
+        Article.status == "approved"
+    ).order_by(Article.article_id.desc()).limit(current_app.config["FEED_BACKFILL"]).subquery()
+    insert_entries(
+        db.session.query(CommunityMember.user_id, recent.c.article_id, recent.c.community_id)
+        .join(recent, db.true())
+        .filter(CommunityMember.community_id == community_id)
+    )
+
+
+def trim(user_id, community_id):
+    FeedEntry.query.filter_by(user_id=user_id, community_id=community_id).delete(synchronize_session=False)
+
+
+def remove_article(article_id):
+    FeedEntry.query.filter_by(article_id=article_id).delete(synchronize_session=False)
+
+
+def remove_community(community_id):
+    FeedEntry.query.filter_by(community_id=community_id).delete(synchronize_session=False)
+
+
+def read_feed(user_id, before=None, limit=20):
+    # Newest first, keyed by article_id; pass the last id seen as `before`
+    communities = db.session.query(Community.community_id, Community.member_count) \
+        .join(CommunityMember, CommunityMember.community_id == Community.community_id) \
+        .filter(CommunityMember.user_id == user_id).all()
+    large = [community_id for community_id, count in communities if count > current_app.config["FEED_FANOUT_LIMIT"]]
+
+    fanned = db.session.query(FeedEntry.article_id).filter(FeedEntry.user_id == user_id)
+    if before:
+        fanned = fanned.filter(FeedEntry.article_id < before)
+    ids = {r.article_id for r in fanned.order_by(FeedEntry.article_id.desc()).limit(limit)}
+
+    if communities:
+        # Everything from communities that are large now, and whatever was
+        # never fanned out from the others
+        merged = db.session.query(Article.article_id).filter(
+            db.or_(
+                Article.community_id.in_(large),
+                db.and_(Article.community_id.in_([c for c, _ in communities]), Article.fanned_out == False)
+            ),
+            Article.status == "approved"
+        )
+        if before:
+            merged = merged.filter(Article.article_id < before)
+        ids.update(r.article_id for r in merged.order_by(Article.article_id.desc()).limit(limit))
+
+    ids = sorted(ids, reverse=True)[:limit]
+    if not ids:
+        return []
+
+    articles = Article.query.options(
+        db.joinedload(Article.author),
+        db.joinedload(Article.community)
+    ).filter(Article.article_id.in_(ids)).all()
+    return sorted(articles, key=lambda a: a.article_id, reverse=True)
@@ -0,0 +1,98 @@
+import random
+from flask import g
+from flask_jwt_extended import get_jwt, get_jwt_identity
+from app import db
+from app.models.user import User
+from app.utils.cache import backend
+
+PROBES = 3  # exact random lookups per pick before walking the index
+ID_RANGE_TTL = 60  # seconds
+
+
+def id_range(pk):
+    # MIN/MAX of a primary key, shared through the cache for ID_RANGE_TTL;
+    # rows added since are only drawn once it expires
+    key = f"id_range:{pk}"
+    cached = backend().get(key)
+    if cached is not None:
+        low, high = cached.split(b",")
+        return int(low), int(high)
+
+    low, high = db.session.query(db.func.min(pk), db.func.max(pk)).one()
+    if low is not None:
+        backend().set(key, f"{low},{high}".encode(), ID_RANGE_TTL)
+    return low, high
+
+
+def random_ids(pk, k=1, *criteria):
+    # Pick up to k distinct primary keys at random without scanning the table.
+    # PROBES random ids per pick are looked up first, in one query; each hit
+    # is a uniform pick. Picks still missing then walk the pk index forward
+    # from a random point to the first row matching criteria, which favours
+    # rows after gaps but always finds one.
+    low, high = id_range(pk)
+    if low is None:
+        return []
+
+    draws = [random.randint(low, high) for _ in range(k * PROBES)]
+    found = {row[0] for row in db.session.query(pk).filter(pk.in_(draws), *criteria)}
+    picked = list(dict.fromkeys(i for i in draws if i in found))[:k]
+
+    while len(picked) < k:
+        probe = random.randint(low, high)
+        query = db.session.query(pk).filter(*criteria)
+        if picked:
+            query = query.filter(pk.notin_(picked))
+
+        row = query.filter(pk >= probe).order_by(pk).limit(1).first()
+        if row is None:
+            # wrap around to the start of the id range
+            row = query.filter(pk < probe).order_by(pk).limit(1).first()
+        if row is None:
+            break
+        picked.append(row[0])
+
+    return picked
+
+
+def get_current_user():
+    # Load the authenticated user at most once per request, and only when a
+    # handler actually asks for it.
+    if "current_user" not in g:
+        user_id = get_jwt_identity()
+        g.current_user = db.session.get(User, int(user_id)) if user_id else None
+    return g.current_user
+
+
+def role_claims(user):
+    # Extra JWT claims so role checks can skip the user lookup
+    return {"user_type": user.user_type, "role_version": user.role_version}
+
+
+def role_version(user_id):
+    # Current role_version of a user, read once per request so a role change
+    # is seen by every worker at once; a single-column primary key lookup
+    if "role_version" not in g:
+        g.role_version = db.session.query(User.role_version).filter_by(user_id=user_id).scalar()
+    return g.role_version
+
+
+def set_user_type(user, user_type):
+    # Every role change bumps role_version, which makes the user_type claim
+    # in tokens issued before the change stale.
+    user.user_type = user_type
+    user.role_version = (user.role_version or 0) + 1
+
+
+def current_user_type():
+    # Trust the token's user_type claim while its role_version is current,
+    # otherwise fall back to the database row.
+    claims = get_jwt()
+    user_id = get_jwt_identity()
+    if not user_id:
+        return None
+    if "user_type" in claims and claims.get("role_version") == role_version(int(user_id)):
+        return claims["user_type"]
+
+    user = get_current_user()
+    return user.user_type if user else None
@@ -0,0 +1,101 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+from flask import current_app
+from app.utils.metrics import llm_timer, LLM_REJECTED
+
+# Outbound LLM calls run on a bounded thread pool with one shared, keep-alive
+# HTTP client. At most CHATBOT_MAX_CONCURRENCY calls are in flight in a
+# process and each user may have CHATBOT_MAX_PER_USER of them; past either
+# limit a call is refused at once instead of tying up another worker. The
+# request gives up after CHATBOT_TIMEOUT seconds even if the SDK is still
+# retrying.
+
+
+_lock = threading.Lock()
+
+
+class Saturated(Exception):
+    # Every slot is taken; callers answer 503
+    pass
+
+
+class UserLimited(Exception):
+    # This user already has CHATBOT_MAX_PER_USER calls running; callers answer 429
+    pass
+
+
+class LLMTimeout(Exception):
+    pass
+
+
+class LLMPool:
+    def __init__(self, client, provider, max_concurrency, max_per_user, timeout):
+        self.client = client
+        self.provider = provider
+        self.timeout = timeout
+        self.max_per_user = max_per_user
+        self.executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix=f"{provider}-llm")
+        self.slots = threading.BoundedSemaphore(max_concurrency)
+        self.per_user = {}
+        self.lock = threading.Lock()
+
+    def claim(self, user):
+        if not self.slots.acquire(blocking=False):
+            LLM_REJECTED.inc(provider=self.provider, reason="saturated")
+            raise Saturated()
+        with self.lock:
+            if self.per_user.get(user, 0) >= self.max_per_user:
+                self.slots.release()
+                LLM_REJECTED.inc(provider=self.provider, reason="user_limit")
+                raise UserLimited()
+            self.per_user[user] = self.per_user.get(user, 0) + 1
+
+    def release(self, user):
+        with self.lock:
+            remaining = self.per_user.pop(user) - 1
+            if remaining:
+                self.per_user[user] = remaining
+        self.slots.release()
+
+    def chat(self, user, model, messages):
+        self.claim(user)
+
+        def call():
+            # The slot is held until the call really ends, even after a timeout
+            try:
+                with llm_timer(self.provider, model):
+                    return self.client.chat.completions.create(model=model, messages=messages)
+            finally:
+                self.release(user)
+
+        future = self.executor.submit(call)
+        try:
+            return future.result(timeout=self.timeout)
+        except TimeoutError:
+            LLM_REJECTED.inc(provider=self.provider, reason="timeout")
+            raise LLMTimeout()
+
+
+def groq_pool():
+    with _lock:
+        pool = current_app.extensions.get("groq")
+        if pool is None:
+            import httpx
+            from groq import Groq
+
+            config = current_app.config
+            limit = config["CHATBOT_MAX_CONCURRENCY"]
+            # base_url is left to the SDK, which honours GROQ_BASE_URL (benchmarks.groq_stub)
+            client = Groq(
+                api_key=os.environ.get("GROQ_API_KEY"),
+                max_retries=config["CHATBOT_MAX_RETRIES"],
+                http_client=httpx.Client(
+                    timeout=httpx.Timeout(config["CHATBOT_TIMEOUT"], connect=config["CHATBOT_CONNECT_TIMEOUT"]),
+                    limits=httpx.Limits(max_connections=limit, max_keepalive_connections=limit),
+                ),
+            )
+            pool = current_app.extensions["groq"] = LLMPool(
+                client, "groq", limit, config["CHATBOT_MAX_PER_USER"], config["CHATBOT_TIMEOUT"]
+            )
+        return pool
@@ -0,0 +1,173 @@
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from functools import wraps
+from flask import g, request, has_request_context, current_app
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# In-process metrics in the Prometheus text format. Recording a sample is a
+# bisect and a few additions under a lock; the text is only rendered when
+# /metrics is scraped. Each worker process keeps its own numbers, so scrape
+# every worker (or put them behind a per-process port).
+
+_lock = threading.Lock()
+REGISTRY = []
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+COUNT_BUCKETS = (1, 2, 3, 5, 10, 20, 50, 100, 250)
+
+
+def _labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ""
+    escape = lambda v: str(v).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+    return "{" + ",".join(f'{k}="{escape(v)}"' for k, v in pairs) + "}"
+
+
+class Counter:
+    def __init__(self, name, help, labels=()):
+        self.name, self.help, self.labels = name, help, tuple(labels)
+        self._series = {}
+        REGISTRY.append(self)
+
+    def inc(self, amount=1, **labels):
+        key = tuple(labels[l] for l in self.labels)
+        with _lock:
+            self._series[key] = self._series.get(key, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with _lock:
+            series = list(self._series.items())
+        lines += [f"{self.name}{_labels(self.labels, key)} {value}" for key, value in series]
+        return lines
+
+
+class Histogram:
+    def __init__(self, name, help, labels=(), buckets=LATENCY_BUCKETS):
+        self.name, self.help, self.labels = name, help, tuple(labels)
+        self.buckets = tuple(buckets)
+        self._series = {}
+        REGISTRY.append(self)
+
+    def observe(self, value, **labels):
+        key = tuple(labels[l] for l in self.labels)
+        i = bisect_left(self.buckets, value)
+        with _lock:
+            series = self._series.get(key)
+            if series is None:
+                # per-bucket counts (the last one is +Inf), sum, count
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][i] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with _lock:
+            series = [(key, list(s[0]), s[1], s[2]) for key, s in self._series.items()]
+        for key, counts, total, count in series:
+            cumulative = 0
+            for bound, n in zip(self.buckets + ("+Inf",), counts):
+                cumulative += n
+                lines.append(f"{self.name}_bucket{_labels(self.labels, key, [('le', bound)])} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labels, key)} {total}")
+            lines.append(f"{self.name}_count{_labels(self.labels, key)} {count}")
+        return lines
+
+
+def render():
+    return "\n".join(line for metric in REGISTRY for line in metric.render()) + "\n"
+
+
+REQUEST_LATENCY = Histogram("http_request_duration_seconds", "Time spent handling a request",
+                            ["blueprint", "endpoint", "method"])
+REQUESTS = Counter("http_requests_total", "Requests handled", ["blueprint", "endpoint", "method", "status"])
+REQUEST_SQL_COUNT = Histogram("http_request_sql_statements", "SQL statements executed per request",
+                              ["endpoint"], buckets=COUNT_BUCKETS)
+REQUEST_SQL_TIME = Histogram("http_request_sql_duration_seconds", "Time spent in SQL per request", ["endpoint"])
+SQL_STATEMENTS = Counter("sql_statements_total", "SQL statements executed, in and out of requests")
+ENCODE_LATENCY = Histogram("encoder_duration_seconds", "Sentence embedding encode() time", ["model"])
+ENCODE_BATCH = Histogram("encoder_batch_size", "Texts per encode() call", ["model"],
+                         buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256, 512))
+LLM_LATENCY = Histogram("llm_request_duration_seconds", "Outbound LLM request time",
+                        ["provider", "model", "outcome"], buckets=LATENCY_BUCKETS + (20, 30, 60))
+LLM_REJECTED = Counter("llm_requests_rejected_total", "LLM requests refused at the concurrency cap or timed out",
+                       ["provider", "reason"])
+
+
+@contextmanager
+def llm_timer(provider, model):
+    start = time.perf_counter()
+    outcome = "error"
+    try:
+        yield
+        outcome = "ok"
+    finally:
+        LLM_LATENCY.observe(time.perf_counter() - start, provider=provider, model=model, outcome=outcome)
+
+
+def instrument_encoder(model, name="sbert"):
+    # Time every encode() call on this model instance and record its batch size
+    encode = model.encode
+
+    @wraps(encode)
+    def timed_encode(sentences, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return encode(sentences, *args, **kwargs)
+        finally:
+            ENCODE_LATENCY.observe(time.perf_counter() - start, model=name)
+            ENCODE_BATCH.observe(1 if isinstance(sentences, str) else len(sentences), model=name)
+
+    model.encode = timed_encode
+    return model
+
+
+# SQL timing for every engine; per-request totals live on flask.g
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_start"].pop()
+    SQL_STATEMENTS.inc()
+    if has_request_context() and "sql_stats" in g:
+        g.sql_stats[0] += 1
+        g.sql_stats[1] += elapsed
+
+
+def init_metrics(app):
+    if not app.config["METRICS_ENABLED"]:
+        return
+
+    @app.before_request
+    def start_timer():
+        g.request_start = time.perf_counter()
+        g.sql_stats = [0, 0.0]
+
+    @app.after_request
+    def record_request(response):
+        if "request_start" not in g or request.endpoint == "metrics":
+            return response
+        endpoint = request.endpoint or "unmatched"
+        blueprint = request.blueprint or ""
+        REQUEST_LATENCY.observe(time.perf_counter() - g.request_start,
+                                blueprint=blueprint, endpoint=endpoint, method=request.method)
+        REQUESTS.inc(blueprint=blueprint, endpoint=endpoint, method=request.method, status=response.status_code)
+        REQUEST_SQL_COUNT.observe(g.sql_stats[0], endpoint=endpoint)
+        REQUEST_SQL_TIME.observe(g.sql_stats[1], endpoint=endpoint)
+        return response
+
+    @app.route("/metrics")
+    def metrics():
+        token = current_app.config.get("METRICS_TOKEN")
+        if token and request.headers.get("Authorization") != f"Bearer {token}":
+            return "", 401
+        return current_app.response_class(render(), mimetype="text/plain; version=0.0.4")
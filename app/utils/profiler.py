@@ -0,0 +1,108 @@
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from flask import g, request
+from flask_jwt_extended import verify_jwt_in_request
+
+# Statistical request profiler. A sampled request registers its thread with
+# a single background sampler, which reads the thread's Python stack every
+# PROFILE_INTERVAL seconds. Stacks are aggregated per endpoint and written
+# to PROFILE_DIR/<endpoint>.folded in the collapsed format that
+# flamegraph.pl, speedscope and inferno read directly.
+#
+# Requests are sampled at PROFILE_SAMPLE_RATE, or on demand when an admin
+# sends "X-Profile: 1". With PROFILE_ENABLED off no hook is installed at all.
+
+_lock = threading.Lock()
+_active = {}  # thread id -> Counter of stacks for the request running on it
+_stacks = {}  # endpoint -> Counter of stacks, across profiled requests
+_wake = threading.Event()
+_sampler = None
+
+
+def frame_name(code):
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def collapse(frame):
+    names = []
+    while frame is not None:
+        names.append(frame_name(frame.f_code))
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+def sample_forever(interval):
+    while True:
+        if not _active:
+            _wake.wait()
+            _wake.clear()
+            continue
+        frames = sys._current_frames()
+        with _lock:
+            for thread_id, stacks in _active.items():
+                frame = frames.get(thread_id)
+                if frame is not None:
+                    stacks[collapse(frame)] += 1
+        time.sleep(interval)
+
+
+def start(interval):
+    global _sampler
+    with _lock:
+        if _sampler is None:
+            _sampler = threading.Thread(target=sample_forever, args=(interval,), name="request-profiler", daemon=True)
+            _sampler.start()
+        stacks = _active[threading.get_ident()] = Counter()
+    _wake.set()
+    return stacks
+
+
+def stop():
+    with _lock:
+        return _active.pop(threading.get_ident(), None)
+
+
+def write(directory, endpoint, stacks):
+    with _lock:
+        total = _stacks.setdefault(endpoint, Counter())
+        total.update(stacks)
+        lines = [f"{stack} {count}\n" for stack, count in total.most_common()]
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"{endpoint}.folded")
+    with open(path + ".tmp", "w") as f:
+        f.writelines(lines)
+    os.replace(path + ".tmp", path)
+
+
+def requested_by_admin():
+    from app.utils.helpers import current_user_type
+    try:
+        verify_jwt_in_request(optional=True)
+        return current_user_type() == "admin"
+    except Exception:
+        return False
+
+
+def init_profiler(app):
+    config = app.config
+    if not config["PROFILE_ENABLED"]:
+        return
+    directory = config["PROFILE_DIR"] or os.path.join(app.instance_path, "profiles")
+
+    @app.before_request
+    def maybe_profile():
+        sampled = random.random() < config["PROFILE_SAMPLE_RATE"]
+        if sampled or (request.headers.get("X-Profile") == "1" and requested_by_admin()):
+            g.profiled = True
+            start(config["PROFILE_INTERVAL"])
+
+    @app.teardown_request
+    def finish_profile(exc=None):
+        if g.pop("profiled", False):
+            stacks = stop()
+            if stacks:
+                write(directory, request.endpoint or "unmatched", stacks)
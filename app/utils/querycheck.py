@@ -0,0 +1,88 @@
+import os
+import re
+import sys
+from collections import Counter, defaultdict
+from flask import g, request, has_request_context, current_app
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# N+1 detector. Every statement a request runs is recorded under its
+# normalized SQL together with the app code line that triggered it; when one
+# statement repeats more than QUERY_DETECTOR_THRESHOLD times the request is
+# reported. QUERY_DETECTOR is "warn" (log it), "raise" (fail the request,
+# which fails the test under pytest) or "off". Unset, it follows the app:
+# raise when TESTING, warn when debug, off otherwise.
+
+APP_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class RepeatedQueryError(Exception):
+    pass
+
+
+def normalize(statement):
+    sql = re.sub(r"\s+", " ", statement).strip()
+    sql = re.sub(r"'(?:[^']|'')*'", "?", sql)
+    sql = re.sub(r"\b\d+(\.\d+)?\b", "?", sql)
+    # IN lists of any length are the same statement
+    return re.sub(r"\((?:\s*(?:\?|%\(\w+\)s|:\w+)\s*,)+\s*(?:\?|%\(\w+\)s|:\w+)\s*\)", "(?)", sql)
+
+
+def call_site():
+    # Innermost frame in app code outside this module
+    frame = sys._getframe(2)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if filename.startswith(APP_ROOT) and filename != __file__:
+            return f"{os.path.relpath(filename, os.path.dirname(APP_ROOT))}:{frame.f_lineno} in {frame.f_code.co_name}"
+        frame = frame.f_back
+    return "<outside app code>"
+
+
+def mode(app):
+    configured = app.config.get("QUERY_DETECTOR")
+    if configured:
+        return configured
+    return "raise" if app.testing else "warn" if app.debug else "off"
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def record_statement(conn, cursor, statement, parameters, context, executemany):
+    if has_request_context() and "query_log" in g:
+        g.query_log[normalize(statement)][call_site()] += 1
+
+
+def repeated(query_log, threshold):
+    return [
+        (sql, sum(sites.values()), sites.most_common(3))
+        for sql, sites in query_log.items()
+        if sum(sites.values()) > threshold
+    ]
+
+
+def report(endpoint, problems):
+    lines = [f"{endpoint}: repeated queries (possible N+1)"]
+    for sql, count, sites in problems:
+        lines.append(f"  {count}x {sql[:300]}")
+        lines += [f"      {n}x from {site}" for site, n in sites]
+    return "\n".join(lines)
+
+
+def init_query_detector(app):
+    @app.before_request
+    def start_query_log():
+        if mode(app) != "off":
+            g.query_log = defaultdict(Counter)
+
+    @app.after_request
+    def check_query_log(response):
+        query_log = g.pop("query_log", None)
+        if not query_log:
+            return response
+        problems = repeated(query_log, current_app.config["QUERY_DETECTOR_THRESHOLD"])
+        if problems:
+            message = report(request.endpoint, problems)
+            if mode(app) == "raise":
+                raise RepeatedQueryError(message)
+            current_app.logger.warning(message)
+        return response
@@ -0,0 +1,155 @@
+import os
+import re
+import time
+from contextlib import contextmanager
+from functools import wraps
+import sqlalchemy as sa
+from flask import current_app, g, has_request_context
+from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request
+from flask_sqlalchemy.session import Session
+
+# Read replica routing. With DATABASE_REPLICA_URL set (the "replica" bind),
+# views wrapped in replica_reads send their SELECTs to the replica; every
+# write, and every read after a write in the same request, stays on the
+# primary. A user who wrote in the last READ_YOUR_WRITES_WINDOW seconds
+# reads from the primary too, so their own changes are never missing. The
+# replica is only used while its lag is under REPLICA_MAX_LAG; the lag is
+# checked at most every REPLICA_LAG_CHECK_INTERVAL seconds per process.
+#
+# Statements are classified by type; text() SQL by whether it starts with
+# SELECT or WITH, so raw reads such as the full-text searches still count as
+# reads.
+#
+# The recent-writer marker lives in the response cache backend. With
+# RESPONSE_CACHE_URL (Redis) every worker sees it; with the default
+# LocalCache it is per process and can be evicted early from the LRU, so a
+# user's next request may reach another worker and read from the replica
+# before their write has arrived. Configure Redis alongside a replica.
+#
+# Locally the replica can be a second SQLite file refreshed from the primary
+# with sync_replica.py; its lag is then the age of the last sync once the
+# primary has been written to since.
+
+REPLICA = "replica"
+READ_SQL = re.compile(r"\s*(SELECT|WITH)\b", re.IGNORECASE)
+
+
+class RoutingSession(Session):
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and not self._flushing and clause is not None and is_read(clause) and reads_from_replica():
+            return self._db.engines[REPLICA]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def is_read(statement):
+    if isinstance(statement, sa.TextClause):
+        return READ_SQL.match(statement.text) is not None
+    if isinstance(statement, sa.TextualSelect):
+        return is_read(statement.element)
+    return getattr(statement, "is_select", False)
+
+
+def reads_from_replica():
+    return has_request_context() and g.get("replica_reads", False) \
+        and not g.get("db_wrote", False) and not g.get("db_pinned", False)
+
+
+@sa.event.listens_for(RoutingSession, "after_flush")
+def flushed(session, flush_context):
+    if has_request_context():
+        g.db_wrote = True
+
+
+@sa.event.listens_for(RoutingSession, "do_orm_execute")
+def executed(state):
+    # Bulk and textual statements bypass the flush
+    if has_request_context() and not is_read(state.statement):
+        g.db_wrote = True
+
+
+@contextmanager
+def on_primary():
+    # Read from the primary inside the block, for reads that decide a write
+    pinned = g.get("db_pinned", False)
+    g.db_pinned = True
+    try:
+        yield
+    finally:
+        g.db_pinned = pinned
+
+
+def current_identity():
+    try:
+        verify_jwt_in_request(optional=True)
+        return get_jwt_identity()
+    except Exception:
+        return None
+
+
+def wrote_recently(identity):
+    from app.utils.cache import backend
+    return identity is not None and backend().get(f"primary:{identity}") is not None
+
+
+def modified(path):
+    # Last write to a SQLite database, which in WAL mode may only touch -wal
+    return max(os.path.getmtime(p) for p in (path, path + "-wal") if os.path.exists(p))
+
+
+def replica_lag(engine):
+    if engine.dialect.name == "postgresql":
+        with engine.connect() as conn:
+            return conn.execute(sa.text(
+                "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+                "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+            )).scalar()
+    if engine.dialect.name == "sqlite":
+        primary = current_app.extensions["sqlalchemy"].engines[None].url.database
+        if not os.path.exists(engine.url.database):
+            raise OSError(f"no replica at {engine.url.database}")
+        # A replica is current until the primary is written after its last
+        # sync; from then on it is as stale as that sync is old
+        synced = modified(engine.url.database)
+        return time.time() - synced if modified(primary) > synced else 0.0
+    return 0.0
+
+
+def replica_usable():
+    engines = current_app.extensions["sqlalchemy"].engines
+    if REPLICA not in engines:
+        return False
+    state = current_app.extensions.setdefault("replica", {"checked": 0.0, "usable": False, "lag": None})
+    now = time.monotonic()
+    if now - state["checked"] >= current_app.config["REPLICA_LAG_CHECK_INTERVAL"]:
+        state["checked"] = now
+        try:
+            state["lag"] = float(replica_lag(engines[REPLICA]))
+            state["usable"] = state["lag"] <= current_app.config["REPLICA_MAX_LAG"]
+        except (sa.exc.SQLAlchemyError, OSError) as e:
+            current_app.logger.warning("read replica unavailable, using the primary: %s", e)
+            state["lag"], state["usable"] = None, False
+    return state["usable"]
+
+
+def replica_reads(view):
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if replica_usable() and not wrote_recently(current_identity()):
+            g.replica_reads = True
+        return view(*args, **kwargs)
+    return wrapper
+
+
+def init_replica(app):
+    if app.config["SQLALCHEMY_BINDS"].get(REPLICA) and not app.config.get("RESPONSE_CACHE_URL"):
+        app.logger.warning("read replica configured without RESPONSE_CACHE_URL: "
+                           "read-your-writes only holds within each worker process")
+
+    @app.after_request
+    def remember_writer(response):
+        if g.get("db_wrote") and app.config["READ_YOUR_WRITES_WINDOW"] > 0:
+            from app.utils.cache import backend
+            identity = current_identity()
+            if identity is not None:
+                backend().set(f"primary:{identity}", b"1", app.config["READ_YOUR_WRITES_WINDOW"])
+        return response
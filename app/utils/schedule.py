@@ -0,0 +1,171 @@
+from bisect import bisect_left
+from collections import Counter
+from datetime import date, datetime, timedelta
+from itertools import accumulate
+from flask import current_app
+from sqlalchemy.exc import OperationalError
+from app import db
+from app.models.availability import Availability, AvailabilityRule, AvailabilityDay
+from app.utils.replica import on_primary
+
+# Recurring availability. Rules are expanded into Availability rows with one
+# bulk insert, but only up to AVAILABILITY_HORIZON_DAYS ahead. The window is
+# rolled forward as time passes by expand_availability.py, run daily (cron),
+# and for one professional by the views that list that professional's
+# slots; the searches across professionals only read.
+#
+# availability_days keeps a running count of free slots per day; every write
+# that creates, books, frees or removes a slot goes through adjust_free_slots()
+# in the same transaction. Bookings on the same day therefore update one
+# summary row, but only for the rest of a short transaction that already
+# claimed its slot; benchmarks/booking_contention.py books 500 slots of one
+# day at the same rate as slots spread over many days.
+
+
+def horizon():
+    return date.today() + timedelta(days=current_app.config["AVAILABILITY_HORIZON_DAYS"])
+
+
+def candidate_slots(rule, first, last):
+    weekdays = {int(d) for d in rule.weekdays.split(",")}
+    skipped = set(rule.exceptions.split(",")) if rule.exceptions else set()
+    length = timedelta(minutes=rule.slot_minutes)
+
+    day = first
+    while day <= last:
+        if day.weekday() in weekdays and day.isoformat() not in skipped:
+            start = datetime.combine(day, rule.start_time)
+            close = datetime.combine(day, rule.end_time)
+            while start + length <= close:
+                yield day, start.time(), (start + length).time()
+                start += length
+        day += timedelta(days=1)
+
+
+def claim(rules, until):
+    # Move expanded_until of every rule that is still behind `until` (or its
+    # end_date) forward in one statement and return the ids it moved. Of two
+    # requests expanding the same rule only the first finds it behind, so
+    # only that one inserts its slots.
+    target = db.case((AvailabilityRule.end_date < until, AvailabilityRule.end_date), else_=until)
+    return set(db.session.execute(
+        db.update(AvailabilityRule).where(
+            AvailabilityRule.id.in_([rule.id for rule in rules]),
+            db.or_(AvailabilityRule.expanded_until.is_(None), AvailabilityRule.expanded_until < target)
+        ).values(expanded_until=target).returning(AvailabilityRule.id)
+    ).scalars())
+
+
+def expand_rules(rules, until=None):
+    # Materialize the slots of several rules from where each last stopped up
+    # to `until`, skipping any that overlap slots the professional already
+    # has and any that have already started today. A fixed number of
+    # statements however many rules there are: one claim, one read of the
+    # existing slots, one insert and one day summary update. Returns the
+    # number of slots created.
+    now = datetime.now()
+    until = until or horizon()
+    stopped = {rule.id: rule.expanded_until for rule in rules}  # before claim() moves them
+    claimed = claim(rules, until) if rules else set()
+
+    ranges = {}
+    for rule in sorted(rules, key=lambda r: r.id):
+        first = max(rule.start_date, now.date(),
+                    stopped[rule.id] + timedelta(days=1) if stopped[rule.id] else date.min)
+        last = min(until, rule.end_date or date.max)
+        if rule.id in claimed and first <= last:
+            ranges[rule] = first, last
+    if not ranges:
+        return 0
+
+    # Existing slots of those professionals over the whole range in one
+    # query, grouped per professional and day as start-sorted intervals with
+    # a running max of end times
+    taken = {}
+    for slot in Availability.query.with_entities(
+                Availability.professional_id, Availability.date, Availability.start_time, Availability.end_time) \
+            .filter(Availability.professional_id.in_({rule.professional_id for rule in ranges}),
+                    Availability.date.between(min(f for f, _ in ranges.values()), max(l for _, l in ranges.values()))) \
+            .order_by(Availability.professional_id, Availability.date, Availability.start_time):
+        taken.setdefault((slot.professional_id, slot.date), []).append((slot.start_time, slot.end_time))
+    taken = {
+        key: ([s for s, _ in intervals], list(accumulate((e for _, e in intervals), max)))
+        for key, intervals in taken.items()
+    }
+
+    rows, added = [], {}
+    for rule, (first, last) in ranges.items():
+        for day, start, end in candidate_slots(rule, first, last):
+            if day == now.date() and start <= now.time():
+                continue
+            key = (rule.professional_id, day)
+            if key in taken:
+                starts, max_ends = taken[key]
+                i = bisect_left(starts, end)  # existing slots starting before this one ends
+                if i and max_ends[i - 1] > start:
+                    continue
+            # slots made for the professional's other rules in this batch
+            if any(s < end and start < e for s, e in added.get(key, ())):
+                continue
+            added.setdefault(key, []).append((start, end))
+            rows.append({
+                "professional_id": rule.professional_id,
+                "rule_id": rule.id,
+                "date": day,
+                "start_time": start,
+                "end_time": end,
+                "is_booked": False
+            })
+
+    if rows:
+        db.session.execute(db.insert(Availability), rows)
+        adjust_free_slots(Counter(r["date"] for r in rows))
+    return len(rows)
+
+
+def expand_rule(rule, until=None):
+    return expand_rules([rule], until)
+
+
+def ensure_expanded(professional_id=None):
+    # Roll every rule of a professional (or of everyone, from
+    # expand_availability.py) forward to the current horizon
+    until = horizon()
+    query = AvailabilityRule.query
+    if professional_id is not None:
+        query = query.filter(AvailabilityRule.professional_id == professional_id)
+    with on_primary():
+        rules = query.filter(
+            db.or_(AvailabilityRule.expanded_until.is_(None), AvailabilityRule.expanded_until < until),
+            db.or_(AvailabilityRule.end_date.is_(None), AvailabilityRule.expanded_until.is_(None),
+                   AvailabilityRule.expanded_until < AvailabilityRule.end_date)
+        ).all()
+    if not rules:
+        return 0
+    try:
+        created = expand_rules(rules, until)
+        db.session.commit()
+    except OperationalError:
+        # SQLite refuses the claim when another request wrote since this
+        # one started reading; that request is doing the expansion
+        db.session.rollback()
+        return 0
+    return created
+
+
+def adjust_free_slots(deltas):
+    # Apply {date: change} to the per-day free slot summary
+    rows = [{"date": day, "delta": delta} for day, delta in deltas.items() if delta]
+    if rows:
+        db.session.execute(db.text(
+            "INSERT INTO availability_days (date, free_slots) VALUES (:date, :delta) "
+            "ON CONFLICT (date) DO UPDATE SET free_slots = availability_days.free_slots + excluded.free_slots"
+        ).bindparams(db.bindparam("date", type_=db.Date)), rows)
+
+
+def first_free_day(first, last):
+    # Earliest day in range that still has a free slot, from the summary
+    return db.session.query(db.func.min(AvailabilityDay.date)).filter(
+        AvailabilityDay.date.between(first, last),
+        AvailabilityDay.free_slots > 0
+    ).scalar()
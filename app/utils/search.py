@@ -0,0 +1,207 @@
+import base64
+import json
+import re
+from sqlalchemy import event, text
+from app import db
+
+# Full-text indexes over content and accounts. SQLite uses external-content
+# FTS5 tables kept in sync by triggers; Postgres uses generated tsvector
+# columns with GIN indexes. The backend follows the dialect of DATABASE_URL.
+INDEXES = {
+    "articles": {
+        "table": "articles",
+        "pk": "article_id",
+        "fts": "articles_fts",
+        "columns": ["title", "content", "tags"],
+        "weights": "10.0, 1.0, 4.0",
+        "fields": "t.article_id AS id, t.title, t.tags, t.community_id, t.created_at",
+        "filters": ["status", "community_id"],
+    },
+    "posts": {
+        "table": "community_posts",
+        "pk": "post_id",
+        "fts": "community_posts_fts",
+        "columns": ["content"],
+        "weights": "1.0",
+        "fields": "t.post_id AS id, t.content, t.community_id, t.created_at",
+        "filters": ["status", "community_id"],
+    },
+    "users": {
+        "table": "user",
+        "pk": "user_id",
+        "fts": "user_fts",
+        "columns": ["user_name", "email"],
+        "weights": "2.0, 1.0",
+        "fields": "t.user_id AS id, t.user_name, t.email, t.user_type, t.profile_picture, t.created_at",
+        "filters": ["user_type"],
+    },
+}
+
+RANK_LIMIT = 2000
+
+POSTGRES_VECTORS = {
+    "articles": "setweight(to_tsvector('simple', coalesce(title, '')), 'A') || "
+                "setweight(to_tsvector('simple', coalesce(tags, '')), 'B') || "
+                "setweight(to_tsvector('simple', coalesce(content, '')), 'C')",
+    "posts": "to_tsvector('simple', coalesce(content, ''))",
+    # split emails on @ and . so every part of the address is a prefix target
+    "users": "setweight(to_tsvector('simple', coalesce(user_name, '')), 'A') || "
+             "setweight(to_tsvector('simple', regexp_replace(email, '[@.]', ' ', 'g')), 'B')",
+}
+
+
+def sqlite_ddl(spec, quote):
+    table, pk, fts = quote(spec["table"]), spec["pk"], spec["fts"]
+    cols = ", ".join(spec["columns"])
+    new = ", ".join(f"new.{c}" for c in spec["columns"])
+    old = ", ".join(f"old.{c}" for c in spec["columns"])
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5({cols}, content='{spec['table']}', "
+        f"content_rowid='{pk}', prefix='2 3')",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} BEGIN "
+        f"INSERT INTO {fts}(rowid, {cols}) VALUES (new.{pk}, {new}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.{pk}, {old}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF {cols} ON {table} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.{pk}, {old}); "
+        f"INSERT INTO {fts}(rowid, {cols}) VALUES (new.{pk}, {new}); END",
+        f"INSERT INTO {fts}({fts}) VALUES ('rebuild')",
+    ]
+
+
+def postgres_ddl(name, spec, quote):
+    table = quote(spec["table"])
+    return [
+        f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS search_vector tsvector "
+        f"GENERATED ALWAYS AS ({POSTGRES_VECTORS[name]}) STORED",
+        f"CREATE INDEX IF NOT EXISTS ix_{spec['table']}_search_vector ON {table} USING gin (search_vector)",
+    ]
+
+
+# The migrations carry their own copy of this DDL, so changing it here needs
+# a new migration as well
+def install(connection, names=INDEXES):
+    dialect = connection.dialect.name
+    quote = connection.dialect.identifier_preparer.quote
+    for name in names:
+        spec = INDEXES[name]
+        if dialect == "sqlite":
+            statements = sqlite_ddl(spec, quote)
+        elif dialect == "postgresql":
+            statements = postgres_ddl(name, spec, quote)
+        else:
+            statements = []
+        for statement in statements:
+            connection.exec_driver_sql(statement)
+
+
+def uninstall(connection, names=INDEXES):
+    dialect = connection.dialect.name
+    quote = connection.dialect.identifier_preparer.quote
+    for name in names:
+        spec = INDEXES[name]
+        if dialect == "sqlite":
+            for suffix in ("ai", "ad", "au"):
+                connection.exec_driver_sql(f"DROP TRIGGER IF EXISTS {spec['fts']}_{suffix}")
+            connection.exec_driver_sql(f"DROP TABLE IF EXISTS {spec['fts']}")
+        elif dialect == "postgresql":
+            connection.exec_driver_sql(f"DROP INDEX IF EXISTS ix_{spec['table']}_search_vector")
+            connection.exec_driver_sql(f"ALTER TABLE {quote(spec['table'])} DROP COLUMN IF EXISTS search_vector")
+
+
+# Keep db.create_all() / db.drop_all() (clean_db.py) in step with migrations
+@event.listens_for(db.metadata, "after_create")
+def create_search_indexes(target, connection, **kw):
+    install(connection)
+
+
+@event.listens_for(db.metadata, "before_drop")
+def drop_search_indexes(target, connection, **kw):
+    uninstall(connection)
+
+
+def encode_cursor(score, id):
+    return base64.urlsafe_b64encode(json.dumps([score, id]).encode()).decode()
+
+
+def decode_cursor(cursor):
+    try:
+        score, id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return (None if score is None else float(score)), int(id)
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor")
+
+
+def search(index, q, cursor=None, limit=20, **filters):
+    # Ranked search returning (rows, next_cursor). Every term must match and
+    # is matched as a prefix, so search-as-you-type works. Filters are
+    # equality checks on the columns listed for the index; None skips one.
+    # limit=None returns every hit.
+    #
+    # Scoring every hit of a broad prefix ("an") costs time linear in the
+    # number of hits, so once a query matches RANK_LIMIT rows results come
+    # back newest first straight off the index instead, with score None.
+    terms = re.findall(r"\w+", q.lower())[:8]
+    # one-letter prefixes expand to most of the index without narrowing much
+    terms = [t for t in terms if len(t) > 1] or terms
+    if not terms:
+        return [], None
+
+    spec = INDEXES[index]
+    table = db.engine.dialect.identifier_preparer.quote(spec["table"])
+    params = {"limit": limit + 1} if limit else {}
+    limit_clause = "LIMIT :limit" if limit else ""
+
+    if db.engine.dialect.name == "postgresql":
+        params["query"] = " & ".join(f"{t}:*" for t in terms)
+        source = f"{table} t"
+        conditions = ["t.search_vector @@ to_tsquery('simple', :query)"]
+        # float8, as ts_rank_cd's real would never equal the cursor's score
+        rank = "ts_rank_cd(t.search_vector, to_tsquery('simple', :query))::float8"
+        rowid = f"t.{spec['pk']}"
+    else:
+        params["query"] = " ".join(f'"{t}"*' for t in terms)
+        source = f"{spec['fts']} JOIN {table} t ON t.{spec['pk']} = {spec['fts']}.rowid"
+        conditions = [f"{spec['fts']} MATCH :query"]
+        rank = f"-bm25({spec['fts']}, {spec['weights']})"
+        rowid = f"{spec['fts']}.rowid"
+
+    for column, value in filters.items():
+        if column not in spec["filters"]:
+            raise ValueError(f"Cannot filter {index} by {column}")
+        if value is not None:
+            conditions.append(f"t.{column} = :{column}")
+            params[column] = value
+
+    if cursor:
+        params["score"], params["id"] = decode_cursor(cursor)
+        ranked = params["score"] is not None
+    else:
+        hits = db.session.execute(text(
+            f"SELECT count(*) FROM (SELECT 1 FROM {source} WHERE {' AND '.join(conditions)} "
+            f"LIMIT {RANK_LIMIT}) AS m"
+        ), params).scalar()
+        ranked = hits < RANK_LIMIT
+
+    if ranked:
+        where = "WHERE score < :score OR (score = :score AND id < :id)" if cursor else ""
+        sql = (
+            f"SELECT * FROM (SELECT {spec['fields']}, {rank} AS score FROM {source} "
+            f"WHERE {' AND '.join(conditions)}) AS hits {where} ORDER BY score DESC, id DESC {limit_clause}"
+        )
+    else:
+        if cursor:
+            conditions.append(f"{rowid} < :id")
+        sql = (
+            f"SELECT {spec['fields']}, NULL AS score FROM {source} "
+            f"WHERE {' AND '.join(conditions)} ORDER BY {rowid} DESC {limit_clause}"
+        )
+
+    statement = text(sql).columns(created_at=db.DateTime)
+    rows = [dict(r._mapping) for r in db.session.execute(statement, params)]
+
+    next_cursor = None
+    if limit and len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1]["score"], rows[-1]["id"])
+    return rows, next_cursor
@@ -0,0 +1,74 @@
+# Admin user export: jsonify() of a fully built list against
+# stream_json_array() with the orjson provider. Reports time to first byte,
+# total time and peak Python memory (tracemalloc).
+#
+#   python -m benchmarks.admin_export [users]
+import sys
+import time
+import tracemalloc
+
+from flask import jsonify
+from flask.json.provider import DefaultJSONProvider
+from app import create_app, db
+from app.config import Config
+from app.models.user import User
+from app.utils.serialization import FastJSONProvider, stream_json_array
+
+# Always a scratch database, never DATABASE_URL: the benchmark drops its tables
+Config.SQLALCHEMY_DATABASE_URI = "sqlite:///bench_export.db"
+app = create_app()
+
+
+def seed(n, batch=50_000):
+    for start in range(0, n, batch):
+        db.session.bulk_insert_mappings(User, [
+            {"user_name": f"user {i}", "email": f"user{i}@mindful.lk", "password_hash": "x", "user_type": "regular"}
+            for i in range(start, min(start + batch, n))
+        ])
+        db.session.commit()
+
+
+def built():
+    return jsonify([u.to_dict() for u in User.query.order_by(User.user_id).all()])
+
+
+def streamed():
+    return stream_json_array(User.query.order_by(User.user_id), User.to_dict)
+
+
+def measure(make_response):
+    db.session.expunge_all()
+    tracemalloc.start()
+    start = time.perf_counter()
+    chunks = iter(make_response().response)
+    first = next(chunks)
+    ttfb = time.perf_counter() - start
+    size = len(first) + sum(len(c) for c in chunks)
+    total = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return ttfb * 1000, total * 1000, peak / 2**20, size / 2**20
+
+
+def main(n=200_000):
+    with app.app_context():
+        db.create_all()
+        if User.query.count() != n:
+            db.drop_all()
+            db.create_all()
+            seed(n)
+
+        with app.test_request_context():
+            for label, provider, make_response in [
+                ("jsonify, stdlib", DefaultJSONProvider(app), built),
+                ("jsonify, orjson", FastJSONProvider(app), built),
+                ("stream, orjson", FastJSONProvider(app), streamed),
+            ]:
+                app.json = provider
+                ttfb, total, peak, size = measure(make_response)
+                print(f"{label:<16} ttfb {ttfb:8.1f} ms  total {total:8.1f} ms  "
+                      f"peak {peak:7.1f} MiB  body {size:6.1f} MiB")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:2]))
@@ -0,0 +1,95 @@
+# Fire many concurrent create_booking requests at the same slot and check
+# that exactly one wins, then measure throughput when requests are spread
+# over distinct slots (no request should wait on an unrelated slot). The
+# last run puts every slot on one day, so each booking also updates the same
+# availability_days row; its throughput should stay close to the spread run.
+#
+#   python -m benchmarks.booking_contention [requests] [workers]
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, time as dtime, timedelta
+
+from flask_jwt_extended import create_access_token
+from app import create_app, db
+from app.config import Config
+from app.models.availability import Availability, AvailabilityDay
+from app.models.booking import Booking
+from app.models.user import User
+
+# Always a scratch database, never DATABASE_URL: the benchmark drops its tables
+Config.SQLALCHEMY_DATABASE_URI = "sqlite:///bench_booking.db"
+app = create_app()
+
+
+def setup(n_requests, per_day=16):
+    db.drop_all()
+    db.create_all()
+
+    pro = User(user_name="pro", email="pro@bench.io", password_hash="x", user_type="professional")
+    db.session.add(pro)
+    db.session.flush()
+    db.session.bulk_insert_mappings(User, [
+        {"user_name": f"client{i}", "email": f"client{i}@bench.io", "password_hash": "x"}
+        for i in range(n_requests)
+    ])
+    start = date.today() + timedelta(days=1)
+    db.session.bulk_insert_mappings(Availability, [
+        {"professional_id": pro.user_id, "date": start + timedelta(days=i // per_day),
+         "start_time": dtime(8 + (i % 16) // 2, 30 * (i % 2)),
+         "end_time": dtime(8 + (i % 16) // 2, 30 * (i % 2) + 29), "is_booked": False}
+        for i in range(n_requests)
+    ])
+    db.session.bulk_insert_mappings(AvailabilityDay, [
+        {"date": day, "free_slots": count}
+        for day, count in db.session.query(Availability.date, db.func.count()).group_by(Availability.date)
+    ])
+    db.session.commit()
+
+    clients = [u.user_id for u in User.query.filter(User.user_type != "professional")]
+    slots = [s.id for s in Availability.query.order_by(Availability.id)]
+    tokens = [create_access_token(identity=str(uid)) for uid in clients]
+    return tokens, slots
+
+
+def fire(requests, workers):
+    def book(args):
+        token, slot_id = args
+        with app.test_client() as client:
+            response = client.post("/api/booking/book", json={"slot_id": slot_id},
+                                   headers={"Authorization": f"Bearer {token}"})
+            return response.status_code
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        statuses = list(pool.map(book, requests))
+    elapsed = time.perf_counter() - start
+
+    counts = {code: statuses.count(code) for code in sorted(set(statuses))}
+    return counts, elapsed
+
+
+def main(n_requests=500, workers=32):
+    with app.app_context():
+        tokens, slots = setup(n_requests)
+
+        counts, elapsed = fire([(t, slots[0]) for t in tokens], workers)
+        winners = Booking.query.count()
+        print(f"one slot:   {n_requests} requests in {elapsed:.2f}s "
+              f"({n_requests / elapsed:.0f} req/s) status={counts} bookings={winners}")
+        assert counts.get(201) == 1 and winners == 1, "expected exactly one winner"
+
+        counts, elapsed = fire(list(zip(tokens[1:], slots[1:])), workers)
+        print(f"many slots: {n_requests - 1} requests in {elapsed:.2f}s "
+              f"({(n_requests - 1) / elapsed:.0f} req/s) status={counts}")
+
+        tokens, slots = setup(n_requests, per_day=n_requests)
+        counts, elapsed = fire(list(zip(tokens, slots)), workers)
+        free = db.session.query(AvailabilityDay.free_slots).scalar()
+        print(f"one day:    {n_requests} requests in {elapsed:.2f}s "
+              f"({n_requests / elapsed:.0f} req/s) status={counts} free_slots left={free}")
+        assert free == n_requests - counts.get(201, 0), "availability_days out of step"
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:3]))
@@ -0,0 +1,95 @@
+# A burst of chats against a slow LLM (benchmarks.groq_stub) while other
+# users browse, served by a fixed number of request workers as under
+# gunicorn. Without a cap the chats hold every worker and browsing stalls;
+# with CHATBOT_MAX_CONCURRENCY the extra chats get 503 at once and browsing
+# keeps its latency.
+#
+#   python -m benchmarks.chatbot_saturation [chats] [workers] [llm_seconds]
+import http.client
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///bench_chat.db")
+
+from flask_jwt_extended import create_access_token
+from werkzeug.serving import WSGIRequestHandler, make_server
+
+from app import create_app, db
+from app.config import Config
+from benchmarks import groq_stub
+
+
+def limit_workers(wsgi_app, workers):
+    # Only `workers` requests are handled at a time, like a sync worker pool
+    slots = threading.BoundedSemaphore(workers)
+
+    def app(environ, start_response):
+        with slots:
+            return list(wsgi_app(environ, start_response))
+    return app
+
+
+class QuietHandler(WSGIRequestHandler):
+    def log_request(self, *args):
+        pass
+
+
+def call(port, path, token, body=None):
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=120)
+    start = time.perf_counter()
+    conn.request("POST" if body else "GET", path, body=json.dumps(body) if body else None,
+                 headers={"Authorization": f"Bearer {token}", "Content-Type": "application/json"})
+    status = conn.getresponse().status
+    conn.close()
+    return status, time.perf_counter() - start
+
+
+def run(label, cap, chats, workers):
+    Config.CHATBOT_MAX_CONCURRENCY = cap
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        tokens = [create_access_token(identity=str(i)) for i in range(chats + 1)]
+
+    server = make_server("127.0.0.1", 0, limit_workers(app, workers), threaded=True,
+                         request_handler=QuietHandler)
+    port = server.server_port
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    with ThreadPoolExecutor(max_workers=chats) as pool:
+        burst = [pool.submit(call, port, "/api/chatbot/chat", tokens[i], {"message": "I feel stressed"})
+                 for i in range(chats)]
+        time.sleep(0.2)
+        browsing = [call(port, "/api/quiz/questionnaires", tokens[-1]) for _ in range(10)]
+        results = [f.result() for f in burst]
+    server.shutdown()
+
+    statuses = {}
+    for status, _ in results:
+        statuses[status] = statuses.get(status, 0) + 1
+    refused = [t for s, t in results if s == 503]
+    browse = sorted(t for _, t in browsing)
+    print(f"\n{label} (CHATBOT_MAX_CONCURRENCY={cap}, {workers} workers, {chats} chats)")
+    print(f"  chat statuses      {dict(sorted(statuses.items()))}")
+    if refused:
+        print(f"  503 answered in    {statistics.median(refused) * 1000:.1f} ms median")
+    print(f"  browse during burst median {statistics.median(browse) * 1000:.1f} ms, max {browse[-1] * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    chats = int(sys.argv[1]) if len(sys.argv) > 1 else 40
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else 16
+    latency = float(sys.argv[3]) if len(sys.argv) > 3 else 3.0
+
+    cap = Config.CHATBOT_MAX_CONCURRENCY
+    stub, url = groq_stub.start(latency=latency, jitter=0)
+    os.environ["GROQ_BASE_URL"] = url
+    os.environ["GROQ_API_KEY"] = "stub"
+    run("uncapped", chats, chats, workers)
+    run("capped", cap, chats, workers)
+    stub.shutdown()
@@ -0,0 +1,61 @@
+# Bytes saved and CPU cost of response compression per payload size, for
+# tuning COMPRESS_GZIP_LEVEL / COMPRESS_BR_QUALITY / COMPRESS_MIN_SIZE.
+# Payloads are article listings shaped like get_community_articles output.
+#
+#   python -m benchmarks.compression
+import json
+import random
+import statistics
+import time
+
+from app.utils import compression
+
+WORDS = ("mindful breathing anxiety sleep stress journal gratitude therapy support community wellbeing "
+         "focus calm balance routine reflection counselling habits exercise kindness").split()
+
+
+def payload(size):
+    rng = random.Random(size)
+    articles = []
+    while len(json.dumps(articles)) < size:
+        articles.append({
+            "article_id": len(articles) + 1,
+            "title": " ".join(rng.choices(WORDS, k=6)).title(),
+            "content": " ".join(rng.choices(WORDS, k=rng.randint(20, 400))),
+            "tags": ",".join(rng.sample(WORDS, 3)),
+            "status": "approved",
+            "created_at": "2026-10-19T12:00:00",
+            "author": f"user {rng.randint(1, 5000)}",
+        })
+    return json.dumps(articles).encode()[:size]
+
+
+def timed(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        out = fn()
+        samples.append(time.perf_counter() - start)
+    return out, statistics.median(samples)
+
+
+def main():
+    settings = [("gzip", level) for level in (1, 6, 9)]
+    if compression.brotli:
+        settings += [("br", quality) for quality in (1, 4, 5, 8, 11)]
+    else:
+        print("brotli not installed, gzip only")
+
+    for size in (512, 1024, 4096, 16_384, 65_536, 262_144, 1_048_576):
+        data = payload(size)
+        repeat = max(3, min(200, 2_000_000 // size))
+        print(f"\n{size:>9} bytes")
+        for encoding, level in settings:
+            config = {"COMPRESS_GZIP_LEVEL": level, "COMPRESS_BR_QUALITY": level}
+            out, seconds = timed(lambda: compression.compress(data, encoding, config), repeat)
+            print(f"  {encoding:<4} {level:>2}  {len(out):>9} bytes  saved {1 - len(out) / len(data):6.1%}  "
+                  f"{seconds * 1e6:9.1f} us  {len(data) / seconds / 2**20:7.1f} MiB/s")
+
+
+if __name__ == "__main__":
+    main()
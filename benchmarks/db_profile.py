@@ -0,0 +1,81 @@
+# Concurrent read/write throughput on SQLite with DB_PROFILE=stock (rollback
+# journal, driver defaults) against DB_PROFILE=tuned (WAL and pragmas from
+# app.utils.db_profile). Writers add diary entries, readers page through
+# recent entries and count them, all at once for a fixed time.
+#
+#   python -m benchmarks.db_profile [seconds] [writers] [readers]
+import os
+import statistics
+import sys
+import threading
+import time
+
+from sqlalchemy.exc import OperationalError
+
+from app import create_app, db
+from app.config import Config
+from app.models.diary import UserDiary
+from app.models.user import User
+
+
+def run(profile, seconds, writers, readers):
+    Config.DB_PROFILE = profile
+    Config.SQLALCHEMY_DATABASE_URI = f"sqlite:///bench_profile_{profile}.db"
+    app = create_app()
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        db.session.add(User(user_id=1, user_name="writer", email="writer@bench.io", password_hash="x"))
+        db.session.execute(db.insert(UserDiary), [
+            {"user_id": 1, "content": f"seed entry {i}", "mood_rating": i % 10} for i in range(20_000)
+        ])
+        db.session.commit()
+        journal = db.session.execute(db.text("PRAGMA journal_mode")).scalar()
+
+    results = {"write": [], "read": []}
+    errors = {"write": 0, "read": 0}
+    deadline = time.monotonic() + seconds
+
+    def worker(kind, action):
+        with app.app_context():
+            while time.monotonic() < deadline:
+                start = time.perf_counter()
+                try:
+                    action()
+                    results[kind].append(time.perf_counter() - start)
+                except OperationalError:
+                    # "database is locked"
+                    db.session.rollback()
+                    errors[kind] += 1
+
+    def write():
+        db.session.add(UserDiary(user_id=1, content="concurrent entry", mood_rating=5))
+        db.session.commit()
+
+    def read():
+        UserDiary.query.filter_by(user_id=1).order_by(UserDiary.diary_id.desc()).limit(50).all()
+        db.session.query(db.func.count(UserDiary.diary_id)).scalar()
+        db.session.commit()
+
+    threads = [threading.Thread(target=worker, args=("write", write)) for _ in range(writers)] + \
+              [threading.Thread(target=worker, args=("read", read)) for _ in range(readers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    print(f"\n{profile} (journal_mode={journal})")
+    for kind, times in results.items():
+        times.sort()
+        p95 = times[int(len(times) * 0.95)] * 1000 if times else 0
+        p50 = statistics.median(times) * 1000 if times else 0
+        print(f"  {kind:<6} {len(times) / seconds:>8.1f} ops/s   p50 {p50:>7.2f} ms   p95 {p95:>8.2f} ms   "
+              f"locked errors {errors[kind]}")
+
+
+if __name__ == "__main__":
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 10
+    writers = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    readers = int(sys.argv[3]) if len(sys.argv) > 3 else 8
+    for profile in ("stock", "tuned"):
+        run(profile, seconds, writers, readers)
@@ -0,0 +1,79 @@
+# Local stand-in for the Groq chat completions API, so load tests and
+# benchmarks run without network access or an API key. Point the app at it
+# with GROQ_BASE_URL=http://127.0.0.1:<port>.
+#
+#   python -m benchmarks.groq_stub [--port 8089] [--latency 0.4] [--error-rate 0.02]
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+REPLY = "<think>stub reasoning</think>That sounds like a lot to carry. Taking a short walk or writing it down can help."
+
+
+def handler(latency, jitter, error_rate):
+    class GroqStub(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            time.sleep(max(0.0, random.gauss(latency, jitter)))
+
+            if random.random() < error_rate:
+                self.reply(503, {"error": {"message": "stub overloaded", "type": "service_unavailable"}})
+                return
+
+            prompt = sum(len(m.get("content", "").split()) for m in body.get("messages", []))
+            self.reply(200, {
+                "id": f"chatcmpl-stub-{time.monotonic_ns()}",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": body.get("model", "stub"),
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": REPLY},
+                    "finish_reason": "stop",
+                }],
+                "usage": {"prompt_tokens": prompt, "completion_tokens": 24, "total_tokens": prompt + 24},
+            })
+
+        def reply(self, status, payload):
+            data = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            try:
+                self.wfile.write(data)
+            except (BrokenPipeError, ConnectionResetError):
+                pass  # the client timed out and went away
+
+        def log_message(self, *args):
+            pass
+
+    return GroqStub
+
+
+def start(port=0, latency=0.4, jitter=0.1, error_rate=0.0):
+    # Serve from a daemon thread; returns (server, base_url)
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler(latency, jitter, error_rate))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local Groq API stub")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--latency", type=float, default=0.4, help="mean seconds per completion")
+    parser.add_argument("--jitter", type=float, default=0.1)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of 503 replies")
+    args = parser.parse_args()
+    server, url = start(args.port, args.latency, args.jitter, args.error_rate)
+    print(f"Groq stub listening on {url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
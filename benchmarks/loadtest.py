@@ -0,0 +1,357 @@
+# Mixed-traffic load test over every blueprint against a seeded database,
+# with the Groq chatbot answered by benchmarks.groq_stub. Reports p50/p95/p99
+# latency, throughput and error rate per endpoint, can save the run as a
+# baseline and compare later runs against one.
+#
+#   python -m benchmarks.seed --reset
+#   python -m benchmarks.loadtest --users 20 --duration 60 --save baseline.json
+#   python -m benchmarks.loadtest --compare baseline.json --threshold 0.25
+#
+# By default the app is started in a subprocess on the werkzeug server with
+# DATABASE_URL as seeded; --url aims the load at an already running server
+# (e.g. gunicorn) instead. Exits with status 1 when --compare finds
+# regressions.
+import argparse
+import gzip
+import http.client
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from urllib.parse import urlsplit
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///bench_seed.db")
+
+from benchmarks import groq_stub
+
+PERSONAS = {"member": 0.8, "professional": 0.12, "admin": 0.08}
+QUERIES = ["stress", "sleep", "anx", "mindful", "work", "friend", "yoga"]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Load test the API")
+    parser.add_argument("--users", type=int, default=20, help="concurrent virtual users")
+    parser.add_argument("--duration", type=float, default=60, help="seconds of load")
+    parser.add_argument("--think", type=float, default=0.0, help="mean pause between a user's requests")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--url", help="target an already running server instead of starting one")
+    parser.add_argument("--port", type=int, default=5055)
+    parser.add_argument("--llm-latency", type=float, default=0.4, help="mean Groq stub reply time")
+    parser.add_argument("--save", help="write the results to this JSON file")
+    parser.add_argument("--compare", help="baseline JSON file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed relative p95 growth")
+    parser.add_argument("--serve", action="store_true", help=argparse.SUPPRESS)
+    return parser.parse_args()
+
+
+def serve(port):
+    from werkzeug.serving import WSGIRequestHandler, run_simple
+    from app import create_app
+
+    WSGIRequestHandler.protocol_version = "HTTP/1.1"  # keep-alive
+    run_simple("127.0.0.1", port, create_app(), threaded=True)
+
+
+def start_server(args, groq_url):
+    env = dict(os.environ, GROQ_BASE_URL=groq_url, GROQ_API_KEY="stub")
+    process = subprocess.Popen(
+        [sys.executable, "-m", "benchmarks.loadtest", "--serve", "--port", str(args.port)],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    deadline = time.monotonic() + 120
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            sys.exit("server exited during startup")
+        try:
+            socket.create_connection(("127.0.0.1", args.port), timeout=1).close()
+            return process
+        except OSError:
+            time.sleep(0.5)
+    process.kill()
+    sys.exit("server did not start")
+
+
+def fixtures():
+    # Ids the scenarios pick from, read straight from the seeded database
+    from app import create_app, db
+    from app.models.user import User
+    from app.models.community import Community
+    from app.models.article import Article
+    from app.models.questionnaire import Questionnaire
+
+    with create_app().app_context():
+        emails = lambda kind: [e for e, in db.session.query(User.email).filter_by(user_type=kind).limit(500)]
+        found = {
+            "member": emails("regular"),
+            "professional": emails("professional"),
+            "admin": emails("admin"),
+            "communities": [i for i, in db.session.query(Community.community_id)],
+            "articles": [i for i, in db.session.query(Article.article_id).filter_by(status="approved").limit(2000)],
+            "questionnaires": [i for i, in db.session.query(Questionnaire.id)],
+        }
+    if not found["member"] or not found["communities"]:
+        sys.exit("database is empty, run python -m benchmarks.seed first")
+    return found
+
+
+class Client:
+    def __init__(self, base_url, samples):
+        url = urlsplit(base_url)
+        self.host, self.port = url.hostname, url.port or 80
+        self.samples = samples
+        self.token = None
+        self.connect()
+
+    def connect(self):
+        self.conn = http.client.HTTPConnection(self.host, self.port, timeout=60)
+
+    def call(self, name, method, path, body=None, ok=(200, 201)):
+        headers = {"Accept-Encoding": "gzip"}
+        if self.token:
+            headers["Authorization"] = f"Bearer {self.token}"
+        if body is not None:
+            body = json.dumps(body)
+            headers["Content-Type"] = "application/json"
+
+        start = time.perf_counter()
+        try:
+            self.conn.request(method, "/api" + path, body=body, headers=headers)
+            response = self.conn.getresponse()
+            data = response.read()
+            status = response.status
+            if response.getheader("Content-Encoding") == "gzip":
+                data = gzip.decompress(data)
+        except (OSError, http.client.HTTPException):
+            self.conn.close()
+            self.connect()
+            status, data = 0, b""
+        self.samples.setdefault(name, []).append((time.perf_counter() - start, status in ok))
+
+        try:
+            return status, json.loads(data) if data else None
+        except ValueError:
+            return status, None
+
+
+# Scenarios: each takes (client, rng, fixtures) and issues a few requests
+
+def browse(c, rng, fx):
+    community = rng.choice(fx["communities"])
+    c.call("community.get_communities", "GET", "/community/communities")
+    c.call("community.get_community_posts", "GET", f"/community/communities/{community}/posts")
+    c.call("community.get_community_articles", "GET", f"/community/communities/{community}/articles")
+    c.call("community.get_article", "GET", f"/community/articles/{rng.choice(fx['articles'])}")
+    c.call("community.get_random_article", "GET", "/community/articles/random")
+
+
+def feed(c, rng, fx):
+    c.call("community.get_feed_articles", "GET", "/community/articles/feed")
+    c.call("search.search_articles", "GET", f"/search/articles?q={rng.choice(QUERIES)}")
+
+
+def write_post(c, rng, fx):
+    c.call("community.add_post", "POST", f"/community/communities/{rng.choice(fx['communities'])}/posts",
+           {"content": f"load test post {rng.random()}"})
+
+
+def diary(c, rng, fx):
+    c.call("diary.create_entry", "POST", "/diary/create_entry",
+           {"content": "Felt calmer after a walk, work stress is lower this week", "mood_rating": rng.randint(1, 10),
+            "tags": ["work", "walk"]}, ok=(201,))
+    c.call("diary.get_entries", "GET", "/diary/entries")
+
+
+def recommendations(c, rng, fx):
+    c.call("recommendations.recommend_home", "GET", "/recommendations/recommendations/home")
+
+
+def questionnaire(c, rng, fx):
+    if not fx["questionnaires"]:
+        return
+    quiz_id = rng.choice(fx["questionnaires"])
+    c.call("quiz.get_all_questionnaires", "GET", "/quiz/questionnaires")
+    status, quiz = c.call("quiz.get_questionnaire", "GET", f"/quiz/questionnaires/{quiz_id}")
+    if status == 200:
+        answers = [{"question_id": q["id"], "answer_id": rng.choice(q["answers"])["id"]} for q in quiz["questions"]]
+        c.call("quiz.submit_questionnaire", "POST", f"/quiz/questionnaires/{quiz_id}/submit", {"answers": answers})
+
+
+def chat(c, rng, fx):
+    c.call("chatbot.chat", "POST", "/chatbot/chat", {"message": "I can't sleep before exams, any tips?"})
+
+
+def book(c, rng, fx):
+    status, found = c.call("booking.search_availability", "GET", "/booking/availability/search?limit=50")
+    if status != 200 or not found["slots"]:
+        return
+    slot = rng.choice(found["slots"])
+    # losing the race for a slot is expected under load
+    status, booking = c.call("booking.create_booking", "POST", "/booking/book", {"slot_id": slot["id"]}, ok=(201, 400))
+    if status == 201 and rng.random() < 0.7:
+        c.call("booking.cancel_booking", "PUT", f"/booking/bookings/{booking['booking_id']}/cancel")
+    c.call("booking.get_my_bookings", "GET", "/booking/bookings/me")
+
+
+def profile(c, rng, fx):
+    c.call("auth.get_profile", "GET", "/auth/profile")
+
+
+def professional_day(c, rng, fx):
+    status, pending = c.call("booking.get_pending_bookings", "GET", "/booking/bookings/pending")
+    if status == 200 and pending:
+        booking = rng.choice(pending)
+        action = "accept" if rng.random() < 0.8 else "reject"
+        c.call(f"booking.{action}_booking", "PUT", f"/booking/bookings/{booking['booking_id']}/{action}", ok=(200, 400))
+    c.call("booking.get_my_availability", "GET", "/booking/availability/me")
+    c.call("booking.get_professional_bookings", "GET", "/booking/bookings/professional/me")
+
+
+def moderate(c, rng, fx):
+    status, posts = c.call("admin.list_posts", "GET", "/admin/posts?status=pending")
+    if status == 200 and posts:
+        c.call("admin.approve_post", "PATCH", f"/admin/posts/{rng.choice(posts[:20])['post_id']}/approve")
+    c.call("admin.search_users", "GET", f"/admin/users/search?q={rng.choice(['regular', 'prof', 'seed'])}")
+    c.call("admin.get_questionnaires", "GET", "/admin/questionnaires")
+    c.call("admin.get_cache_stats", "GET", "/admin/cache/stats")
+
+
+SCENARIOS = {
+    "member": [(browse, 30), (feed, 15), (diary, 12), (recommendations, 10), (questionnaire, 8),
+               (book, 8), (write_post, 5), (chat, 7), (profile, 5)],
+    "professional": [(professional_day, 70), (browse, 20), (profile, 10)],
+    "admin": [(moderate, 80), (browse, 20)],
+}
+
+
+def personas(users):
+    # Fixed head count per persona so every run has the same mix, with at
+    # least one professional and one admin
+    counts = {name: max(1, round(users * share)) for name, share in PERSONAS.items() if name != "member"}
+    return ["admin"] * counts["admin"] + ["professional"] * counts["professional"] + \
+        ["member"] * max(0, users - sum(counts.values()))
+
+
+def virtual_user(number, persona, args, base_url, fx, deadline):
+    rng = random.Random(args.seed * 1000 + number)
+    accounts = fx[persona] or fx["member"]
+    samples = {}
+    client = Client(base_url, samples)
+
+    status, login = client.call("auth.login", "POST", "/auth/login",
+                                {"email": accounts[number % len(accounts)], "password": "password"})
+    if status != 200:
+        return samples
+    client.token = login["access_token"]
+
+    scenarios, weights = zip(*SCENARIOS[persona])
+    while time.monotonic() < deadline:
+        rng.choices(scenarios, weights=weights)[0](client, rng, fx)
+        if args.think:
+            time.sleep(rng.expovariate(1 / args.think))
+    return samples
+
+
+def percentile(ordered, q):
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def summarize(runs, elapsed):
+    merged = {}
+    for samples in runs:
+        for name, values in samples.items():
+            merged.setdefault(name, []).extend(values)
+
+    endpoints = {}
+    for name, values in sorted(merged.items()):
+        latencies = sorted(v[0] for v in values)
+        endpoints[name] = {
+            "count": len(values),
+            "rps": round(len(values) / elapsed, 2),
+            "error_rate": round(sum(1 for v in values if not v[1]) / len(values), 4),
+            "p50": round(percentile(latencies, 0.50) * 1000, 2),
+            "p95": round(percentile(latencies, 0.95) * 1000, 2),
+            "p99": round(percentile(latencies, 0.99) * 1000, 2),
+        }
+    return endpoints
+
+
+def report(endpoints, elapsed):
+    print(f"\n{'endpoint':<40} {'count':>7} {'rps':>8} {'err%':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for name, e in endpoints.items():
+        print(f"{name:<40} {e['count']:>7} {e['rps']:>8} {e['error_rate'] * 100:>6.1f} "
+              f"{e['p50']:>9} {e['p95']:>9} {e['p99']:>9}")
+    total = sum(e["count"] for e in endpoints.values())
+    errors = sum(e["count"] * e["error_rate"] for e in endpoints.values())
+    print(f"\n{total} requests in {elapsed:.1f}s, {total / elapsed:.1f} req/s, "
+          f"{errors / max(total, 1) * 100:.2f}% errors")
+
+
+def compare(endpoints, baseline, threshold):
+    # p95 growth beyond the threshold (ignoring sub-5ms noise) or an error
+    # rate more than a point higher counts as a regression
+    regressions = []
+    for name, base in baseline["endpoints"].items():
+        current = endpoints.get(name)
+        if current is None:
+            continue
+        if current["p95"] > base["p95"] * (1 + threshold) and current["p95"] - base["p95"] > 5:
+            regressions.append(f"{name}: p95 {base['p95']} -> {current['p95']} ms")
+        if current["error_rate"] > base["error_rate"] + 0.01:
+            regressions.append(f"{name}: error rate {base['error_rate']:.2%} -> {current['error_rate']:.2%}")
+    return regressions
+
+
+def main():
+    args = parse_args()
+    if args.serve:
+        serve(args.port)
+        return
+
+    fx = fixtures()
+    stub, groq_url = groq_stub.start(latency=args.llm_latency)
+    server = None if args.url else start_server(args, groq_url)
+    base_url = args.url or f"http://127.0.0.1:{args.port}"
+
+    try:
+        start = time.monotonic()
+        deadline = start + args.duration
+        with ThreadPoolExecutor(max_workers=args.users) as pool:
+            runs = list(pool.map(lambda n, p: virtual_user(n, p, args, base_url, fx, deadline),
+                                 range(args.users), personas(args.users)))
+        elapsed = time.monotonic() - start
+    finally:
+        if server:
+            server.terminate()
+            server.wait()
+        stub.shutdown()
+
+    endpoints = summarize(runs, elapsed)
+    report(endpoints, elapsed)
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump({
+                "meta": {"users": args.users, "duration": args.duration, "seed": args.seed,
+                         "think": args.think, "recorded_at": datetime.utcnow().isoformat()},
+                "endpoints": endpoints,
+            }, f, indent=2)
+        print(f"saved {args.save}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(endpoints, json.load(f), args.threshold)
+        if regressions:
+            print("\nREGRESSIONS")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print(f"\nno regressions against {args.compare}")
+
+
+if __name__ == "__main__":
+    main()
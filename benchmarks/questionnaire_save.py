@@ -0,0 +1,75 @@
+# Compare the per-row flush path admin questionnaire writes used to take
+# with the set-based save_questions() path.
+#
+#   python -m benchmarks.questionnaire_save [questions] [answers_per_question]
+import sys
+import time
+
+from sqlalchemy import event
+from app import create_app, db
+from app.config import Config
+from app.models.questionnaire import Questionnaire, Question, AnswerOption
+from app.routes.admin import save_questions
+
+# Always a scratch database, never DATABASE_URL: the benchmark drops its tables
+Config.SQLALCHEMY_DATABASE_URI = "sqlite://"
+app = create_app()
+
+
+def legacy_save(questionnaire_id, questions_data):
+    Question.query.filter_by(questionnaire_id=questionnaire_id).delete()
+    db.session.flush()
+    for idx, q in enumerate(questions_data, start=1):
+        question = Question(questionnaire_id=questionnaire_id, text=q["text"], order=idx)
+        db.session.add(question)
+        db.session.flush()
+        for ans in q.get("answers", []):
+            db.session.add(AnswerOption(question_id=question.id, text=ans["text"], value=ans["value"]))
+
+
+def run(label, fn):
+    statements = []
+    listener = lambda *args: statements.append(1)
+    event.listen(db.engine, "before_cursor_execute", listener)
+    start = time.perf_counter()
+    fn()
+    db.session.commit()
+    elapsed = time.perf_counter() - start
+    event.remove(db.engine, "before_cursor_execute", listener)
+    print(f"{label:<28} {elapsed * 1000:9.1f} ms {len(statements):7d} statements")
+
+
+def main(n_questions=200, n_answers=5):
+    questions = [
+        {"text": f"Question {i}", "answers": [{"text": f"Answer {j}", "value": j} for j in range(n_answers)]}
+        for i in range(n_questions)
+    ]
+
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+
+        legacy = Questionnaire(title="legacy")
+        bulk = Questionnaire(title="bulk")
+        db.session.add_all([legacy, bulk])
+        db.session.commit()
+
+        print(f"{n_questions} questions x {n_answers} answers")
+        run("create (legacy)", lambda: legacy_save(legacy.id, questions))
+        run("create (set-based)", lambda: save_questions(bulk.id, questions))
+
+        # Edit one question in ten, as an admin fixing typos would
+        edited = [dict(q, text=q["text"] + "?") if i % 10 == 0 else q for i, q in enumerate(questions)]
+        run("update (legacy)", lambda: legacy_save(legacy.id, edited))
+
+        existing = Question.query.options(db.selectinload(Question.answers)) \
+            .filter_by(questionnaire_id=bulk.id).order_by(Question.order).all()
+        edited = [
+            dict(q, id=ques.id, answers=[dict(a, id=ans.id) for a, ans in zip(q["answers"], ques.answers)])
+            for q, ques in zip(edited, existing)
+        ]
+        run("update (set-based diff)", lambda: save_questions(bulk.id, edited, existing))
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:3]))
@@ -0,0 +1,289 @@
+# Micro-benchmarks for app.ml: SBERTRecommender and NLPRecommender fit and
+# recommend across corpus sizes, top-k and query batch sizes, plus the
+# scoring strategies the SBERT path could use instead of a full argsort:
+#
+#   argsort      sims.argsort()[::-1][:k], what SBERTRecommender does today
+#   argpartition O(n) selection of the k best, then a sort of only those k
+#   int8         embeddings quantized to int8 (4x smaller), exact top-k on them;
+#                numpy has no int8 matmul, so this trades speed for memory
+#   ivf          approximate search: k-means buckets, scan the nprobe nearest
+#
+# Each case reports min/median/p95/mean per call and calls per second, peak
+# traced memory for fit, and recall@k against argsort for the lossy ones.
+# CPU only. The default fake encoder returns random unit vectors instantly so
+# the scoring stage is measured on its own; --encoder sbert uses the real
+# model (keep --sizes small).
+#
+#   python -m benchmarks.recommender [--sizes 1000,10000,100000,1000000] [--top-k 5,50]
+#       [--batch 1,16,64] [--suite sbert,nlp,scoring] [--encoder fake|sbert] [--save out.json]
+import argparse
+import json
+import math
+import statistics
+import time
+import tracemalloc
+import zlib
+
+import numpy as np
+
+from app.ml.sbert_recommender import SBERTRecommender
+from app.ml.nlp_recommender import NLPRecommender
+
+WORDS = ("stress sleep anxiety exam work family friend lonely calm walk breathe focus tired angry happy "
+         "grateful therapy mindful journal routine exercise music study deadline worry panic rest hope "
+         "partner parent school sad motivation habit meditation yoga nature morning night").split()
+
+
+class FakeEncoder:
+    # Stands in for SentenceTransformer.encode. Vectors are a random topic
+    # centroid plus noise, so the corpus has the cluster structure real
+    # embeddings have (which ANN relies on); single texts are seeded from the
+    # text so repeated queries are stable
+    def __init__(self, dim=384, topics=64, noise=0.8):
+        self.dim = dim
+        self.noise = noise / dim ** 0.5
+        centroids = np.random.default_rng(0).standard_normal((topics, dim), dtype=np.float32)
+        self.centroids = centroids / np.linalg.norm(centroids, axis=1, keepdims=True)
+
+    def sample(self, rng, count):
+        topics = rng.integers(0, len(self.centroids), count)
+        vectors = self.centroids[topics] + rng.standard_normal((count, self.dim), dtype=np.float32) * self.noise
+        return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+    def encode(self, texts, convert_to_numpy=True, normalize_embeddings=True, **kwargs):
+        if isinstance(texts, str):
+            return self.sample(np.random.default_rng(zlib.crc32(texts.encode())), 1)[0]
+        rng = np.random.default_rng(len(texts))
+        vectors = np.empty((len(texts), self.dim), dtype=np.float32)
+        for start in range(0, len(texts), 100_000):
+            chunk = self.sample(rng, min(100_000, len(texts) - start))
+            vectors[start:start + len(chunk)] = chunk
+        return vectors
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark the recommenders")
+    ints = lambda value: [int(v) for v in value.split(",")]
+    parser.add_argument("--sizes", type=ints, default=[1_000, 10_000, 100_000, 1_000_000])
+    parser.add_argument("--top-k", type=ints, default=[5, 50])
+    parser.add_argument("--batch", type=ints, default=[1, 16, 64], help="queries scored per call")
+    parser.add_argument("--suite", default="sbert,nlp,scoring")
+    parser.add_argument("--encoder", choices=["fake", "sbert"], default="fake")
+    parser.add_argument("--nlp-max", type=int, default=100_000, help="largest corpus for the TF-IDF recommender")
+    parser.add_argument("--rounds", type=int, default=20, help="timed calls per case")
+    parser.add_argument("--nlist", type=int, default=0, help="IVF buckets, default 4*sqrt(n)")
+    parser.add_argument("--nprobe", type=int, default=8)
+    parser.add_argument("--save", help="write all results to this JSON file")
+    return parser.parse_args()
+
+
+def corpus(n, seed=0):
+    rng = np.random.default_rng(seed)
+    words = np.array(WORDS)
+    return [{"id": i, "text": " ".join(words[rng.integers(0, len(words), 12)])} for i in range(n)]
+
+
+def queries(count, seed=1):
+    rng = np.random.default_rng(seed)
+    return [" ".join(np.array(WORDS)[rng.integers(0, len(WORDS), 20)]) for _ in range(count)]
+
+
+def bench(fn, rounds, warmup=2):
+    for _ in range(warmup):
+        fn()
+    times = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    times.sort()
+    return {
+        "rounds": rounds,
+        "min_ms": round(times[0] * 1000, 3),
+        "median_ms": round(statistics.median(times) * 1000, 3),
+        "p95_ms": round(times[min(rounds - 1, int(rounds * 0.95))] * 1000, 3),
+        "mean_ms": round(statistics.mean(times) * 1000, 3),
+        "ops": round(1 / statistics.mean(times), 1),
+    }
+
+
+def traced(fn):
+    # Time and peak Python/numpy allocation of a single call
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, {"seconds": round(elapsed, 3), "peak_mib": round(peak / 2 ** 20, 1)}
+
+
+# Scoring strategies over a normalized (n, dim) matrix and a (b, dim) query batch
+
+def top_argsort(items, batch, k):
+    sims = batch @ items.T
+    return np.argsort(sims, axis=1)[:, ::-1][:, :k]
+
+
+def top_argpartition(items, batch, k):
+    return select(batch @ items.T, k)
+
+
+def select(sims, k):
+    k = min(k, sims.shape[1])
+    best = np.argpartition(sims, -k, axis=1)[:, -k:]
+    order = np.argsort(np.take_along_axis(sims, best, axis=1), axis=1)[:, ::-1]
+    return np.take_along_axis(best, order, axis=1)
+
+
+def quantize(vectors):
+    # Symmetric per-matrix scale; vectors are unit length so |x| <= 1
+    return np.clip(np.rint(vectors * 127), -127, 127).astype(np.int8)
+
+
+def top_int8(items_int8, batch, k, chunk=65_536):
+    # Scores from the int8 matrix, upcast a chunk at a time so a full float32
+    # copy never exists; the scale is the same for every item so ranks hold
+    query = quantize(batch).astype(np.float32).T
+    sims = np.empty((len(batch), len(items_int8)), dtype=np.float32)
+    for start in range(0, len(items_int8), chunk):
+        sims[:, start:start + chunk] = (items_int8[start:start + chunk].astype(np.float32) @ query).T
+    return select(sims, k)
+
+
+class IVFIndex:
+    # Minimal inverted-file index: k-means centroids over a sample, each item
+    # stored under its nearest centroid, queries scan the nprobe closest lists
+    def __init__(self, items, nlist, iterations=10, seed=0):
+        rng = np.random.default_rng(seed)
+        sample = items[rng.choice(len(items), min(len(items), nlist * 40), replace=False)]
+        centroids = sample[rng.choice(len(sample), nlist, replace=False)]
+        for _ in range(iterations):
+            assign = np.argmax(sample @ centroids.T, axis=1)
+            for c in range(nlist):
+                members = sample[assign == c]
+                if len(members):
+                    centroids[c] = members.mean(axis=0)
+            centroids /= np.linalg.norm(centroids, axis=1, keepdims=True) + 1e-12
+        self.centroids = centroids
+
+        assign = np.concatenate([np.argmax(items[s:s + 65_536] @ centroids.T, axis=1)
+                                 for s in range(0, len(items), 65_536)])
+        order = np.argsort(assign, kind="stable")
+        self.items = items
+        self.ids = order
+        self.offsets = np.searchsorted(assign[order], np.arange(nlist + 1))
+
+    def search(self, batch, k, nprobe):
+        probes = np.argsort(batch @ self.centroids.T, axis=1)[:, ::-1][:, :nprobe]
+        results = []
+        for query, lists in zip(batch, probes):
+            spans = [np.arange(self.offsets[c], self.offsets[c + 1]) for c in lists]
+            rows = self.ids[np.concatenate(spans)]
+            sims = self.items[rows] @ query
+            kk = min(k, len(rows))
+            best = np.argpartition(sims, -kk)[-kk:]
+            results.append(rows[best[np.argsort(sims[best])[::-1]]])
+        return results
+
+
+def recall(exact, found):
+    hits = sum(len(set(e.tolist()) & set(np.asarray(f).tolist())) for e, f in zip(exact, found))
+    return round(hits / sum(len(e) for e in exact), 4)
+
+
+def run_scoring(args, size, encoder, results):
+    items = encoder.encode([item["text"] for item in corpus(size)], convert_to_numpy=True, normalize_embeddings=True)
+    items_int8, quantized = traced(lambda: quantize(items))
+    nlist = args.nlist or max(1, int(4 * math.sqrt(size)))
+    index, built = traced(lambda: IVFIndex(items, nlist))
+    results.append({"suite": "scoring", "case": "build", "size": size,
+                    "float32_mib": round(items.nbytes / 2 ** 20, 1), "int8_mib": round(items_int8.nbytes / 2 ** 20, 1),
+                    "quantize": quantized, "ivf_build": built, "nlist": nlist})
+    print(f"\nscoring n={size}: float32 {items.nbytes / 2 ** 20:.1f} MiB, int8 {items_int8.nbytes / 2 ** 20:.1f} MiB, "
+          f"ivf nlist={nlist} built in {built['seconds']}s")
+
+    all_queries = np.stack([encoder.encode(q) for q in queries(max(args.batch))])
+    rounds = max(3, args.rounds // (1 + size // 200_000))
+    for batch_size in args.batch:
+        batch = all_queries[:batch_size]
+        for k in args.top_k:
+            exact = top_argsort(items, batch, k)
+            cases = {
+                "argsort": (lambda: top_argsort(items, batch, k), False),
+                "argpartition": (lambda: top_argpartition(items, batch, k), False),
+                "int8": (lambda: top_int8(items_int8, batch, k), True),
+                f"ivf/nprobe={args.nprobe}": (lambda: index.search(batch, k, args.nprobe), True),
+            }
+            for name, (fn, lossy) in cases.items():
+                stats = bench(fn, rounds)
+                stats["per_query_ms"] = round(stats["mean_ms"] / batch_size, 4)
+                if lossy:
+                    stats["recall"] = recall(exact, fn())
+                results.append({"suite": "scoring", "case": name, "size": size, "batch": batch_size, "k": k, **stats})
+                print(f"  {name:<16} batch={batch_size:<4} k={k:<4} median {stats['median_ms']:>9} ms  "
+                      f"p95 {stats['p95_ms']:>9} ms  {stats['per_query_ms']:>8} ms/query"
+                      + (f"  recall {stats['recall']}" if "recall" in stats else ""))
+
+
+def run_sbert(args, size, encoder, results):
+    items = corpus(size)
+    recommender = SBERTRecommender(model=encoder)
+    _, fitted = traced(lambda: recommender.fit(items))
+    results.append({"suite": "sbert", "case": "fit", "size": size, **fitted})
+    print(f"\nSBERTRecommender n={size}: fit {fitted['seconds']}s, peak {fitted['peak_mib']} MiB")
+
+    text = queries(1)[0]
+    for k in args.top_k:
+        stats = bench(lambda: recommender.recommend(text, top_k=k), args.rounds)
+        results.append({"suite": "sbert", "case": "recommend", "size": size, "k": k, **stats})
+        print(f"  recommend k={k:<4} median {stats['median_ms']} ms  p95 {stats['p95_ms']} ms  {stats['ops']} ops/s")
+
+
+def run_nlp(args, size, results):
+    if size > args.nlp_max:
+        return
+    items = corpus(size)
+    recommender = NLPRecommender()
+    try:
+        _, fitted = traced(lambda: recommender.fit(items))
+    except LookupError as e:
+        # NLTK corpora are downloaded on import; without network they are missing
+        print(f"\nNLPRecommender skipped: {str(e).strip().splitlines()[0]}")
+        args.nlp_max = 0
+        return
+    results.append({"suite": "nlp", "case": "fit", "size": size, **fitted})
+    print(f"\nNLPRecommender n={size}: fit {fitted['seconds']}s, peak {fitted['peak_mib']} MiB")
+
+    text = queries(1)[0]
+    for k in args.top_k:
+        stats = bench(lambda: recommender.recommend(text, top_k=k), args.rounds)
+        results.append({"suite": "nlp", "case": "recommend", "size": size, "k": k, **stats})
+        print(f"  recommend k={k:<4} median {stats['median_ms']} ms  p95 {stats['p95_ms']} ms  {stats['ops']} ops/s")
+
+
+def main():
+    args = parse_args()
+    suites = args.suite.split(",")
+    if args.encoder == "sbert":
+        from app import sbert_model as encoder
+    else:
+        encoder = FakeEncoder()
+
+    results = []
+    for size in args.sizes:
+        if "sbert" in suites:
+            run_sbert(args, size, encoder, results)
+        if "nlp" in suites:
+            run_nlp(args, size, results)
+        if "scoring" in suites:
+            run_scoring(args, size, encoder, results)
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump({"meta": {k: v for k, v in vars(args).items() if k != "save"}, "results": results}, f, indent=2)
+        print(f"\nsaved {args.save}")
+
+
+if __name__ == "__main__":
+    main()
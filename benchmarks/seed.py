@@ -0,0 +1,399 @@
+# Synthetic data for scale testing. Fills every table with realistic, skewed
+# volumes using bulk inserts: community sizes and per-user activity follow a
+# Zipf-like distribution, diary entries and articles carry embeddings, and
+# derived tables (feed_entries, availability_days) are rebuilt to match.
+# The same --seed always produces the same data.
+#
+#   python -m benchmarks.seed --reset --users 100000 --diary 2000000
+#   DATABASE_URL=postgresql://... python -m benchmarks.seed --scale 10
+#
+# Every seeded account has the password "password". Embeddings are fake
+# (topic centroid plus noise) unless --encode is given, in which case the
+# SBERT model encodes the generated text.
+import argparse
+import os
+import pickle
+import random
+import time
+from datetime import date, datetime, time as dtime, timedelta
+
+import numpy as np
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///bench_seed.db")
+
+from flask import current_app
+from werkzeug.security import generate_password_hash
+from app import create_app, db, sbert_model
+from app.models.user import User
+from app.models.community import Community, CommunityMember, CommunityPost
+from app.models.article import Article
+from app.models.diary import UserDiary
+from app.models.questionnaire import Questionnaire, Question, AnswerOption, Submission, UserResponse
+from app.models.availability import Availability
+from app.models.booking import Booking
+
+DIMENSIONS = 384
+
+TOPICS = {
+    "stress": "deadline pressure overwhelmed tense workload exams breathe pause",
+    "sleep": "insomnia tired rest night routine dream wake nap",
+    "anxiety": "worry nervous panic racing thoughts calm grounding fear",
+    "depression": "low sad empty motivation hope support heavy numb",
+    "relationships": "friend partner family conflict lonely trust talk listen",
+    "mindfulness": "meditation present breathing awareness gratitude slow notice",
+    "work": "career manager burnout balance office colleagues focus goals",
+    "fitness": "exercise walk run yoga energy strength habit stretch",
+}
+FILLER = "today feel felt really very little more again always never think maybe better worse week morning".split()
+MOODS = [(5, "Calm"), (10, "Stressed"), (None, "Highly Stressed")]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Seed the database with synthetic data")
+    parser.add_argument("--scale", type=float, default=1.0, help="multiply every count below")
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--professionals", type=int, default=200)
+    parser.add_argument("--communities", type=int, default=50)
+    parser.add_argument("--memberships", type=float, default=3.0, help="average communities per user")
+    parser.add_argument("--articles", type=int, default=5_000)
+    parser.add_argument("--posts", type=int, default=50_000)
+    parser.add_argument("--diary", type=int, default=100_000)
+    parser.add_argument("--questionnaires", type=int, default=5)
+    parser.add_argument("--submissions", type=int, default=20_000)
+    parser.add_argument("--slots-per-day", type=int, default=8)
+    parser.add_argument("--days", type=int, default=28, help="availability days before and after today")
+    parser.add_argument("--booked", type=float, default=0.3, help="fraction of slots with a booking")
+    parser.add_argument("--skew", type=float, default=1.1, help="Zipf exponent for popularity and activity")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--batch", type=int, default=10_000)
+    parser.add_argument("--encode", action="store_true", help="embed with the SBERT model instead of fake vectors")
+    parser.add_argument("--reset", action="store_true", help="drop and recreate all tables first")
+    args = parser.parse_args()
+
+    for name in ("users", "professionals", "communities", "articles", "posts", "diary", "submissions"):
+        setattr(args, name, max(1, int(getattr(args, name) * args.scale)))
+    return args
+
+
+class Seeder:
+    def __init__(self, args):
+        self.args = args
+        self.rng = random.Random(args.seed)
+        self.np = np.random.default_rng(args.seed)
+        self.centroids = {t: self.np.normal(size=DIMENSIONS) for t in TOPICS}
+        self.password = generate_password_hash("password")
+        self.now = datetime.utcnow()
+
+    # helpers
+
+    def zipf_weights(self, n):
+        weights = 1.0 / np.arange(1, n + 1) ** self.args.skew
+        return weights / weights.sum()
+
+    def skewed(self, ids, k):
+        # k picks from ids, the first ids being the most popular
+        return np.asarray(ids)[self.np.choice(len(ids), size=k, p=self.zipf_weights(len(ids)))]
+
+    def next_id(self, pk):
+        return (db.session.query(db.func.max(pk)).scalar() or 0) + 1
+
+    def insert(self, model, rows):
+        # rows may be a generator; it is consumed batch by batch
+        batch, total = [], 0
+        for row in rows:
+            batch.append(row)
+            if len(batch) == self.args.batch:
+                total += self.flush(model, batch)
+                batch = []
+        total += self.flush(model, batch)
+        return total
+
+    def flush(self, model, batch):
+        if not batch:
+            return 0
+        if self.args.encode and "embedding" in batch[0]:
+            vectors = sbert_model.encode([r.pop("text") for r in batch], convert_to_numpy=True,
+                                         normalize_embeddings=True, batch_size=64)
+            for row, vector in zip(batch, vectors):
+                row["embedding"] = pickle.dumps(vector)
+        else:
+            for row in batch:
+                row.pop("text", None)
+        db.session.execute(db.insert(model), batch)
+        db.session.commit()
+        return len(batch)
+
+    def text(self, topic, words):
+        vocabulary = TOPICS[topic].split()
+        return " ".join(self.rng.choice(vocabulary) if self.rng.random() < 0.4 else self.rng.choice(FILLER)
+                        for _ in range(words)).capitalize() + "."
+
+    def embedding(self, topic):
+        if self.args.encode:
+            return None  # filled from the row's text in flush()
+        vector = self.centroids[topic] + self.np.normal(scale=0.8, size=DIMENSIONS)
+        return pickle.dumps((vector / np.linalg.norm(vector)).astype(np.float32))
+
+    def created(self, days=365):
+        return self.now - timedelta(seconds=self.rng.randrange(days * 86400))
+
+    # tables
+
+    def users(self):
+        a = self.args
+        self.first_user = self.next_id(User.user_id)
+        kinds = ["admin"] + ["professional"] * a.professionals + ["regular"] * a.users
+        total = self.insert(User, (
+            {
+                "user_id": self.first_user + i,
+                "user_name": f"{kind} {self.first_user + i}",
+                "email": f"{kind}{self.first_user + i}@seed.mindful.lk",
+                "password_hash": self.password,
+                "user_type": kind,
+                "created_at": self.created(),
+            }
+            for i, kind in enumerate(kinds)
+        ))
+        self.professional_ids = list(range(self.first_user + 1, self.first_user + 1 + a.professionals))
+        self.user_ids = list(range(self.professional_ids[-1] + 1, self.professional_ids[-1] + 1 + a.users))
+        return total
+
+    def communities(self):
+        first = self.next_id(Community.community_id)
+        topics = list(TOPICS)
+        self.community_topics = {first + i: topics[i % len(topics)] for i in range(self.args.communities)}
+        total = self.insert(Community, (
+            {
+                "community_id": community_id,
+                "name": f"{topic.title()} circle {community_id}",
+                "description": self.text(topic, 20),
+                "category": topic,
+                "created_at": self.created(),
+            }
+            for community_id, topic in self.community_topics.items()
+        ))
+        self.community_ids = list(self.community_topics)
+        return total
+
+    def memberships(self):
+        # Popular communities get most members; each user joins a skewed
+        # number of distinct communities
+        counts = np.minimum(self.np.poisson(self.args.memberships, size=len(self.user_ids)) + 1, len(self.community_ids))
+        self.members = {}
+
+        def rows():
+            for user_id, count in zip(self.user_ids, counts):
+                joined = set(self.skewed(self.community_ids, int(count) * 2).tolist())
+                for community_id in list(joined)[:count]:
+                    self.members.setdefault(community_id, []).append(user_id)
+                    yield {"user_id": user_id, "community_id": community_id, "joined_at": self.created()}
+
+        return self.insert(CommunityMember, rows())
+
+    def articles(self):
+        first = self.next_id(Article.article_id)
+        authors = self.user_ids + self.professional_ids
+
+        def rows():
+            for i, community_id in enumerate(self.skewed(self.community_ids, self.args.articles).tolist()):
+                topic = self.community_topics[community_id]
+                created = self.created()
+                title = self.text(topic, 6).rstrip(".").title()
+                content = self.text(topic, self.rng.randint(80, 600))
+                yield {
+                    "article_id": first + i,
+                    "title": title,
+                    "content": content,
+                    "community_id": community_id,
+                    "author_id": self.rng.choice(authors),
+                    "status": "approved" if self.rng.random() < 0.85 else "pending",
+                    "tags": ",".join(self.rng.sample(TOPICS[topic].split(), 3)),
+                    "created_at": created,
+                    "updated_at": created,
+                    "embedding": self.embedding(topic),
+                    "text": f"{title} {content}",
+                }
+
+        return self.insert(Article, rows())
+
+    def posts(self):
+        def rows():
+            for community_id in self.skewed(self.community_ids, self.args.posts).tolist():
+                members = self.members.get(community_id) or self.user_ids
+                created = self.created()
+                yield {
+                    "user_id": self.rng.choice(members),
+                    "community_id": community_id,
+                    "content": self.text(self.community_topics[community_id], self.rng.randint(5, 60)),
+                    "post_type": "text",
+                    "status": "approved" if self.rng.random() < 0.9 else "pending",
+                    "created_at": created,
+                    "updated_at": created,
+                }
+
+        return self.insert(CommunityPost, rows())
+
+    def diary(self):
+        topics = list(TOPICS)
+
+        def rows():
+            # a few users write most entries
+            for user_id in self.skewed(self.user_ids, self.args.diary).tolist():
+                topic = topics[(user_id + self.rng.randrange(3)) % len(topics)]
+                content = self.text(topic, self.rng.randint(20, 250))
+                created = self.created()
+                yield {
+                    "user_id": user_id,
+                    "content": content,
+                    "mood_rating": self.rng.randint(1, 10),
+                    "tags": ",".join(self.rng.sample(TOPICS[topic].split(), 2)),
+                    "sentiment_score": round(self.rng.uniform(-1, 1), 3),
+                    "created_at": created,
+                    "updated_at": created,
+                    "embedding": self.embedding(topic),
+                    "text": content,
+                }
+
+        return self.insert(UserDiary, rows())
+
+    def questionnaires(self):
+        self.quizzes = []
+        for q in range(self.args.questionnaires):
+            quiz = Questionnaire(title=f"Wellbeing check {q + 1}", description="How have you been feeling lately?")
+            db.session.add(quiz)
+            db.session.flush()
+            questions = []
+            for n in range(10):
+                question = Question(questionnaire_id=quiz.id, text=f"Question {n + 1}", order=n)
+                question.answers = [AnswerOption(text=label, value=value)
+                                    for value, label in enumerate(["Never", "Sometimes", "Often", "Always"])]
+                db.session.add(question)
+                questions.append(question)
+            db.session.flush()
+            self.quizzes.append((quiz.id, [(qu.id, [(a.id, a.value) for a in qu.answers]) for qu in questions]))
+        db.session.commit()
+        return len(self.quizzes)
+
+    def submissions(self):
+        first = self.next_id(Submission.id)
+        responses = []
+
+        def rows():
+            for i, user_id in enumerate(self.skewed(self.user_ids, self.args.submissions).tolist()):
+                quiz_id, questions = self.rng.choice(self.quizzes)
+                created = self.created()
+                score = 0
+                for question_id, answers in questions:
+                    answer_id, value = self.rng.choice(answers)
+                    score += value
+                    responses.append({"submission_id": first + i, "question_id": question_id,
+                                      "answer_id": answer_id, "user_id": user_id, "created_at": created})
+                yield {
+                    "id": first + i,
+                    "user_id": user_id,
+                    "questionnaire_id": quiz_id,
+                    "score": score,
+                    "mood": next(mood for limit, mood in MOODS if limit is None or score < limit),
+                    "created_at": created,
+                }
+
+        total = self.insert(Submission, rows())
+        self.insert(UserResponse, responses)
+        return total
+
+    def availability(self):
+        a = self.args
+        first = self.next_id(Availability.id)
+        today = date.today()
+        slots, bookings = [], []
+        slot_id = first
+        for professional_id in self.professional_ids:
+            for offset in range(-a.days, a.days + 1):
+                day = today + timedelta(days=offset)
+                if day.weekday() >= 5:
+                    continue
+                for n in range(a.slots_per_day):
+                    start = dtime(9 + n % 9, 0)
+                    booked = self.rng.random() < a.booked
+                    slots.append({
+                        "id": slot_id,
+                        "professional_id": professional_id,
+                        "date": day,
+                        "start_time": start,
+                        "end_time": dtime(start.hour, 50),
+                        "is_booked": booked,
+                    })
+                    if booked:
+                        status = "completed" if offset < 0 else self.rng.choice(["pending", "confirmed"])
+                        appointment = datetime.combine(day, start)
+                        bookings.append({
+                            "user_id": self.rng.choice(self.user_ids),
+                            "professional_id": professional_id,
+                            "slot_id": slot_id,
+                            "appointment_date": appointment,
+                            "status": status,
+                            "created_at": appointment - timedelta(days=self.rng.randint(1, 14)),
+                            "updated_at": appointment - timedelta(days=1),
+                        })
+                    slot_id += 1
+        self.insert(Availability, slots)
+        self.insert(Booking, bookings)
+        return len(slots)
+
+    # derived tables
+
+    def rebuild_derived(self):
+        db.session.execute(db.text("DELETE FROM availability_days"))
+        db.session.execute(db.text(
+            "INSERT INTO availability_days (date, free_slots) "
+            "SELECT date, count(*) FROM availability WHERE NOT is_booked AND date >= CURRENT_DATE GROUP BY date"
+        ))
+
+        db.session.execute(db.text(
+            "UPDATE communities SET member_count = "
+            "(SELECT count(*) FROM community_members m WHERE m.community_id = communities.community_id)"
+        ))
+
+        # fan-out feed entries for communities under FEED_FANOUT_LIMIT members
+        db.session.execute(db.text("DELETE FROM feed_entries"))
+        db.session.execute(db.text(
+            "INSERT INTO feed_entries (user_id, article_id, community_id) "
+            "SELECT m.user_id, a.article_id, a.community_id FROM articles a "
+            "JOIN community_members m ON m.community_id = a.community_id "
+            "WHERE a.status = 'approved' AND a.community_id IN ("
+            "  SELECT community_id FROM communities WHERE member_count <= :limit)"
+        ), {"limit": current_app.config["FEED_FANOUT_LIMIT"]})
+        db.session.execute(db.text(
+            "UPDATE articles SET fanned_out = article_id IN (SELECT article_id FROM feed_entries)"
+        ))
+
+        if db.engine.dialect.name == "postgresql":
+            # explicit ids were inserted, move the sequences past them
+            for table, pk in [("user", "user_id"), ("communities", "community_id"), ("articles", "article_id"),
+                              ("submissions", "id"), ("availability", "id")]:
+                db.session.execute(db.text(
+                    f"SELECT setval(pg_get_serial_sequence('\"{table}\"', '{pk}'), "
+                    f"(SELECT max({pk}) FROM \"{table}\"))"
+                ))
+        db.session.commit()
+
+
+def main():
+    args = parse_args()
+    app = create_app()
+    with app.app_context():
+        if args.reset:
+            db.drop_all()
+        db.create_all()
+
+        seeder = Seeder(args)
+        for step in ("users", "communities", "memberships", "articles", "posts", "diary",
+                     "questionnaires", "submissions", "availability", "rebuild_derived"):
+            start = time.perf_counter()
+            count = getattr(seeder, step)()
+            rows = f"{count:>10} rows" if count is not None else " " * 15
+            print(f"{step:<16} {rows}  {time.perf_counter() - start:7.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+# Admin user search latency: the old ILIKE '%q%' scan against the indexed
+# search in app.utils.search, for the full list GET /admin/users/search
+# returns by default and for a 20-row page (?limit=20).
+#
+#   python -m benchmarks.user_search [users]
+import random
+import statistics
+import string
+import sys
+import time
+
+from app import create_app, db
+from app.config import Config
+from app.models.user import User
+from app.utils.search import search
+
+# Always a scratch database, never DATABASE_URL: the benchmark drops its tables
+Config.SQLALCHEMY_DATABASE_URI = "sqlite:///bench_users.db"
+app = create_app()
+
+FIRST = ["amal", "nimal", "kamal", "sunil", "dilani", "chathu", "sanduni", "kasun", "ishara", "tharindu",
+         "olivia", "liam", "emma", "noah", "ava", "lucas", "mia", "ethan", "zara", "arjun"]
+DOMAINS = ["gmail.com", "yahoo.com", "outlook.com", "mindful.lk", "uni.ac.lk"]
+
+
+def seed(n, batch=50_000):
+    rng = random.Random(42)
+    for start in range(0, n, batch):
+        rows = []
+        for i in range(start, min(start + batch, n)):
+            first, last = rng.choice(FIRST), "".join(rng.choices(string.ascii_lowercase, k=6))
+            rows.append({
+                "user_name": f"{first} {last}",
+                "email": f"{first}.{last}{i}@{rng.choice(DOMAINS)}",
+                "password_hash": "x",
+                "user_type": "regular",
+            })
+        db.session.bulk_insert_mappings(User, rows)
+        db.session.commit()
+
+
+def timed(fn, repeat=20):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples), max(samples)
+
+
+def main(n=1_000_000):
+    with app.app_context():
+        db.create_all()
+        if User.query.count() != n:
+            db.drop_all()
+            db.create_all()
+            start = time.perf_counter()
+            seed(n)
+            print(f"seeded {n} users in {time.perf_counter() - start:.1f}s")
+
+        print(f"{'':<12} {'all matches':^33} {'20-row page':^33}")
+        for q in ["nim", "olivia", "kasun.a", "zara@mind", "zzzz"]:
+            scan = User.query.filter((User.user_name.ilike(f"%{q}%")) | (User.email.ilike(f"%{q}%")))
+            scan_all = timed(lambda: scan.all(), repeat=3)
+            indexed_all = timed(lambda: search("users", q, limit=None), repeat=3)
+            scan_page = timed(lambda: scan.limit(20).all(), repeat=3)
+            indexed_page = timed(lambda: search("users", q, limit=20))
+            print(f"{q!r:<12} ilike {scan_all[0]:8.1f}  index {indexed_all[0]:8.1f} ms   "
+                  f"ilike {scan_page[0]:8.1f}  index {indexed_page[0]:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:2]))
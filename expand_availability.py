@@ -0,0 +1,10 @@
+from app import create_app
+from app.utils.schedule import ensure_expanded
+
+# Roll every recurring availability rule forward to the booking horizon
+# (AVAILABILITY_HORIZON_DAYS). Run it daily, e.g. from cron; the searches
+# across professionals only show slots that already exist.
+app = create_app()
+
+with app.app_context():
+    print(f"Created {ensure_expanded()} slots")
@@ -0,0 +1,65 @@
+"""Add slot_id to bookings
+
+Revision ID: a4c6e8f0b235
+Revises: f1b3d5e7a924
+Create Date: 2026-10-19 14:21:03.615820
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a4c6e8f0b235'
+down_revision = 'f1b3d5e7a924'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    bind = op.get_bind()
+
+    # bookings was created with db.create_all() and never had a migration
+    if not sa.inspect(bind).has_table('bookings'):
+        op.create_table('bookings',
+        sa.Column('booking_id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('professional_id', sa.Integer(), nullable=False),
+        sa.Column('slot_id', sa.Integer(), nullable=True),
+        sa.Column('appointment_date', sa.DateTime(), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=True),
+        sa.Column('notes', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['professional_id'], ['user.user_id'], ),
+        sa.ForeignKeyConstraint(['slot_id'], ['availability.id'], name='fk_bookings_slot_id_availability', ondelete='SET NULL'),
+        sa.ForeignKeyConstraint(['user_id'], ['user.user_id'], ),
+        sa.PrimaryKeyConstraint('booking_id')
+        )
+        op.create_index(op.f('ix_bookings_slot_id'), 'bookings', ['slot_id'], unique=False)
+        return
+
+    with op.batch_alter_table('bookings', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('slot_id', sa.Integer(), nullable=True))
+        batch_op.create_index(batch_op.f('ix_bookings_slot_id'), ['slot_id'], unique=False)
+        batch_op.create_foreign_key('fk_bookings_slot_id_availability', 'availability', ['slot_id'], ['id'],
+                                    ondelete='SET NULL')
+
+    # Backfill from the (professional, date, start time) the old code matched on
+    if bind.dialect.name == 'postgresql':
+        match = "a.date + a.start_time = bookings.appointment_date"
+    else:
+        match = "datetime(a.date || ' ' || a.start_time) = datetime(bookings.appointment_date)"
+    op.execute(
+        "UPDATE bookings SET slot_id = ("
+        "SELECT a.id FROM availability a "
+        "WHERE a.professional_id = bookings.professional_id "
+        f"AND {match} "
+        "ORDER BY a.id LIMIT 1)"
+    )
+
+
+def downgrade():
+    with op.batch_alter_table('bookings', schema=None) as batch_op:
+        batch_op.drop_constraint('fk_bookings_slot_id_availability', type_='foreignkey')
+        batch_op.drop_index(batch_op.f('ix_bookings_slot_id'))
+        batch_op.drop_column('slot_id')
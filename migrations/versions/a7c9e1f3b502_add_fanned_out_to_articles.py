@@ -0,0 +1,33 @@
+"""Add fanned_out to articles
+
+Revision ID: a7c9e1f3b502
+Revises: d0f2b4c6e879
+Create Date: 2026-10-19 18:06:51.274810
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a7c9e1f3b502'
+down_revision = 'd0f2b4c6e879'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # plain ALTERs: a batch rebuild of articles on SQLite would drop the
+    # articles_fts triggers
+    op.add_column('articles', sa.Column('fanned_out', sa.Boolean(), nullable=False, server_default=sa.false()))
+    op.create_index('ix_articles_community_id_fanned_out', 'articles', ['community_id', 'fanned_out'], unique=False)
+
+    # articles with feed entries were fanned out; the rest are merged on read
+    op.execute(
+        "UPDATE articles SET fanned_out = article_id IN (SELECT article_id FROM feed_entries)"
+    )
+
+
+def downgrade():
+    op.drop_index('ix_articles_community_id_fanned_out', table_name='articles')
+    op.drop_column('articles', 'fanned_out')
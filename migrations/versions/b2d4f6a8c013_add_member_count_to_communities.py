@@ -0,0 +1,29 @@
+"""Add member_count to communities
+
+Revision ID: b2d4f6a8c013
+Revises: a7c9e1f3b502
+Create Date: 2026-10-19 19:12:40.518306
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b2d4f6a8c013'
+down_revision = 'a7c9e1f3b502'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('communities', sa.Column('member_count', sa.Integer(), nullable=False, server_default='0'))
+    op.execute(
+        "UPDATE communities SET member_count = "
+        "(SELECT count(*) FROM community_members m WHERE m.community_id = communities.community_id)"
+    )
+
+
+def downgrade():
+    with op.batch_alter_table('communities', schema=None) as batch_op:
+        batch_op.drop_column('member_count')
@@ -0,0 +1,26 @@
+"""Add version to questionnaires
+
+Revision ID: b7d2e4f1a9c3
+Revises: 4a232bbad9b2
+Create Date: 2026-10-19 09:12:41.518304
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7d2e4f1a9c3'
+down_revision = '4a232bbad9b2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('questionnaires', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('version', sa.Integer(), nullable=False, server_default='1'))
+
+
+def downgrade():
+    with op.batch_alter_table('questionnaires', schema=None) as batch_op:
+        batch_op.drop_column('version')
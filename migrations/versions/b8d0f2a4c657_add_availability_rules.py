@@ -0,0 +1,53 @@
+"""Add availability_rules and availability.rule_id
+
+Revision ID: b8d0f2a4c657
+Revises: a4c6e8f0b235
+Create Date: 2026-10-19 15:02:44.208391
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b8d0f2a4c657'
+down_revision = 'a4c6e8f0b235'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('availability_rules',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('professional_id', sa.Integer(), nullable=False),
+    sa.Column('weekdays', sa.String(length=20), nullable=False),
+    sa.Column('start_time', sa.Time(), nullable=False),
+    sa.Column('end_time', sa.Time(), nullable=False),
+    sa.Column('slot_minutes', sa.Integer(), nullable=False),
+    sa.Column('start_date', sa.Date(), nullable=False),
+    sa.Column('end_date', sa.Date(), nullable=True),
+    sa.Column('exceptions', sa.Text(), nullable=True),
+    sa.Column('expanded_until', sa.Date(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['professional_id'], ['user.user_id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('availability_rules', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_availability_rules_professional_id'), ['professional_id'], unique=False)
+
+    with op.batch_alter_table('availability', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('rule_id', sa.Integer(), nullable=True))
+        batch_op.create_foreign_key('fk_availability_rule_id_availability_rules', 'availability_rules', ['rule_id'], ['id'])
+        batch_op.create_index('ix_availability_professional_id_date', ['professional_id', 'date'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('availability', schema=None) as batch_op:
+        batch_op.drop_index('ix_availability_professional_id_date')
+        batch_op.drop_constraint('fk_availability_rule_id_availability_rules', type_='foreignkey')
+        batch_op.drop_column('rule_id')
+
+    with op.batch_alter_table('availability_rules', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_availability_rules_professional_id'))
+
+    op.drop_table('availability_rules')
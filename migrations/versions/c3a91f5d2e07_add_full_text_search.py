@@ -0,0 +1,73 @@
+"""Add full-text search over articles and community posts
+
+Revision ID: c3a91f5d2e07
+Revises: b7d2e4f1a9c3
+Create Date: 2026-10-19 10:03:17.902214
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c3a91f5d2e07'
+down_revision = 'b7d2e4f1a9c3'
+branch_labels = None
+depends_on = None
+
+
+# FTS5 tables + sync triggers on SQLite, tsvector columns + GIN on Postgres
+SQLITE = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts USING fts5(title, content, tags, content='articles', "
+    "content_rowid='article_id', prefix='2 3')",
+    "CREATE TRIGGER IF NOT EXISTS articles_fts_ai AFTER INSERT ON articles BEGIN "
+    "INSERT INTO articles_fts(rowid, title, content, tags) VALUES (new.article_id, new.title, new.content, new.tags); END",
+    "CREATE TRIGGER IF NOT EXISTS articles_fts_ad AFTER DELETE ON articles BEGIN "
+    "INSERT INTO articles_fts(articles_fts, rowid, title, content, tags) "
+    "VALUES ('delete', old.article_id, old.title, old.content, old.tags); END",
+    "CREATE TRIGGER IF NOT EXISTS articles_fts_au AFTER UPDATE OF title, content, tags ON articles BEGIN "
+    "INSERT INTO articles_fts(articles_fts, rowid, title, content, tags) "
+    "VALUES ('delete', old.article_id, old.title, old.content, old.tags); "
+    "INSERT INTO articles_fts(rowid, title, content, tags) VALUES (new.article_id, new.title, new.content, new.tags); END",
+    "INSERT INTO articles_fts(articles_fts) VALUES ('rebuild')",
+    "CREATE VIRTUAL TABLE IF NOT EXISTS community_posts_fts USING fts5(content, content='community_posts', "
+    "content_rowid='post_id', prefix='2 3')",
+    "CREATE TRIGGER IF NOT EXISTS community_posts_fts_ai AFTER INSERT ON community_posts BEGIN "
+    "INSERT INTO community_posts_fts(rowid, content) VALUES (new.post_id, new.content); END",
+    "CREATE TRIGGER IF NOT EXISTS community_posts_fts_ad AFTER DELETE ON community_posts BEGIN "
+    "INSERT INTO community_posts_fts(community_posts_fts, rowid, content) VALUES ('delete', old.post_id, old.content); END",
+    "CREATE TRIGGER IF NOT EXISTS community_posts_fts_au AFTER UPDATE OF content ON community_posts BEGIN "
+    "INSERT INTO community_posts_fts(community_posts_fts, rowid, content) VALUES ('delete', old.post_id, old.content); "
+    "INSERT INTO community_posts_fts(rowid, content) VALUES (new.post_id, new.content); END",
+    "INSERT INTO community_posts_fts(community_posts_fts) VALUES ('rebuild')",
+]
+
+POSTGRES = [
+    "ALTER TABLE articles ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS ("
+    "setweight(to_tsvector('simple', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(tags, '')), 'B') || "
+    "setweight(to_tsvector('simple', coalesce(content, '')), 'C')) STORED",
+    "CREATE INDEX IF NOT EXISTS ix_articles_search_vector ON articles USING gin (search_vector)",
+    "ALTER TABLE community_posts ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS ("
+    "to_tsvector('simple', coalesce(content, ''))) STORED",
+    "CREATE INDEX IF NOT EXISTS ix_community_posts_search_vector ON community_posts USING gin (search_vector)",
+]
+
+
+def upgrade():
+    dialect = op.get_bind().dialect.name
+    for statement in SQLITE if dialect == 'sqlite' else POSTGRES if dialect == 'postgresql' else []:
+        op.execute(statement)
+
+
+def downgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        for fts in ('articles_fts', 'community_posts_fts'):
+            for suffix in ('ai', 'ad', 'au'):
+                op.execute(f"DROP TRIGGER IF EXISTS {fts}_{suffix}")
+            op.execute(f"DROP TABLE IF EXISTS {fts}")
+    elif dialect == 'postgresql':
+        for table in ('articles', 'community_posts'):
+            op.execute(f"DROP INDEX IF EXISTS ix_{table}_search_vector")
+            op.execute(f"ALTER TABLE {table} DROP COLUMN IF EXISTS search_vector")
@@ -0,0 +1,39 @@
+"""Add availability_days summary and calendar index on availability
+
+Revision ID: c9e1a3b5d768
+Revises: b8d0f2a4c657
+Create Date: 2026-10-19 16:21:07.519204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c9e1a3b5d768'
+down_revision = 'b8d0f2a4c657'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('availability_days',
+    sa.Column('date', sa.Date(), nullable=False),
+    sa.Column('free_slots', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('date')
+    )
+    with op.batch_alter_table('availability', schema=None) as batch_op:
+        batch_op.create_index('ix_availability_date_start_time_is_booked', ['date', 'start_time', 'is_booked'], unique=False)
+
+    # seed the summary from the slots that are free right now, from today on
+    op.execute(
+        "INSERT INTO availability_days (date, free_slots) "
+        "SELECT date, count(*) FROM availability WHERE NOT is_booked AND date >= CURRENT_DATE GROUP BY date"
+    )
+
+
+def downgrade():
+    with op.batch_alter_table('availability', schema=None) as batch_op:
+        batch_op.drop_index('ix_availability_date_start_time_is_booked')
+
+    op.drop_table('availability_days')
@@ -0,0 +1,35 @@
+"""Add updated_at to bookings and community_posts
+
+Revision ID: d0f2b4c6e879
+Revises: c9e1a3b5d768
+Create Date: 2026-10-19 17:40:12.083516
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd0f2b4c6e879'
+down_revision = 'c9e1a3b5d768'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('bookings', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('updated_at', sa.DateTime(), nullable=True))
+
+    with op.batch_alter_table('community_posts', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('updated_at', sa.DateTime(), nullable=True))
+
+    op.execute("UPDATE bookings SET updated_at = created_at")
+    op.execute("UPDATE community_posts SET updated_at = created_at")
+
+
+def downgrade():
+    with op.batch_alter_table('community_posts', schema=None) as batch_op:
+        batch_op.drop_column('updated_at')
+
+    with op.batch_alter_table('bookings', schema=None) as batch_op:
+        batch_op.drop_column('updated_at')
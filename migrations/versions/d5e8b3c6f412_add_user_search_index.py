@@ -0,0 +1,56 @@
+"""Add user search index
+
+Revision ID: d5e8b3c6f412
+Revises: c3a91f5d2e07
+Create Date: 2026-10-19 11:27:55.140862
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd5e8b3c6f412'
+down_revision = 'c3a91f5d2e07'
+branch_labels = None
+depends_on = None
+
+
+# kept in sync with register / profile updates by triggers on "user"
+SQLITE = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS user_fts USING fts5(user_name, email, content='user', "
+    "content_rowid='user_id', prefix='2 3')",
+    "CREATE TRIGGER IF NOT EXISTS user_fts_ai AFTER INSERT ON user BEGIN "
+    "INSERT INTO user_fts(rowid, user_name, email) VALUES (new.user_id, new.user_name, new.email); END",
+    "CREATE TRIGGER IF NOT EXISTS user_fts_ad AFTER DELETE ON user BEGIN "
+    "INSERT INTO user_fts(user_fts, rowid, user_name, email) VALUES ('delete', old.user_id, old.user_name, old.email); END",
+    "CREATE TRIGGER IF NOT EXISTS user_fts_au AFTER UPDATE OF user_name, email ON user BEGIN "
+    "INSERT INTO user_fts(user_fts, rowid, user_name, email) VALUES ('delete', old.user_id, old.user_name, old.email); "
+    "INSERT INTO user_fts(rowid, user_name, email) VALUES (new.user_id, new.user_name, new.email); END",
+    "INSERT INTO user_fts(user_fts) VALUES ('rebuild')",
+]
+
+# split emails on @ and . so every part of the address is a prefix target
+POSTGRES = [
+    'ALTER TABLE "user" ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS ('
+    "setweight(to_tsvector('simple', coalesce(user_name, '')), 'A') || "
+    "setweight(to_tsvector('simple', regexp_replace(email, '[@.]', ' ', 'g')), 'B')) STORED",
+    'CREATE INDEX IF NOT EXISTS ix_user_search_vector ON "user" USING gin (search_vector)',
+]
+
+
+def upgrade():
+    dialect = op.get_bind().dialect.name
+    for statement in SQLITE if dialect == 'sqlite' else POSTGRES if dialect == 'postgresql' else []:
+        op.execute(statement)
+
+
+def downgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        for suffix in ('ai', 'ad', 'au'):
+            op.execute(f"DROP TRIGGER IF EXISTS user_fts_{suffix}")
+        op.execute("DROP TABLE IF EXISTS user_fts")
+    elif dialect == 'postgresql':
+        op.execute("DROP INDEX IF EXISTS ix_user_search_vector")
+        op.execute('ALTER TABLE "user" DROP COLUMN IF EXISTS search_vector')
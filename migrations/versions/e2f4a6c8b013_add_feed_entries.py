@@ -0,0 +1,55 @@
+"""Add feed_entries and membership indexes
+
+Revision ID: e2f4a6c8b013
+Revises: d5e8b3c6f412
+Create Date: 2026-10-19 12:48:09.331576
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e2f4a6c8b013'
+down_revision = 'd5e8b3c6f412'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('feed_entries',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('article_id', sa.Integer(), nullable=False),
+    sa.Column('community_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['article_id'], ['articles.article_id'], ),
+    sa.ForeignKeyConstraint(['community_id'], ['communities.community_id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['user.user_id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('user_id', 'article_id', name='uq_feed_entries_user_article')
+    )
+    with op.batch_alter_table('community_members', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_community_members_user_id'), ['user_id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_community_members_community_id'), ['community_id'], unique=False)
+
+    with op.batch_alter_table('articles', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_articles_community_id'), ['community_id'], unique=False)
+
+    # fan out the approved articles that already exist
+    op.execute(
+        "INSERT INTO feed_entries (user_id, article_id, community_id) "
+        "SELECT DISTINCT m.user_id, a.article_id, a.community_id "
+        "FROM articles a JOIN community_members m ON m.community_id = a.community_id "
+        "WHERE a.status = 'approved'"
+    )
+
+
+def downgrade():
+    with op.batch_alter_table('articles', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_articles_community_id'))
+
+    with op.batch_alter_table('community_members', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_community_members_community_id'))
+        batch_op.drop_index(batch_op.f('ix_community_members_user_id'))
+
+    op.drop_table('feed_entries')
@@ -0,0 +1,25 @@
+"""Add role_version to user
+
+Revision ID: f1b3d5e7a924
+Revises: e2f4a6c8b013
+Create Date: 2026-10-19 13:36:50.774019
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f1b3d5e7a924'
+down_revision = 'e2f4a6c8b013'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('user', sa.Column('role_version', sa.Integer(), nullable=False, server_default='0'))
+
+
+def downgrade():
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.drop_column('role_version')
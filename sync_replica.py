@@ -0,0 +1,18 @@
+import sqlite3
+from app import create_app, db
+
+# Refresh a local SQLite read replica (DATABASE_REPLICA_URL) with a
+# consistent copy of the primary. Rerun it to let the replica catch up.
+app = create_app()
+
+with app.app_context():
+    primary, replica = db.engines[None].url, db.engines.get("replica")
+    if replica is None or primary.get_backend_name() != "sqlite" or replica.url.get_backend_name() != "sqlite":
+        raise SystemExit("Set DATABASE_URL and DATABASE_REPLICA_URL to two sqlite files.")
+
+    source = sqlite3.connect(primary.database)
+    target = sqlite3.connect(replica.url.database)
+    source.backup(target)
+    target.close()
+    source.close()
+    print(f"Copied {primary.database} to {replica.url.database}")
@@ -0,0 +1,71 @@
+import os
+import tempfile
+import pytest
+
+# app.config reads the environment on import, so point it at a scratch
+# database before the app is loaded
+os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tempfile.mkdtemp(), "test.db")
+os.environ.setdefault("JWT_SECRET_KEY", "test-jwt-secret-key-of-at-least-32-bytes")
+os.environ.setdefault("SECRET_KEY", "test-secret-key")
+
+from flask_jwt_extended import create_access_token
+from app import create_app, db
+from app.models.user import User
+from benchmarks import groq_stub
+
+
+@pytest.fixture
+def app():
+    app = create_app()
+    app.config["TESTING"] = True
+    # Fail any request that repeats one statement (N+1), see app.utils.querycheck
+    app.config["QUERY_DETECTOR"] = "raise"
+    with app.app_context():
+        db.create_all()
+    # No app context is held during the test, so every request gets its own g
+    yield app
+    with app.app_context():
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def make_user(app):
+    def make(name, user_type="regular"):
+        with app.app_context():
+            user = User(user_name=name, email=f"{name}@example.com", user_type=user_type)
+            user.set_password("password")
+            db.session.add(user)
+            db.session.commit()
+            return user.user_id
+    return make
+
+
+@pytest.fixture
+def auth_headers(app):
+    def headers(user_id=1):
+        with app.app_context():
+            return {"Authorization": f"Bearer {create_access_token(identity=str(user_id))}"}
+    return headers
+
+
+@pytest.fixture
+def llm_stub(monkeypatch):
+    # Start benchmarks.groq_stub with the given latency options and point
+    # the Groq client at it; the client is built on the first chat
+    servers = []
+
+    def start(**options):
+        server, url = groq_stub.start(**options)
+        servers.append(server)
+        monkeypatch.setenv("GROQ_BASE_URL", url)
+        monkeypatch.setenv("GROQ_API_KEY", "stub")
+        return server
+
+    yield start
+    for server in servers:
+        server.shutdown()
@@ -0,0 +1,34 @@
+from app import db
+from app.models.user import User
+from app.utils.helpers import set_user_type
+
+
+def login(client, name):
+    response = client.post("/api/auth/login", json={"email": f"{name}@example.com", "password": "password"})
+    assert response.status_code == 200
+    return {"Authorization": f"Bearer {response.get_json()['access_token']}"}
+
+
+def test_role_claim_is_trusted_until_the_role_changes(app, client, make_user):
+    user_id = make_user("admin", user_type="admin")
+    headers = login(client, "admin")
+    assert client.get("/api/admin/cache/stats", headers=headers).status_code == 200
+
+    with app.app_context():
+        set_user_type(db.session.get(User, user_id), "regular")
+        db.session.commit()
+
+    assert client.get("/api/admin/cache/stats", headers=headers).status_code == 403
+
+
+def test_deleted_admins_token_does_not_make_the_next_user_with_its_id_an_admin(app, client, make_user):
+    admin_id = make_user("admin", user_type="admin")
+    headers = login(client, "admin")
+    with app.app_context():
+        db.session.delete(db.session.get(User, admin_id))
+        db.session.commit()
+
+    # SQLite hands the freed id to the next account
+    assert make_user("newcomer") == admin_id
+
+    assert client.get("/api/admin/cache/stats", headers=headers).status_code == 403
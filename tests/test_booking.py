@@ -0,0 +1,143 @@
+from collections import Counter
+from datetime import date, time, timedelta
+import pytest
+from app import db
+from app.models.availability import Availability, AvailabilityRule, AvailabilityDay
+from app.models.booking import Booking
+from app.utils.schedule import ensure_expanded
+
+
+@pytest.fixture
+def professionals(make_user):
+    return [make_user(f"pro{i}", user_type="professional") for i in range(10)]
+
+
+def add_rule(client, headers, **rule):
+    rule = {"weekdays": list(range(7)), "start_time": "09:00", "end_time": "11:00", "slot_minutes": 60, **rule}
+    response = client.post("/api/booking/availability/rules", headers=headers, json=rule)
+    assert response.status_code == 201
+    return response.get_json()
+
+
+def slots_per_day(app, professional_id):
+    with app.app_context():
+        return Counter(day for day, in db.session.query(Availability.date)
+                       .filter(Availability.professional_id == professional_id))
+
+
+def test_rolling_many_rules_forward_is_set_based(app, client, auth_headers, professionals):
+    @app.route("/_expand")
+    def expand():
+        return {"created": ensure_expanded()}
+
+    for professional_id in professionals:
+        add_rule(client, auth_headers(professional_id))
+    # the horizon moves on, as it does every day, so every rule is behind
+    app.config["AVAILABILITY_HORIZON_DAYS"] += 7
+
+    # fails with RepeatedQueryError if any statement runs once per rule
+    response = client.get("/_expand")
+
+    assert response.status_code == 200
+    assert response.get_json()["created"] == 10 * 7 * 2
+    tomorrow = date.today() + timedelta(days=1)
+    last = date.today() + timedelta(days=app.config["AVAILABILITY_HORIZON_DAYS"])
+    for professional_id in professionals:
+        counts = slots_per_day(app, professional_id)
+        assert max(counts) == last
+        assert all(counts[tomorrow + timedelta(days=i)] == 2 for i in range((last - tomorrow).days + 1))
+    with app.app_context():
+        assert db.session.get(AvailabilityDay, last).free_slots == 20
+        assert {r.expanded_until for r in AvailabilityRule.query} == {last}
+    assert client.get("/_expand").get_json()["created"] == 0
+
+
+def test_overlapping_rules_expanded_together_do_not_double_book(app, professionals):
+    professional_id = professionals[0]
+    start = date.today() + timedelta(days=1)
+    with app.app_context():
+        for start_time, end_time in [("09:00", "11:00"), ("10:00", "12:00")]:
+            db.session.add(AvailabilityRule(
+                professional_id=professional_id, weekdays="0,1,2,3,4,5,6", slot_minutes=60,
+                start_time=time.fromisoformat(start_time), end_time=time.fromisoformat(end_time),
+                start_date=start, end_date=start
+            ))
+        db.session.commit()
+
+        assert ensure_expanded(professional_id) == 3
+        starts = sorted(t.strftime("%H:%M") for t, in db.session.query(Availability.start_time))
+        assert starts == ["09:00", "10:00", "11:00"]
+
+
+def test_searches_across_professionals_only_read(app, client, auth_headers, professionals):
+    for professional_id in professionals:
+        add_rule(client, auth_headers(professional_id))
+    app.config["AVAILABILITY_HORIZON_DAYS"] += 7
+    with app.app_context():
+        before = Availability.query.count()
+
+    for url in ["/api/booking/availability/search", "/api/booking/availability/days"]:
+        assert client.get(url, headers=auth_headers(professionals[0])).status_code == 200
+
+    with app.app_context():
+        assert Availability.query.count() == before
+
+
+def test_professional_availability_lists_only_upcoming_free_slots(app, client, auth_headers, professionals):
+    professional_id = professionals[0]
+    with app.app_context():
+        for day in [date.today() - timedelta(days=1), date.today() + timedelta(days=1)]:
+            db.session.add(Availability(professional_id=professional_id, date=day,
+                                        start_time=time(9), end_time=time(10)))
+        db.session.commit()
+
+    response = client.get(f"/api/booking/availability/{professional_id}", headers=auth_headers(professional_id))
+
+    assert response.status_code == 200
+    assert [s["date"] for s in response.get_json()] == [(date.today() + timedelta(days=1)).isoformat()]
+
+
+def test_deleting_a_rule_detaches_cancelled_bookings_from_its_slots(app, client, auth_headers, professionals,
+                                                                    make_user):
+    professional_id, user_id = professionals[0], make_user("client")
+    rule_id = add_rule(client, auth_headers(professional_id))["rule"]["id"]
+    with app.app_context():
+        slot_id = db.session.query(Availability.id).filter(Availability.date > date.today()).first()[0]
+    booking = client.post("/api/booking/book", headers=auth_headers(user_id), json={"slot_id": slot_id}).get_json()
+    client.put(f"/api/booking/bookings/{booking['booking_id']}/cancel", headers=auth_headers(user_id))
+
+    response = client.delete(f"/api/booking/availability/rules/{rule_id}", headers=auth_headers(professional_id))
+
+    assert response.status_code == 200
+    with app.app_context():
+        assert db.session.get(Availability, slot_id) is None
+        assert db.session.get(Booking, booking["booking_id"]).slot_id is None
+
+
+def test_a_slot_is_booked_once_and_freed_on_cancel(app, client, auth_headers, professionals, make_user):
+    first, second = make_user("first"), make_user("second")
+    tomorrow = date.today() + timedelta(days=1)
+    with app.app_context():
+        slot = Availability(professional_id=professionals[0], date=tomorrow, start_time=time(9), end_time=time(10))
+        db.session.add(slot)
+        db.session.add(AvailabilityDay(date=tomorrow, free_slots=1))
+        db.session.commit()
+        slot_id = slot.id
+
+    def free_slots():
+        with app.app_context():
+            return db.session.get(AvailabilityDay, tomorrow).free_slots
+
+    booked = client.post("/api/booking/book", headers=auth_headers(first), json={"slot_id": slot_id})
+    assert booked.status_code == 201
+    response = client.post("/api/booking/book", headers=auth_headers(second), json={"slot_id": slot_id})
+    assert response.status_code == 400
+    assert response.get_json()["error"] == "Slot already booked"
+    assert free_slots() == 0
+
+    cancel = f"/api/booking/bookings/{booked.get_json()['booking_id']}/cancel"
+    assert client.put(cancel, headers=auth_headers(first)).status_code == 200
+    # cancelling twice frees the slot only once
+    assert client.put(cancel, headers=auth_headers(first)).status_code == 200
+    assert free_slots() == 1
+    assert client.post("/api/booking/book", headers=auth_headers(second), json={"slot_id": slot_id}).status_code == 201
@@ -0,0 +1,71 @@
+import threading
+import time
+
+
+def chat(client, headers, message="I feel stressed"):
+    return client.post("/api/chatbot/chat", json={"message": message}, headers=headers)
+
+
+def wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition not met in time"
+        time.sleep(0.01)
+
+
+def chat_in_background(app, headers):
+    # Start a chat from another thread and wait until it holds a pool slot
+    results = []
+    thread = threading.Thread(target=lambda: results.append(chat(app.test_client(), headers)))
+    thread.start()
+    wait_for(lambda: app.extensions.get("groq") is not None and app.extensions["groq"].per_user)
+    return thread, results
+
+
+def test_chat_replies(client, auth_headers, llm_stub):
+    llm_stub(latency=0.05, jitter=0)
+
+    response = chat(client, auth_headers(1))
+
+    assert response.status_code == 200
+    reply = response.get_json()["reply"]
+    assert reply.startswith("That sounds like a lot to carry.")
+    assert "<think>" not in reply
+
+
+def test_chat_returns_503_when_pool_is_saturated(app, client, auth_headers, llm_stub):
+    llm_stub(latency=1, jitter=0)
+    app.config["CHATBOT_MAX_CONCURRENCY"] = 1
+    thread, results = chat_in_background(app, auth_headers(1))
+
+    started = time.monotonic()
+    response = chat(client, auth_headers(2))
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "5"
+    assert time.monotonic() - started < 0.5
+    thread.join()
+    assert results[0].status_code == 200
+
+
+def test_chat_returns_429_for_a_second_chat_from_the_same_user(app, client, auth_headers, llm_stub):
+    llm_stub(latency=1, jitter=0)
+    thread, results = chat_in_background(app, auth_headers(1))
+
+    response = chat(client, auth_headers(1))
+
+    assert response.status_code == 429
+    thread.join()
+    assert results[0].status_code == 200
+
+
+def test_chat_returns_504_when_llm_is_too_slow(app, client, auth_headers, llm_stub):
+    llm_stub(latency=2, jitter=0)
+    app.config["CHATBOT_TIMEOUT"] = 0.2
+
+    started = time.monotonic()
+    response = chat(client, auth_headers(1))
+
+    assert response.status_code == 504
+    assert response.get_json()["error"] == "The assistant took too long to respond"
+    assert time.monotonic() - started < 1.5
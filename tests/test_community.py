@@ -0,0 +1,46 @@
+import pytest
+from app import db
+from app.models.community import Community, CommunityMember
+from app.utils.querycheck import RepeatedQueryError
+
+
+@pytest.fixture
+def communities(app, make_user):
+    # community i has i % 4 members; returns the community ids
+    users = [make_user(f"member{i}") for i in range(4)]
+    with app.app_context():
+        communities = [Community(name=f"Community {i}", category="stress", member_count=i % 4) for i in range(8)]
+        db.session.add_all(communities)
+        db.session.flush()
+        for i, community in enumerate(communities):
+            db.session.add_all(CommunityMember(user_id=user_id, community_id=community.community_id)
+                               for user_id in users[:i % 4])
+        db.session.commit()
+        return [c.community_id for c in communities]
+
+
+def test_communities_list_member_counts_without_n_plus_one(client, communities):
+    response = client.get("/api/community/communities")
+
+    assert response.status_code == 200
+    counts = {c["name"]: c["member_count"] for c in response.get_json()}
+    assert counts == {f"Community {i}": i % 4 for i in range(8)}
+
+
+def test_communities_list_sees_joins(client, auth_headers, communities, make_user):
+    user_id = make_user("joiner")
+    assert client.get("/api/community/communities").get_json()[0]["member_count"] == 0
+
+    response = client.post(f"/api/community/communities/{communities[0]}/join", headers=auth_headers(user_id))
+
+    assert response.status_code == 201
+    assert client.get("/api/community/communities").get_json()[0]["member_count"] == 1
+
+
+def test_query_detector_fails_n_plus_one(app, client, communities):
+    @app.route("/_members_one_by_one")
+    def members_one_by_one():
+        return {"counts": [len(db.session.get(Community, i).members) for i in communities]}
+
+    with pytest.raises(RepeatedQueryError):
+        client.get("/_members_one_by_one")
@@ -0,0 +1,92 @@
+import pytest
+from app import db
+from app.models.article import Article
+from app.models.community import Community
+from app.models.feed import FeedEntry
+
+
+@pytest.fixture
+def community(app, client, auth_headers, make_user):
+    # a community whose feed is fanned out up to two members
+    app.config["FEED_FANOUT_LIMIT"] = 2
+    admin = auth_headers(make_user("admin", user_type="admin"))
+    with app.app_context():
+        community = Community(name="Calm", category="stress")
+        db.session.add(community)
+        db.session.commit()
+        community_id = community.community_id
+
+    class Helpers:
+        id = community_id
+
+        def join(self, user_id):
+            response = client.post(f"/api/community/communities/{community_id}/join", headers=auth_headers(user_id))
+            assert response.status_code == 201
+
+        def leave(self, user_id):
+            response = client.delete(f"/api/community/communities/{community_id}/leave", headers=auth_headers(user_id))
+            assert response.status_code == 200
+
+        def publish(self, title):
+            with app.app_context():
+                article = Article(title=title, content="...", community_id=community_id, author_id=1)
+                db.session.add(article)
+                db.session.commit()
+                article_id = article.article_id
+            assert client.patch(f"/api/admin/articles/{article_id}/approve", headers=admin).status_code == 200
+            return article_id
+
+        def feed(self, user_id):
+            response = client.get("/api/community/articles/feed", headers=auth_headers(user_id))
+            assert response.status_code == 200
+            return [a["title"] for a in response.get_json()]
+
+        def entries(self, user_id):
+            with app.app_context():
+                return FeedEntry.query.filter_by(user_id=user_id).count()
+
+        def member_count(self):
+            with app.app_context():
+                return db.session.get(Community, community_id).member_count
+
+    return Helpers()
+
+
+def test_small_community_fans_out_on_approval(community, make_user):
+    alice, bob = make_user("alice"), make_user("bob")
+    community.join(alice)
+    community.join(bob)
+
+    community.publish("Breathing")
+
+    assert community.entries(alice) == community.entries(bob) == 1
+    assert community.feed(alice) == community.feed(bob) == ["Breathing"]
+
+
+def test_large_community_is_merged_in_on_read(community, make_user):
+    members = [make_user(f"member{i}") for i in range(3)]
+    for user_id in members:
+        community.join(user_id)
+    assert community.member_count() == 3
+
+    community.publish("Grounding")
+
+    assert [community.entries(user_id) for user_id in members] == [0, 0, 0]
+    assert [community.feed(user_id) for user_id in members] == [["Grounding"]] * 3
+
+
+def test_member_who_joined_while_large_keeps_older_articles_after_it_shrinks(community, make_user):
+    alice, bob, carol = make_user("alice"), make_user("bob"), make_user("carol")
+    community.join(alice)
+    community.join(bob)
+    community.publish("Before")  # fanned out to alice and bob
+    community.join(carol)  # large now, so carol gets no backfill
+    community.publish("During")  # merged in on read
+    assert community.feed(carol) == ["During", "Before"]
+
+    community.leave(alice)
+
+    assert community.member_count() == 2
+    assert community.feed(carol) == ["During", "Before"]
+    assert community.feed(bob) == ["During", "Before"]
+    assert community.feed(alice) == []
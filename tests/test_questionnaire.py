@@ -0,0 +1,59 @@
+import pytest
+
+
+@pytest.fixture
+def admin_headers(make_user, auth_headers):
+    return auth_headers(make_user("admin", user_type="admin"))
+
+
+def create_questionnaire(client, headers, title):
+    response = client.post("/api/admin/questionnaires", headers=headers, json={
+        "title": title,
+        "questions": [{"text": "How are you?", "answers": [{"text": "Fine", "value": 1}]}],
+    })
+    assert response.status_code == 201
+    return response.get_json()["id"]
+
+
+def test_conditional_get_answers_304_until_the_questionnaire_changes(client, admin_headers):
+    questionnaire_id = create_questionnaire(client, admin_headers, "Stress check")
+    url = f"/api/quiz/questionnaires/{questionnaire_id}"
+    etag = client.get(url, headers=admin_headers).headers["ETag"]
+
+    assert client.get(url, headers={**admin_headers, "If-None-Match": etag}).status_code == 304
+
+    client.put(f"/api/admin/questionnaires/{questionnaire_id}", headers=admin_headers, json={"title": "Renamed"})
+    response = client.get(url, headers={**admin_headers, "If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.get_json()["title"] == "Renamed"
+
+
+def test_recreated_questionnaire_does_not_match_the_deleted_ones_etag(client, admin_headers):
+    old_id = create_questionnaire(client, admin_headers, "Old")
+    url = f"/api/quiz/questionnaires/{old_id}"
+    old_etag = client.get(url, headers=admin_headers).headers["ETag"]
+    list_etag = client.get("/api/quiz/questionnaires", headers=admin_headers).headers["ETag"]
+
+    assert client.delete(f"/api/admin/questionnaires/{old_id}", headers=admin_headers).status_code == 200
+    # SQLite hands the freed id to the next row, which starts again at version 1
+    assert create_questionnaire(client, admin_headers, "New") == old_id
+
+    response = client.get(url, headers={**admin_headers, "If-None-Match": old_etag})
+    assert response.status_code == 200
+    assert response.get_json()["title"] == "New"
+    response = client.get("/api/quiz/questionnaires", headers={**admin_headers, "If-None-Match": list_etag})
+    assert response.status_code == 200
+    assert [q["title"] for q in response.get_json()] == ["New"]
+
+
+def test_submission_ids_may_be_strings_and_question_id_is_optional(client, admin_headers):
+    questionnaire_id = create_questionnaire(client, admin_headers, "Mood")
+    questions = client.get(f"/api/quiz/questionnaires/{questionnaire_id}", headers=admin_headers).get_json()["questions"]
+    answer_id = questions[0]["answers"][0]["id"]
+    url = f"/api/quiz/questionnaires/{questionnaire_id}/submit"
+
+    assert client.post(url, headers=admin_headers, json={"answers": [{"answer_id": str(answer_id)}]}).status_code == 201
+    response = client.post(url, headers=admin_headers, json={"answers": [{"answer_id": answer_id, "question_id": "x"}]})
+    assert response.status_code == 400
+    assert response.get_json()["error"] == \
+        "Each answer needs a numeric answer_id; question_id is optional but must be numeric if given"
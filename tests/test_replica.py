@@ -0,0 +1,137 @@
+import os
+import sqlite3
+import time
+import pytest
+import sqlalchemy as sa
+from flask_jwt_extended import create_access_token
+from app import create_app, db
+from app.config import Config
+from app.models.article import Article
+from app.models.community import Community
+from app.models.user import User
+from app.utils.replica import is_read, replica_lag
+
+
+@pytest.fixture
+def replica(app, tmp_path):
+    # a second SQLite file standing in for a replica refreshed by sync_replica.py
+    path = tmp_path / "replica.db"
+    path.touch()
+    with app.app_context():
+        yield sa.create_engine(f"sqlite:///{path}"), db.engines[None].url.database, str(path)
+
+
+def set_modified(path, seconds_ago):
+    when = time.time() - seconds_ago
+    os.utime(path, (when, when))
+    if os.path.exists(path + "-wal"):
+        os.utime(path + "-wal", (when, when))
+
+
+def test_replica_synced_after_the_last_write_has_no_lag(replica):
+    engine, primary, synced = replica
+    set_modified(primary, 60)
+    set_modified(synced, 30)
+
+    assert replica_lag(engine) == 0.0
+
+
+def test_replica_lag_is_the_age_of_the_sync_once_the_primary_moved_on(replica):
+    engine, primary, synced = replica
+    # one write a second after the sync, then nothing for an hour
+    set_modified(synced, 3600)
+    set_modified(primary, 3599)
+
+    assert replica_lag(engine) >= 3600
+
+
+def test_textual_selects_count_as_reads():
+    assert is_read(sa.text("  with recent as (select 1) select * from recent"))
+    assert is_read(sa.text("SELECT 1").columns(sa.column("x")))
+    assert not is_read(sa.text("UPDATE articles SET title = 'x'"))
+    assert not is_read(sa.update(sa.table("articles")).values(title="x"))
+
+
+@pytest.fixture
+def routed(monkeypatch, tmp_path):
+    # an app with a "replica" bind on a second SQLite file, filled by sync()
+    # the way sync_replica.py does
+    path = str(tmp_path / "replica.db")
+    monkeypatch.setattr(Config, "SQLALCHEMY_BINDS", {"replica": f"sqlite:///{path}"})
+    app = create_app()
+    app.config.update(TESTING=True, REPLICA_LAG_CHECK_INTERVAL=0)
+    with app.app_context():
+        db.create_all()
+        author = User(user_name="author", email="author@example.com", password_hash="x")
+        community = Community(name="Calm", category="stress")
+        db.session.add_all([author, community])
+        db.session.commit()
+        primary = db.engines[None].url.database
+        author_id, community_id = author.user_id, community.community_id
+        headers = {"Authorization": f"Bearer {create_access_token(identity=str(author_id))}"}
+
+    class Routed:
+        client = app.test_client()
+
+        def sync(self):
+            source, target = sqlite3.connect(primary), sqlite3.connect(path)
+            source.backup(target)
+            target.close()
+            source.close()
+
+        def publish(self, title):
+            with app.app_context():
+                db.session.add(Article(title=title, content="...", community_id=community_id,
+                                       author_id=author_id, status="approved"))
+                db.session.commit()
+
+        def join(self):
+            response = self.client.post(f"/api/community/communities/{community_id}/join", headers=headers)
+            assert response.status_code == 201
+
+        def found(self, q, as_author=False):
+            response = self.client.get("/api/search/articles", query_string={"q": q},
+                                       headers=headers if as_author else None)
+            assert response.status_code == 200
+            return [r["title"] for r in response.get_json()["results"]]
+
+    yield Routed(), path, primary
+    with app.app_context():
+        db.drop_all()
+    # init_app registered metadata for the bind on the shared db; later apps
+    # have no replica
+    db.metadatas.pop("replica", None)
+
+
+def test_replica_reads_go_to_the_replica_while_it_is_fresh(routed):
+    routed, replica, primary = routed
+    routed.publish("Breathing")
+    routed.sync()
+    routed.publish("Grounding")
+
+    assert routed.found("breathing") == ["Breathing"]
+    # written after the sync, so only on the primary
+    assert routed.found("grounding") == []
+
+
+def test_stale_replica_sends_reads_to_the_primary(routed):
+    routed, replica, primary = routed
+    routed.sync()
+    routed.publish("Grounding")
+    # the write came a second after the sync, and nothing since for an hour
+    set_modified(replica, 3600)
+    set_modified(primary, 3599)
+
+    assert routed.found("grounding") == ["Grounding"]
+
+
+def test_a_user_who_just_wrote_reads_from_the_primary(routed):
+    routed, replica, primary = routed
+    routed.sync()
+    routed.publish("Grounding")
+    assert routed.found("grounding", as_author=True) == []
+
+    routed.join()
+
+    assert routed.found("grounding", as_author=True) == ["Grounding"]
+    assert routed.found("grounding") == []
@@ -0,0 +1,68 @@
+import pytest
+from app import db
+from app.models.article import Article
+from app.models.community import Community
+
+
+@pytest.fixture
+def add_articles(app, make_user):
+    author_id = make_user("author")
+    with app.app_context():
+        community = Community(name="Calm", category="stress")
+        db.session.add(community)
+        db.session.commit()
+        community_id = community.community_id
+
+    def add(*titles, status="approved"):
+        with app.app_context():
+            articles = [Article(title=title, content="Slow breathing for busy days", community_id=community_id,
+                                author_id=author_id, status=status) for title in titles]
+            db.session.add_all(articles)
+            db.session.commit()
+            return [a.article_id for a in articles]
+    return add
+
+
+def search_ids(client, q, **params):
+    response = client.get("/api/search/articles", query_string={"q": q, **params})
+    assert response.status_code == 200
+    body = response.get_json()
+    return [r["article_id"] for r in body["results"]], body["next_cursor"]
+
+
+def test_paging_through_tied_scores_returns_every_hit_once(client, add_articles):
+    # identical text, so every hit has the same score
+    ids = add_articles(*["Breathing"] * 5)
+
+    seen, cursor = [], None
+    while True:
+        page, cursor = search_ids(client, "breath", limit=2, **({"cursor": cursor} if cursor else {}))
+        seen += page
+        if not cursor:
+            break
+
+    assert sorted(seen) == sorted(ids)
+
+
+def test_index_follows_inserts_updates_and_deletes(app, client, add_articles):
+    kept, edited, removed = add_articles("Grounding", "Journaling", "Stretching")
+    with app.app_context():
+        db.session.get(Article, edited).title = "Gratitude"
+        db.session.delete(db.session.get(Article, removed))
+        db.session.commit()
+
+    assert search_ids(client, "grounding")[0] == [kept]
+    assert search_ids(client, "gratitude")[0] == [edited]
+    assert search_ids(client, "journaling")[0] == []
+    assert search_ids(client, "stretching")[0] == []
+
+
+def test_pending_articles_are_only_searchable_by_admins(client, auth_headers, make_user, add_articles):
+    add_articles("Mindfulness", status="pending")
+
+    assert search_ids(client, "mindful")[0] == []
+    response = client.get("/api/search/articles", query_string={"q": "mindful", "status": "pending"})
+    assert response.status_code == 403
+    admin = auth_headers(make_user("admin", user_type="admin"))
+    response = client.get("/api/search/articles", query_string={"q": "mindful", "status": "pending"}, headers=admin)
+    assert [r["title"] for r in response.get_json()["results"]] == ["Mindfulness"]
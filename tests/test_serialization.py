@@ -0,0 +1,25 @@
+import uuid
+from datetime import date, datetime, timezone
+from flask.json.provider import DefaultJSONProvider
+
+
+def test_matches_flask_default_provider(app):
+    stock = DefaultJSONProvider(app)
+    payload = {
+        "created_at": datetime(2026, 10, 19, 17, 43, 5),
+        "aware": datetime(2026, 10, 19, 17, 43, 5, tzinfo=timezone.utc),
+        "day": date(2026, 10, 19),
+        "id": uuid.UUID("12345678-1234-5678-1234-567812345678"),
+        "nested": [{"count": 3, "ratio": 0.5, "name": "Mindful"}],
+    }
+
+    assert app.json.loads(app.json.dumps(payload)) == stock.loads(stock.dumps(payload))
+    assert app.json.loads(app.json.dumps(payload))["created_at"] == "Mon, 19 Oct 2026 17:43:05 GMT"
+
+
+def test_jsonify_keeps_http_dates(app, client):
+    @app.route("/_dates")
+    def dates():
+        return {"created_at": datetime(2026, 10, 19, 17, 43, 5)}
+
+    assert client.get("/_dates").get_json() == {"created_at": "Mon, 19 Oct 2026 17:43:05 GMT"}